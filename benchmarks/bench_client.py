@@ -0,0 +1,221 @@
+"""
+Benchmarks de bout en bout d'IPTVClient contre un panel simulé
+
+Démarre le panel de mock_panel.py, puis exécute chaque benchmark dans un
+processus séparé pour que le pic de mémoire (RSS) mesuré lui soit propre.
+Les résultats peuvent être enregistrés en JSON et comparés à une référence
+pour détecter les régressions.
+
+Usage :
+    python benchmarks/bench_client.py [--streams 50000] [--latency 0.0] [--failure-rate 0.0]
+                                      [--only generate_vod_m3u,cache] [--output results.json]
+                                      [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mock_panel import MockPanel  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Retourne le pic de mémoire résidente du processus en Mo (0 si indisponible)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _client(url: str, use_cache: bool = False):
+    """Crée un client sans limite de débit, pour mesurer le client et non le limiteur"""
+    from iptv_client import IPTVClient
+    from rate_limiter import TokenBucket
+    client = IPTVClient(url, use_cache=use_cache)
+    client.parse_url()
+    IPTVClient._limiters[client.host] = TokenBucket(0.0, 1)
+    return client
+
+
+async def bench_get_server_info(url: str) -> int:
+    info = await _client(url).get_server_info()
+    return info["total_channels"] + info["total_radios"] + info["total_vod"]
+
+
+async def bench_generate_m3u(url: str) -> int:
+    return (await _client(url).generate_m3u()).count("\n") // 2
+
+
+async def bench_generate_radio_m3u(url: str) -> int:
+    return (await _client(url).generate_radio_m3u()).count("\n") // 2
+
+
+async def bench_generate_vod_m3u(url: str) -> int:
+    return (await _client(url).generate_vod_m3u()).count("\n") // 2
+
+
+async def bench_generate_series_m3u(url: str) -> int:
+    return (await _client(url).generate_series_m3u()).count("\n") // 2
+
+
+async def bench_generate_all(url: str) -> int:
+    playlists = await _client(url).generate_all()
+    return sum(content.count("\n") // 2 for content in playlists.values())
+
+
+async def bench_test_channels(url: str, limit: int = 2000) -> int:
+    client = _client(url)
+    content = await client.generate_m3u()
+    # Limiter le nombre de flux testés pour garder un temps raisonnable
+    content = "\n".join(content.split("\n")[:limit * 2 + 1])
+    return (await client.test_channels(content))["total"]
+
+
+async def bench_cache(url: str, items: int = 20000, max_items: int = 1000) -> int:
+    from cache import ServerCache
+    # Plus de clés que de places : les insertions évincent, les lectures mêlent succès et échecs
+    cache = ServerCache(max_age_seconds=300, max_items=max_items)
+    for i in range(items):
+        cache.set(f"key{i}", i)
+    for i in range(items):
+        cache.get(f"key{i % (max_items * 2)}")
+    return items * 2
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "get_server_info": bench_get_server_info,
+    "generate_m3u": bench_generate_m3u,
+    "generate_radio_m3u": bench_generate_radio_m3u,
+    "generate_vod_m3u": bench_generate_vod_m3u,
+    "generate_series_m3u": bench_generate_series_m3u,
+    "generate_all": bench_generate_all,
+    "test_channels": bench_test_channels,
+    "cache": bench_cache,
+}
+
+
+def _run_one(name: str, url: str, queue) -> None:
+    """Exécute un benchmark dans le processus courant et renvoie ses mesures"""
+    start = time.perf_counter()
+    try:
+        items = asyncio.run(BENCHMARKS[name](url))
+        error = None
+    except Exception as e:
+        items, error = 0, str(e)
+    finally:
+        # Arrêter le pool avant la sortie : multiprocessing attend ses processus
+        import cpu_pool
+        cpu_pool.shutdown()
+    queue.put({"elapsed": time.perf_counter() - start, "items": items,
+               "peak_rss_mb": peak_rss_mb(), "error": error})
+
+
+def run_isolated(name: str, url: str) -> dict:
+    """Exécute un benchmark dans un processus neuf (mémoire isolée)"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_one, args=(name, url, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def start_panel(panel: MockPanel) -> Tuple[threading.Thread, asyncio.AbstractEventLoop]:
+    """Démarre le panel dans un thread avec sa propre boucle d'événements"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(panel.start())
+        ready.set()
+        loop.run_forever()
+        loop.run_until_complete(panel.stop())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    ready.wait()
+    return thread, loop
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> int:
+    """Affiche l'écart avec la référence et retourne le nombre de régressions"""
+    regressions = 0
+    print()
+    print(f"Comparison with baseline (tolerance {tolerance:.0%})")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or result["error"] or reference.get("error"):
+            continue
+        time_delta = result["elapsed"] / reference["elapsed"] - 1
+        rss_delta = result["peak_rss_mb"] / reference["peak_rss_mb"] - 1 if reference["peak_rss_mb"] else 0.0
+        regressed = time_delta > tolerance or rss_delta > tolerance
+        regressions += regressed
+        print(f"  {name:22s} time {time_delta:+7.1%}  rss {rss_delta:+7.1%}  {'REGRESSION' if regressed else 'ok'}")
+    return regressions
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=50000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.only.split(",") if name] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    panel = MockPanel(args.streams, latency=args.latency, failure_rate=args.failure_rate)
+    thread, loop = start_panel(panel)
+    print(f"Mock panel: {panel.base_url}, {args.streams} streams, latency {args.latency}s, "
+          f"failure rate {args.failure_rate:.0%}")
+    print()
+    print(f"  {'benchmark':22s} {'time':>9s} {'items/s':>12s} {'peak RSS':>10s}")
+
+    results = {}
+    try:
+        for name in names:
+            result = run_isolated(name, panel.url)
+            results[name] = result
+            if result["error"]:
+                print(f"  {name:22s} FAILED: {result['error']}")
+                continue
+            throughput = result["items"] / result["elapsed"] if result["elapsed"] else 0.0
+            print(f"  {name:22s} {result['elapsed']:8.2f}s {throughput:12.0f} {result['peak_rss_mb']:8.1f}MB")
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(
+            {"streams": args.streams, "latency": args.latency, "results": results}, indent=2
+        ), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        return 1 if compare(results, baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
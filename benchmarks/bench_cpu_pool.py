@@ -0,0 +1,82 @@
+"""
+Benchmark du traitement CPU d'un lot de comptes
+
+Décode et rend N catalogues en parallèle, d'abord sur la boucle
+d'événements, puis dans le pool de processus, et mesure le temps total
+ainsi que la plus longue pause de la boucle d'événements.
+
+Usage :
+    python benchmarks/bench_cpu_pool.py [--accounts 8] [--streams 50000] [--workers auto]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cpu_pool  # noqa: E402
+import json_backend  # noqa: E402
+from playlist import render_m3u  # noqa: E402
+from bench_json import make_payload  # noqa: E402
+
+
+async def process_account(payload: bytes) -> int:
+    """Décode et rend le catalogue d'un compte"""
+    catalog = await cpu_pool.run_cpu(json_backend.decode_catalog, payload, "stream_id", size_hint=len(payload))
+    content = await cpu_pool.run_cpu(render_m3u, catalog, {}, "http://h/movie/u/p", "mp4", True,
+                                     size_hint=catalog.nbytes())
+    return len(content)
+
+
+async def run_batch(payloads) -> tuple:
+    """Traite le lot et mesure la plus longue pause de la boucle"""
+    max_stall = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_stall
+        loop = asyncio.get_running_loop()
+        while running:
+            start = loop.time()
+            await asyncio.sleep(0.01)
+            max_stall = max(max_stall, loop.time() - start - 0.01)
+
+    monitor = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*[process_account(p) for p in payloads])
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor
+    return elapsed, max_stall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=8)
+    parser.add_argument("--streams", type=int, default=50000)
+    parser.add_argument("--workers", default="auto")
+    args = parser.parse_args()
+
+    json_backend.set_backend("auto")
+    payload = make_payload(args.streams)
+    payloads = [payload] * args.accounts
+    print(f"{args.accounts} accounts x {args.streams} streams ({len(payload) / 1e6:.1f} MB each)")
+
+    cpu_pool.configure(0)
+    elapsed, stall = asyncio.run(run_batch(payloads))
+    print(f"{'event loop (before)':25s} {elapsed:7.2f} s   max loop stall {stall * 1000:8.1f} ms")
+
+    workers = cpu_pool.configure(args.workers, min_bytes=0, initializer=json_backend.set_backend,
+                                 initargs=(json_backend.get_backend(), json_backend.get_typed_decoding()))
+    # Démarrer les processus avant la mesure
+    asyncio.run(run_batch(payloads[:1]))
+    elapsed, stall = asyncio.run(run_batch(payloads))
+    print(f"{f'process pool ({workers})':25s} {elapsed:7.2f} s   max loop stall {stall * 1000:8.1f} ms")
+    cpu_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark du décodage des catalogues player_api
+
+Compare le chemin historique (resp.text() puis json.loads) aux backends
+disponibles décodant directement les octets, ainsi que le décodage typé
+vers le catalogue compact.
+
+Usage :
+    python benchmarks/bench_json.py [--streams 150000] [--repeat 3]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import json_backend  # noqa: E402
+from catalog import Catalog  # noqa: E402
+
+
+def make_payload(count: int) -> bytes:
+    """Génère une réponse get_vod_streams réaliste"""
+    rng = random.Random(42)
+    items = []
+    for i in range(count):
+        items.append({
+            "num": i + 1,
+            "name": f"Movie {i} ({rng.randint(1970, 2024)})",
+            "stream_type": "movie",
+            "stream_id": 100000 + i,
+            "stream_icon": f"http://img.example.com/posters/{i}.jpg",
+            "rating": f"{rng.uniform(1, 9):.1f}",
+            "rating_5based": round(rng.uniform(0.5, 4.5), 1),
+            "added": str(1600000000 + i),
+            "is_adult": "0",
+            "category_id": str(rng.randint(1, 300)),
+            "category_ids": [rng.randint(1, 300)],
+            "container_extension": rng.choice(["mp4", "mkv", "avi"]),
+            "custom_sid": "",
+            "direct_source": "",
+            "tmdb": str(rng.randint(1, 900000)),
+            "trailer": "",
+        })
+    return json.dumps(items).encode("utf-8")
+
+
+def timed(func, repeat: int) -> float:
+    """Retourne le meilleur temps d'exécution sur `repeat` essais"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=150000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = make_payload(args.streams)
+    print(f"Payload: {args.streams} streams, {len(payload) / 1e6:.1f} MB")
+    print(f"Backends: {', '.join(json_backend.AVAILABLE_BACKENDS)}")
+    print()
+
+    print("Parse only")
+    baseline = timed(lambda: json.loads(payload.decode("utf-8")), args.repeat)
+    print(f"  {'text + json.loads (before)':43s} {baseline * 1000:9.1f} ms")
+    for backend in json_backend.AVAILABLE_BACKENDS:
+        json_backend.set_backend(backend)
+        elapsed = timed(lambda: json_backend.loads(payload), args.repeat)
+        print(f"  {f'bytes + {backend}':43s} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:.2f}")
+
+    print("Parse + compact catalog")
+    # Avant : décodage en str (resp.text()) puis json.loads et construction du catalogue
+    baseline = timed(lambda: Catalog.from_json(json.loads(payload.decode("utf-8"))), args.repeat)
+    print(f"  {'text + json.loads + catalog (before)':43s} {baseline * 1000:9.1f} ms")
+    for backend in json_backend.AVAILABLE_BACKENDS:
+        json_backend.set_backend(backend, typed_decoding=False)
+        elapsed = timed(lambda: json_backend.decode_catalog(payload), args.repeat)
+        print(f"  {f'bytes + {backend} + catalog':43s} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:.2f}")
+    if json_backend.msgspec is not None:
+        json_backend.set_backend("auto", typed_decoding=True)
+        elapsed = timed(lambda: json_backend.decode_catalog(payload), args.repeat)
+        print(f"  {'bytes + msgspec typed -> catalog':43s} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:.2f}")
+
+    print("Item count (get_server_info)")
+    baseline = timed(lambda: len(json.loads(payload.decode("utf-8"))), args.repeat)
+    print(f"  {'text + json.loads + len (before)':43s} {baseline * 1000:9.1f} ms")
+    json_backend.set_backend("auto")
+    elapsed = timed(lambda: json_backend.count_items(payload), args.repeat)
+    print(f"  {'count_items':43s} {elapsed * 1000:9.1f} ms  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark du temps de démarrage
+
+Mesure, dans des interpréteurs neufs lancés depuis un répertoire vide, le
+temps d'import des modules de l'application, de création du premier client
+et d'affichage de la fenêtre principale (si PyQt6 est installé, en mode
+offscreen). Vérifie aussi qu'un simple import n'importe pas aiohttp et
+n'écrit pas config.ini.
+
+Usage :
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "interpreter": "pass",
+    "import config_manager": "import config_manager",
+    "import iptv_client": "import iptv_client",
+    "first IPTVClient": (
+        "from iptv_client import IPTVClient\n"
+        "IPTVClient('http://h/get.php?username=u&password=p').parse_url()"
+    ),
+    "first network session": (
+        "import asyncio\n"
+        "from iptv_client import IPTVClient\n"
+        "async def main():\n"
+        "    async with IPTVClient('http://h/get.php?username=u&password=p')._session():\n"
+        "        pass\n"
+        "asyncio.run(main())"
+    ),
+    "main window": (
+        "from PyQt6.QtWidgets import QApplication\n"
+        "import main\n"
+        "app = QApplication([])\n"
+        "window = main.MainWindow()\n"
+        "window.show()\n"
+        "app.processEvents()"
+    ),
+}
+
+# Effets de bord d'un simple import : modules chargés et fichiers créés
+SIDE_EFFECTS = (
+    "import sys, os\n"
+    "import iptv_client\n"
+    "print('aiohttp' in sys.modules, os.path.exists('config.ini'))"
+)
+
+
+def run_python(code: str, cwd: str) -> subprocess.CompletedProcess:
+    """Exécute du code dans un interpréteur neuf, avec l'application dans le chemin d'import"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def measure(code: str, runs: int) -> float:
+    """Retourne la durée médiane d'exécution en secondes (None si le scénario échoue)"""
+    durations = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            start = time.perf_counter()
+            result = run_python(code, cwd)
+            durations.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    # Premier passage pour compiler les .pyc, qui ne doivent pas compter dans les mesures
+    for code in SCENARIOS.values():
+        with tempfile.TemporaryDirectory() as cwd:
+            run_python(code, cwd)
+
+    print(f"  {'scenario':24s} {'median':>9s} {'above interpreter':>18s}")
+    baseline = None
+    for name, code in SCENARIOS.items():
+        duration = measure(code, args.runs)
+        if duration is None:
+            print(f"  {name:24s} {'skipped (missing dependency)':>28s}")
+            continue
+        if baseline is None:
+            baseline = duration
+        print(f"  {name:24s} {duration * 1000:7.1f}ms {(duration - baseline) * 1000:16.1f}ms")
+
+    with tempfile.TemporaryDirectory() as cwd:
+        aiohttp_loaded, config_written = run_python(SIDE_EFFECTS, cwd).stdout.split()
+    print()
+    print(f"import iptv_client loads aiohttp: {aiohttp_loaded}, writes config.ini: {config_written}")
+
+
+if __name__ == "__main__":
+    main()
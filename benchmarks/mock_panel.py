@@ -0,0 +1,298 @@
+"""
+Panel Xtream simulé pour les benchmarks et les tests d'intégration
+
+Serveur aiohttp local imitant player_api.php, get.php, xmltv.php et les
+URLs de flux (live, radio, movie, series). Les catalogues sont générés de
+façon déterministe à la taille voulue, et une latence ainsi qu'un taux
+d'échec peuvent être injectés.
+
+Usage autonome :
+    python benchmarks/mock_panel.py [--streams 100000] [--port 8080] [--latency 0.05] [--failure-rate 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+USERNAME = "bench"
+PASSWORD = "bench"
+
+
+class MockPanel:
+    """
+    Panel Xtream simulé
+
+    Les réponses sont générées une seule fois puis servies depuis la mémoire,
+    pour que le panel ne soit pas le facteur limitant des mesures.
+    """
+
+    def __init__(self, streams: int = 1000, radios: Optional[int] = None, series: Optional[int] = None,
+                 categories: int = 50, latency: float = 0.0, failure_rate: float = 0.0,
+                 stream_failure_rate: float = 0.1, radio_api: bool = True, seed: int = 42,
+                 stream_chunks: int = 0, stream_interval: float = 0.01):
+        """
+        Initialise le panel
+
+        Args:
+            streams: Nombre de chaînes live et de films
+            radios: Nombre de radios (par défaut: streams / 20)
+            series: Nombre de séries (par défaut: streams / 100)
+            categories: Nombre de catégories par type de contenu
+            latency: Latence ajoutée à chaque réponse de l'API, en secondes
+            failure_rate: Proportion de réponses 503 de l'API
+            stream_failure_rate: Proportion de flux qui répondent 404 (tests de chaînes)
+            radio_api: Exposer get_radio_streams (sinon 404, pour tester le repli)
+            seed: Graine du générateur aléatoire
+            stream_chunks: Nombre de blocs envoyés en réponse à GET sur un flux (0 : corps vide)
+            stream_interval: Délai entre deux blocs, en secondes
+        """
+        self.streams = streams
+        self.radios = streams // 20 if radios is None else radios
+        self.series = streams // 100 if series is None else series
+        self.categories = categories
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.stream_failure_rate = stream_failure_rate
+        self.radio_api = radio_api
+        self.seed = seed
+        self.stream_chunks = stream_chunks
+        self.stream_interval = stream_interval
+        self.open_streams = 0  # Flux en cours d'envoi, et le maximum atteint
+        self.peak_streams = 0
+        self._rng = random.Random(seed)
+        self._payloads: Dict[str, bytes] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        """URL du compte à donner à IPTVClient"""
+        return f"{self.base_url}/get.php?username={USERNAME}&password={PASSWORD}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Démarre le serveur
+
+        Args:
+            host: Adresse d'écoute
+            port: Port d'écoute (0 : port libre choisi par le système)
+
+        Returns:
+            L'URL de base du panel
+        """
+        app = web.Application()
+        app.router.add_route("*", "/player_api.php", self._player_api)
+        app.router.add_get("/get.php", self._get_php)
+        app.router.add_get("/xmltv.php", self._xmltv)
+        app.router.add_route("*", "/{kind:live|radio|movie|series}/{user}/{password}/{stream}", self._stream)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Arrête le serveur"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'MockPanel':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    # Génération des catalogues
+
+    def payload(self, action: str) -> Optional[bytes]:
+        """Retourne la réponse JSON d'une action player_api (générée au premier appel)"""
+        if action not in self._payloads:
+            data = self._generate(action)
+            if data is None:
+                return None
+            self._payloads[action] = json.dumps(data).encode("utf-8")
+        return self._payloads[action]
+
+    def _generate(self, action: str):
+        rng = random.Random(f"{self.seed}-{action}")
+        if action.endswith("_categories"):
+            kind = action[4:-len("_categories")]
+            return [{"category_id": str(i), "category_name": f"{kind.title()} {i}", "parent_id": 0}
+                    for i in range(1, self.categories + 1)]
+        if action == "get_live_streams":
+            return [self._live_item(i, rng) for i in range(1, self.streams + 1)]
+        if action == "get_radio_streams":
+            return [{"num": i, "name": f"Radio {i} FM", "id": 500000 + i, "stream_icon": "",
+                     "category_id": str(rng.randint(1, self.categories))} for i in range(1, self.radios + 1)]
+        if action == "get_vod_streams":
+            return [self._vod_item(i, rng) for i in range(1, self.streams + 1)]
+        if action == "get_series":
+            return [{"num": i, "name": f"Series {i}", "series_id": i, "cover": f"http://img.local/s/{i}.jpg",
+                     "category_id": str(rng.randint(1, self.categories))} for i in range(1, self.series + 1)]
+        return None
+
+    def _live_item(self, i: int, rng: random.Random) -> dict:
+        # Une chaîne sur vingt ressemble à une radio, pour le repli de generate_radio_m3u
+        name = f"Radio {i} FM" if i % 20 == 0 else f"Channel {i} {rng.choice(['HD', 'FHD', 'SD'])}"
+        return {
+            "num": i, "name": name, "stream_type": "live", "stream_id": i,
+            "stream_icon": f"http://img.local/live/{i}.png", "epg_channel_id": f"ch{i}.local",
+            "added": str(1600000000 + i), "is_adult": "0", "category_id": str(rng.randint(1, self.categories)),
+            "category_ids": [], "custom_sid": "", "tv_archive": 1 if i % 7 == 0 else 0,
+            "direct_source": "", "tv_archive_duration": 3 if i % 7 == 0 else 0,
+        }
+
+    def _vod_item(self, i: int, rng: random.Random) -> dict:
+        return {
+            "num": i, "name": f"Movie {i} ({rng.randint(1970, 2024)})", "stream_type": "movie",
+            "stream_id": 100000 + i, "stream_icon": f"http://img.local/posters/{i}.jpg",
+            "rating": f"{rng.uniform(1, 9):.1f}", "rating_5based": round(rng.uniform(0.5, 4.5), 1),
+            "added": str(1600000000 + i), "is_adult": "0", "category_id": str(rng.randint(1, self.categories)),
+            "category_ids": [], "container_extension": rng.choice(["mp4", "mkv", "avi"]),
+            "custom_sid": "", "direct_source": "", "tmdb": str(rng.randint(1, 900000)), "trailer": "",
+        }
+
+    def _series_info(self, series_id: int) -> bytes:
+        rng = random.Random(f"{self.seed}-series-{series_id}")
+        seasons = {}
+        for season in range(1, rng.randint(1, 4) + 1):
+            seasons[str(season)] = [
+                {"id": str(series_id * 1000 + season * 100 + episode), "episode_num": episode, "season": season,
+                 "title": f"Episode {episode}", "container_extension": "mkv", "info": {}}
+                for episode in range(1, rng.randint(4, 12) + 1)
+            ]
+        return json.dumps({"info": {"name": f"Series {series_id}"}, "episodes": seasons}).encode("utf-8")
+
+    # Gestionnaires HTTP
+
+    async def _api_delay(self) -> Optional[web.Response]:
+        """Applique la latence injectée et retourne une erreur 503 selon le taux d'échec"""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        return None
+
+    def _json(self, request: web.Request, body: bytes) -> web.Response:
+        response = web.Response(body=body, content_type="application/json")
+        # Compression négociée comme sur un vrai panel derrière nginx
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response.enable_compression()
+        return response
+
+    async def _player_api(self, request: web.Request) -> web.Response:
+        failure = await self._api_delay()
+        if failure:
+            return failure
+        params = dict(request.query)
+        if request.method == "POST":
+            params.update(await request.post())
+        if params.get("username") != USERNAME or params.get("password") != PASSWORD:
+            return web.json_response({"user_info": {"auth": 0}})
+
+        action = params.get("action")
+        if not action:
+            return web.json_response({
+                "user_info": {"username": USERNAME, "auth": 1, "status": "Active",
+                              "exp_date": str(int(time.time()) + 86400), "is_trial": "0",
+                              "active_cons": "0", "max_connections": "2"},
+                "server_info": {"url": request.host, "timestamp_now": int(time.time())},
+            })
+        if action == "get_radio_streams" and not self.radio_api:
+            return web.Response(status=404, text="Not Found")
+        if action == "get_series_info":
+            return self._json(request, self._series_info(int(params.get("series_id", 0))))
+        body = self.payload(action)
+        if body is None:
+            return web.json_response([])
+        return self._json(request, body)
+
+    async def _get_php(self, request: web.Request) -> web.Response:
+        failure = await self._api_delay()
+        if failure:
+            return failure
+        lines: List[str] = ["#EXTM3U"]
+        for i in range(1, self.streams + 1):
+            lines.append(f'#EXTINF:-1 tvg-id="ch{i}.local" group-title="Live",Channel {i}')
+            lines.append(f"{self.base_url}/live/{USERNAME}/{PASSWORD}/{i}.ts")
+        return web.Response(text="\n".join(lines), content_type="audio/x-mpegurl")
+
+    async def _xmltv(self, request: web.Request) -> web.StreamResponse:
+        failure = await self._api_delay()
+        if failure:
+            return failure
+        response = web.StreamResponse(headers={"Content-Type": "application/xml"})
+        await response.prepare(request)
+        await response.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="mock-panel">\n')
+        for i in range(1, self.streams + 1):
+            await response.write(f'<channel id="ch{i}.local"><display-name>Channel {i}</display-name></channel>\n'.encode())
+        for i in range(1, self.streams + 1):
+            chunk = "".join(
+                f'<programme start="20250101{hour:02d}0000 +0000" stop="20250101{hour + 1:02d}0000 +0000" '
+                f'channel="ch{i}.local"><title>Show {hour}</title></programme>\n'
+                for hour in range(0, 23, 2)
+            )
+            await response.write(chunk.encode())
+        await response.write(b"</tv>\n")
+        return response
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        # Réponse déterministe par flux : le même flux échoue à chaque test
+        stream = request.match_info["stream"]
+        if random.Random(f"{self.seed}-{stream}").random() < self.stream_failure_rate:
+            return web.Response(status=404)
+        if request.method != "GET" or not self.stream_chunks:
+            return web.Response(status=200, content_type="video/mp2t")
+        # Flux continu : blocs numérotés de 1316 octets (la taille de 7 paquets TS)
+        response = web.StreamResponse(headers={"Content-Type": "video/mp2t"})
+        await response.prepare(request)
+        self.open_streams += 1
+        self.peak_streams = max(self.peak_streams, self.open_streams)
+        try:
+            for i in range(self.stream_chunks):
+                await response.write(bytes([0x47, i % 256]) * 658)
+                await asyncio.sleep(self.stream_interval)
+        finally:
+            self.open_streams -= 1
+        return response
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=10000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-radio-api", action="store_true")
+    args = parser.parse_args()
+
+    async def serve():
+        panel = MockPanel(args.streams, latency=args.latency, failure_rate=args.failure_rate,
+                          radio_api=not args.no_radio_api)
+        await panel.start(args.host, args.port)
+        print(f"Mock panel listening, account URL: {panel.url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await panel.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
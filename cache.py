@@ -8,6 +8,8 @@ from typing import Dict, Any, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from metrics import METRICS
+
 @dataclass
 class CacheEntry:
     """Représente une entrée dans le cache"""
@@ -42,18 +44,23 @@ class ServerCache:
     Gestionnaire de cache pour les informations serveur
     """
     
-    def __init__(self, max_age_seconds: int = 300, max_items: int = 100):
+    def __init__(self, max_age_seconds: int = 300, max_items: int = 100, name: str = "default"):
         """
         Initialise le cache
         
         Args:
             max_age_seconds: Durée de vie maximale d'une entrée en secondes (par défaut: 300s = 5min)
             max_items: Nombre maximum d'entrées dans le cache (par défaut: 100)
+            name: Nom du cache dans les métriques (par défaut: default)
         """
         self.max_age = max_age_seconds
         self.max_items = max_items
+        self.name = name
         self.cache: Dict[str, CacheEntry] = {}
         self.access_times: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lookups = METRICS.counter('iptv_cache_lookups_total', 'Cache lookups by cache and result')
         
     def get(self, key: str) -> Optional[Any]:
         """
@@ -65,35 +72,42 @@ class ServerCache:
         Returns:
             Les données si trouvées et non expirées, sinon None
         """
-        if key not in self.cache:
-            return None
-            
-        entry = self.cache[key]
+        entry = self.cache.get(key)
         
         # Vérifier si l'entrée est expirée
-        if entry.is_expired:
+        if entry is not None and entry.is_expired:
             self._remove(key)
+            entry = None
+        
+        if entry is None:
+            self.misses += 1
+            self._lookups.inc(cache=self.name, result="miss")
             return None
         
         # Mettre à jour le temps d'accès pour LRU
         self.access_times[key] = time.time()
+        self.hits += 1
+        self._lookups.inc(cache=self.name, result="hit")
         
         return entry.data
     
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, touch: bool = True) -> None:
         """
         Ajoute ou met à jour une entrée dans le cache
         
         Args:
             key: Clé de l'entrée
             value: Données à stocker
+            touch: Mettre à jour le temps d'accès (False pour un rafraîchissement en arrière-plan)
         """
-        # Nettoyer les entrées expirées avant d'ajouter
-        self._cleanup_expired()
-        
-        # Vérifier si on dépasse la limite d'items
-        if len(self.cache) >= self.max_items:
-            self._evict_lru()
+        # Nettoyer les entrées expirées seulement quand le cache est plein,
+        # pour que set() reste en O(1) sur les caches de plusieurs milliers d'entrées
+        if key not in self.cache and len(self.cache) >= self.max_items:
+            self._cleanup_expired()
+            
+            # Vérifier si on dépasse toujours la limite d'items
+            if len(self.cache) >= self.max_items:
+                self._evict_lru()
         
         # Ajouter ou mettre à jour l'entrée
         self.cache[key] = CacheEntry(
@@ -101,7 +115,8 @@ class ServerCache:
             timestamp=time.time(),
             ttl=self.max_age
         )
-        self.access_times[key] = time.time()
+        if touch or key not in self.access_times:
+            self.access_times[key] = time.time()
     
     def delete(self, key: str) -> bool:
         """
@@ -135,7 +150,10 @@ class ServerCache:
             'size': len(self.cache),
             'max_items': self.max_items,
             'max_age_seconds': self.max_age,
-            'keys': list(self.cache.keys())
+            'keys': list(self.cache.keys()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
         }
     
     def _remove(self, key: str) -> bool:
@@ -0,0 +1,229 @@
+"""
+Module de catalogue compact pour l'application IPTV to M3U Converter
+Ne conserve des réponses player_api que les champs utiles à la génération des playlists
+"""
+
+import sys
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+
+class StreamRecord:
+    """Représente un flux du catalogue (live, radio ou VOD)"""
+
+    __slots__ = ('stream_id', 'name', 'category_id', 'icon', 'extension', 'epg_id', 'archive_days')
+
+    def __init__(self, stream_id: str, name: str, category_id: str, icon: str = "", extension: str = "",
+                 epg_id: str = "", archive_days: int = 0):
+        self.stream_id = stream_id
+        self.name = name
+        self.category_id = category_id
+        self.icon = icon
+        self.extension = extension
+        self.epg_id = epg_id
+        self.archive_days = archive_days
+
+    def __repr__(self) -> str:
+        return f"StreamRecord({self.stream_id!r}, {self.name!r}, {self.category_id!r})"
+
+
+class Catalog:
+    """
+    Catalogue compact de flux, stocké en colonnes
+
+    Les dictionnaires issus de `json.loads` contiennent 15 à 25 clés par flux,
+    dont la plupart ne servent jamais. Le catalogue ne garde que les champs
+    nécessaires : l'identifiant, le nom, l'icône et l'identifiant EPG sont concaténés en UTF-8
+    dans un seul tampon indexé par des offsets, et les catégories et
+    extensions, très répétées, sont internées et référencées par index.
+    Les `StreamRecord` ne sont créés qu'à la lecture.
+    """
+
+    # Nombre de champs texte stockés dans le tampon par flux (id, nom, icône, EPG)
+    _TEXT_FIELDS = 4
+
+    def __init__(self, records: Iterable[StreamRecord] = ()):
+        """
+        Initialise le catalogue
+
+        Args:
+            records: Enregistrements à ajouter au catalogue
+        """
+        self._text = bytearray()
+        self._offsets = array('I', [0])
+        self._category_col = array('I')
+        self._extension_col = array('H')
+        self._archive_col = array('H')
+        self._categories: List[str] = []
+        self._category_index: Dict[str, int] = {}
+        self._extensions: List[str] = []
+        self._extension_index: Dict[str, int] = {}
+        for record in records:
+            self.append(record.stream_id, record.name, record.category_id, record.icon, record.extension,
+                        record.epg_id, record.archive_days)
+
+    def append(self, stream_id: Any, name: str, category_id: Any, icon: str = "", extension: str = "",
+               epg_id: str = "", archive_days: int = 0) -> None:
+        """
+        Ajoute un flux au catalogue
+
+        Args:
+            stream_id: Identifiant du flux
+            name: Nom du flux
+            category_id: Identifiant de la catégorie
+            icon: URL du logo
+            extension: Extension du conteneur (VOD)
+            epg_id: Identifiant EPG de la chaîne (tvg-id)
+            archive_days: Nombre de jours de replay disponibles (0 si aucun)
+        """
+        for value in (str(stream_id), name, icon, epg_id):
+            self._text += value.encode('utf-8')
+            self._offsets.append(len(self._text))
+        category_id = str(category_id) if category_id is not None else ""
+        self._category_col.append(self._intern(category_id, self._categories, self._category_index))
+        self._extension_col.append(self._intern(extension, self._extensions, self._extension_index))
+        self._archive_col.append(min(max(archive_days, 0), 0xFFFF))
+
+    @classmethod
+    def from_json(cls, items: Any, id_key: str = "stream_id") -> 'Catalog':
+        """
+        Construit un catalogue à partir d'une liste de flux player_api
+
+        Les flux sans nom ou sans identifiant sont ignorés.
+
+        Args:
+            items: Liste décodée de la réponse get_*_streams
+            id_key: Clé contenant l'identifiant du flux
+
+        Returns:
+            Le catalogue compact
+        """
+        catalog = cls()
+        if not isinstance(items, list):
+            return catalog
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            name = item.get("name", "")
+            stream_id = item.get(id_key, "")
+            if not (name and stream_id):
+                continue
+            catalog.append(
+                stream_id,
+                str(name),
+                item.get("category_id", ""),
+                str(item.get("stream_icon") or ""),
+                str(item.get("container_extension") or ""),
+                str(item.get("epg_channel_id") or ""),
+                archive_days(item.get("tv_archive"), item.get("tv_archive_duration"))
+            )
+        return catalog
+
+    def filter(self, predicate: Callable[[StreamRecord], bool]) -> 'Catalog':
+        """
+        Retourne un nouveau catalogue avec les flux qui vérifient le prédicat
+
+        Args:
+            predicate: Fonction appelée pour chaque enregistrement
+
+        Returns:
+            Le catalogue filtré
+        """
+        return Catalog(record for record in self if predicate(record))
+
+    def nbytes(self) -> int:
+        """Retourne la taille approximative des colonnes en octets"""
+        return (len(self._text) + self._offsets.itemsize * len(self._offsets)
+                + self._category_col.itemsize * len(self._category_col)
+                + self._extension_col.itemsize * len(self._extension_col)
+                + self._archive_col.itemsize * len(self._archive_col))
+
+    def _intern(self, value: str, values: List[str], index: Dict[str, int]) -> int:
+        """Retourne l'index d'une valeur répétée, en l'ajoutant si nécessaire"""
+        position = index.get(value)
+        if position is None:
+            position = len(values)
+            values.append(sys.intern(value))
+            index[value] = position
+        return position
+
+    def __getitem__(self, position: int) -> StreamRecord:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("catalog index out of range")
+        base = position * self._TEXT_FIELDS
+        offsets = self._offsets
+        text = self._text
+        return StreamRecord(
+            text[offsets[base]:offsets[base + 1]].decode('utf-8'),
+            text[offsets[base + 1]:offsets[base + 2]].decode('utf-8'),
+            self._categories[self._category_col[position]],
+            text[offsets[base + 2]:offsets[base + 3]].decode('utf-8'),
+            self._extensions[self._extension_col[position]],
+            text[offsets[base + 3]:offsets[base + 4]].decode('utf-8'),
+            self._archive_col[position]
+        )
+
+    def __iter__(self) -> Iterator[StreamRecord]:
+        # Version déroulée de __getitem__ : c'est le chemin chaud du rendu
+        text = self._text
+        offsets = self._offsets
+        categories = self._categories
+        extensions = self._extensions
+        extension_col = self._extension_col
+        archive_col = self._archive_col
+        base = 0
+        for position, category in enumerate(self._category_col):
+            start, name_start, icon_start, epg_start, end = offsets[base:base + 5]
+            yield StreamRecord(
+                text[start:name_start].decode('utf-8'),
+                text[name_start:icon_start].decode('utf-8'),
+                categories[category],
+                text[icon_start:epg_start].decode('utf-8'),
+                extensions[extension_col[position]],
+                text[epg_start:end].decode('utf-8'),
+                archive_col[position]
+            )
+            base += self._TEXT_FIELDS
+
+    def __len__(self) -> int:
+        return len(self._category_col)
+
+
+def archive_days(tv_archive: Any, tv_archive_duration: Any) -> int:
+    """
+    Retourne le nombre de jours de replay d'une chaîne
+
+    Args:
+        tv_archive: Indicateur de replay player_api (1 / "1" si disponible)
+        tv_archive_duration: Durée du replay en jours
+
+    Returns:
+        Le nombre de jours, 0 si le replay n'est pas disponible
+    """
+    if str(tv_archive) != "1":
+        return 0
+    try:
+        return int(tv_archive_duration or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_category_map(categories: Any) -> Dict[str, str]:
+    """
+    Construit la table identifiant -> nom des catégories
+
+    Args:
+        categories: Liste décodée de la réponse get_*_categories
+
+    Returns:
+        Dictionnaire des noms de catégories par identifiant
+    """
+    if not isinstance(categories, list):
+        return {}
+    return {
+        sys.intern(str(c["category_id"])): c["category_name"]
+        for c in categories
+        if isinstance(c, dict) and "category_id" in c and "category_name" in c
+    }
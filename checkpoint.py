@@ -0,0 +1,174 @@
+"""
+Module de points de reprise pour l'application IPTV to M3U Converter
+Journalise les résultats des tests de chaînes pour reprendre un test interrompu
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ChannelTestJournal:
+    """
+    Journal append-only des résultats de tests de chaînes
+
+    Chaque résultat est ajouté sur une ligne `<0|1> <empreinte>`. Les URLs de
+    flux contiennent les identifiants du compte : seule leur empreinte SHA-256
+    est écrite, dans un fichier lisible par son seul propriétaire (0600). Le
+    journal n'est lu qu'une seule fois à l'ouverture ; les ajouts suivants se
+    contentent d'écrire en fin de fichier. Une dernière ligne incomplète (arrêt
+    brutal pendant l'écriture) est retirée à la reprise, pour que le résultat
+    suivant ne s'y colle pas.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100):
+        """
+        Initialise le journal
+
+        Args:
+            path: Chemin du fichier journal
+            flush_every: Nombre de résultats entre deux écritures sur disque (par défaut: 100)
+        """
+        self.path = Path(path)
+        self.flush_every = max(1, flush_every)
+        self.results: Dict[str, bool] = {}
+        self._file = None
+        self._pending = 0
+
+    def open(self, resume: bool = True) -> Dict[str, bool]:
+        """
+        Ouvre le journal en ajout
+
+        Args:
+            resume: Relire les résultats existants (sinon le journal est vidé)
+
+        Returns:
+            Les résultats déjà enregistrés, par empreinte d'URL (voir get)
+        """
+        self.results = self._read() if resume else {}
+        if resume and self.path.exists():
+            self._drop_partial_line()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if resume else os.O_TRUNC)
+        fd = os.open(self.path, flags, 0o600)
+        # Journal créé par une version précédente avec les permissions par défaut
+        os.chmod(self.path, 0o600)
+        self._file = os.fdopen(fd, 'a' if resume else 'w', encoding='utf-8')
+        return self.results
+
+    def get(self, url: str) -> Optional[bool]:
+        """
+        Retourne le résultat enregistré d'une URL
+
+        Args:
+            url: URL de la chaîne
+
+        Returns:
+            True ou False selon le dernier résultat, None si l'URL n'a pas été testée
+        """
+        return self.results.get(url_key(url))
+
+    def record(self, url: str, working: bool) -> None:
+        """
+        Enregistre le résultat d'un test
+
+        Args:
+            url: URL de la chaîne testée
+            working: True si la chaîne répond
+        """
+        key = url_key(url)
+        self.results[key] = working
+        self._file.write(f"{1 if working else 0} {key}\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Écrit les résultats en attente sur disque"""
+        if self._file:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self, remove: bool = False) -> None:
+        """
+        Ferme le journal
+
+        Args:
+            remove: Supprimer le fichier (test terminé, plus rien à reprendre)
+        """
+        if self._file:
+            self._file.close()
+            self._file = None
+        if remove and self.path.exists():
+            self.path.unlink()
+
+    def _read(self) -> Dict[str, bool]:
+        """Lit les résultats existants du journal"""
+        results: Dict[str, bool] = {}
+        if not self.path.exists():
+            return results
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # Ignorer une ligne tronquée par un arrêt brutal
+                if not line.endswith('\n') or len(line) < 3 or line[1] != ' ':
+                    continue
+                key = line[2:-1]
+                # Journal d'une version précédente : URL en clair
+                if '://' in key:
+                    key = url_key(key)
+                results[key] = line[0] == '1'
+        return results
+
+    def _drop_partial_line(self) -> None:
+        """Tronque le journal après sa dernière ligne complète"""
+        with open(self.path, 'rb+') as f:
+            end = pos = f.seek(0, os.SEEK_END)
+            keep = 0
+            # Relire la fin du fichier par blocs jusqu'au dernier saut de ligne
+            while pos > 0:
+                start = max(0, pos - 4096)
+                f.seek(start)
+                index = f.read(pos - start).rfind(b'\n')
+                if index >= 0:
+                    keep = start + index + 1
+                    break
+                pos = start
+            if keep < end:
+                f.truncate(keep)
+
+    def __enter__(self) -> 'ChannelTestJournal':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Conserver le journal si le test a été interrompu
+        self.close(remove=exc_type is None)
+
+
+def url_key(url: str) -> str:
+    """
+    Calcule l'empreinte sous laquelle le résultat d'une URL est journalisé
+
+    Args:
+        url: URL de la chaîne
+
+    Returns:
+        L'empreinte SHA-256 de l'URL, en hexadécimal
+    """
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def default_journal_path(host: Optional[str], username: Optional[str], directory: str = "checkpoints") -> str:
+    """
+    Construit le chemin du journal associé à un compte
+
+    Args:
+        host: Hôte du serveur IPTV
+        username: Nom d'utilisateur du compte
+        directory: Répertoire des journaux
+
+    Returns:
+        Le chemin du fichier journal
+    """
+    name = f"{host}_{username}.journal".replace(":", "_").replace("/", "_")
+    return str(Path(directory) / name)
@@ -0,0 +1,146 @@
+"""
+Module de compression pour l'application IPTV to M3U Converter
+Négocie la compression HTTP, décompresse les réponses au fil de l'eau et écrit des playlists compressées
+"""
+
+import gzip
+import io
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    zstandard = None
+
+# Encodages annoncés au serveur, du plus efficace au moins efficace
+ACCEPT_ENCODING = ', '.join((['br'] if brotli else []) + ['gzip', 'deflate'])
+
+# Extensions des fichiers compressés pris en charge à l'écriture
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+@dataclass
+class TransferStats:
+    """Octets transférés pendant une opération"""
+    bytes_received: int = 0  # Octets reçus sur le réseau (compressés)
+    bytes_decoded: int = 0  # Octets après décompression
+    bytes_written: int = 0  # Octets écrits sur disque
+
+    def to_dict(self) -> dict:
+        """Convertit les statistiques en dictionnaire, avec le taux de compression"""
+        ratio = self.bytes_decoded / self.bytes_received if self.bytes_received else 0.0
+        return {
+            'bytes_received': self.bytes_received,
+            'bytes_decoded': self.bytes_decoded,
+            'bytes_written': self.bytes_written,
+            'compression_ratio': round(ratio, 2)
+        }
+
+
+class StreamDecoder:
+    """
+    Décompresseur incrémental d'un corps de réponse HTTP
+
+    Chaque morceau reçu est décompressé dès son arrivée : le corps compressé
+    n'est jamais conservé en entier en mémoire.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        """
+        Initialise le décompresseur
+
+        Args:
+            encoding: Valeur de l'en-tête Content-Encoding (None ou 'identity' : aucun décodage)
+
+        Raises:
+            ValueError: Si l'encodage n'est pas pris en charge
+        """
+        encoding = (encoding or 'identity').strip().lower()
+        if encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            # zlib (RFC 1950) ou deflate brut selon les serveurs : l'en-tête est détecté automatiquement
+            self._decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        elif encoding == 'br' and brotli is not None:
+            self._decompressor = brotli.Decompressor()
+        elif encoding == 'identity':
+            self._decompressor = None
+        else:
+            raise ValueError(f"Unsupported Content-Encoding '{encoding}'")
+        self.encoding = encoding
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """
+        Décompresse un morceau du corps
+
+        Args:
+            chunk: Octets reçus
+
+        Returns:
+            Les octets décompressés disponibles
+        """
+        if self._decompressor is None:
+            return chunk
+        if brotli is not None and isinstance(self._decompressor, brotli.Decompressor):
+            return self._decompressor.process(chunk)
+        return self._decompressor.decompress(chunk)
+
+    def flush(self) -> bytes:
+        """Retourne les derniers octets décompressés"""
+        if self._decompressor is None or not hasattr(self._decompressor, 'flush'):
+            return b''
+        return self._decompressor.flush()
+
+
+def compression_suffix(path: str) -> str:
+    """
+    Retourne l'extension de compression d'un chemin
+
+    Args:
+        path: Chemin du fichier
+
+    Returns:
+        '.gz', '.zst' ou '' pour un fichier non compressé
+    """
+    suffix = Path(path).suffix.lower()
+    return suffix if suffix in COMPRESSED_SUFFIXES else ''
+
+
+def open_text(path: str, encoding: str = 'utf-8', newline: Optional[str] = None,
+              buffering: int = 1024 * 1024) -> IO[str]:
+    """
+    Ouvre un fichier texte en écriture, compressé selon son extension
+
+    Les fichiers `.gz` et `.zst` sont compressés au fil des écritures, sans
+    construire le contenu compressé en mémoire.
+
+    Args:
+        path: Chemin du fichier (.gz, .zst ou autre)
+        encoding: Encodage du texte
+        newline: Traduction des fins de ligne (comme pour `open`)
+        buffering: Taille du tampon d'écriture
+
+    Returns:
+        Le fichier texte ouvert en écriture
+
+    Raises:
+        ValueError: Si la compression zstd est demandée sans le paquet zstandard
+    """
+    suffix = compression_suffix(path)
+    if suffix == '.gz':
+        raw = gzip.open(path, 'wb', compresslevel=6)
+    elif suffix == '.zst':
+        if zstandard is None:
+            raise ValueError("Writing .zst files requires the 'zstandard' package")
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'), closefd=True)
+    else:
+        return open(path, 'w', encoding=encoding, newline=newline, buffering=buffering)
+    return io.TextIOWrapper(raw, encoding=encoding, newline=newline)
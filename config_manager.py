@@ -2,9 +2,21 @@
 Gestionnaire de configuration pour l'application IPTV to M3U Converter
 """
 
+import atexit
 import configparser
+import logging
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+
+# Marqueur d'une clé absente dans le cache des valeurs lues
+_MISSING = object()
+
+logger = logging.getLogger(__name__)
 
 
 class ConfigManager:
@@ -12,30 +24,293 @@ class ConfigManager:
     Gestionnaire de configuration pour l'application
     """
     
-    def __init__(self, config_file: str = "config.ini"):
+    def __init__(self, config_file: str = "config.ini", lazy: bool = False, flush_delay: float = 0.0):
         """
         Initialise le gestionnaire de configuration
         
         Args:
             config_file: Chemin vers le fichier de configuration
+            lazy: Ne lire (ou créer) le fichier qu'au premier accès à la configuration
+            flush_delay: Délai en secondes avant l'écriture des modifications, qui sont
+                regroupées en une seule écriture (par défaut: 0, écriture immédiate)
         """
         self.config_file = Path(config_file)
-        self.config = configparser.ConfigParser()
-        self.load()
+        self.flush_delay = flush_delay
+        self._config: Optional[configparser.ConfigParser] = None
+        # Valeurs déjà converties, par (section, clé, type de la valeur par défaut)
+        self._values: Dict[Tuple[str, str, type], Any] = {}
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        # Date de modification et taille du fichier lors de la dernière lecture ou écriture
+        self._file_stamp: Optional[Tuple[int, int]] = None
+        # Contenu du fichier lors de la dernière lecture ou écriture, pour isoler les modifications locales
+        self._saved: Dict[str, Dict[str, str]] = {}
+        self._listeners: List[Callable[['ConfigManager'], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        if flush_delay > 0:
+            atexit.register(self.flush)
+        if not lazy:
+            self.load()
+    
+    @property
+    def config(self) -> configparser.ConfigParser:
+        """Configuration chargée, lue depuis le fichier au premier accès"""
+        if self._config is None:
+            self.load()
+        return self._config
     
     def load(self) -> None:
         """Charge la configuration depuis le fichier"""
-        if self.config_file.exists():
-            self.config.read(self.config_file)
-        else:
-            # Créer un fichier de configuration par défaut
-            self._create_default_config()
-            self.save()
+        with self._lock:
+            if self._config is None:
+                self._config = configparser.ConfigParser()
+            self._values.clear()
+            if self.config_file.exists():
+                self.config.read(self.config_file)
+                self._file_stamp = self._stat()
+                self._saved = self._snapshot()
+            else:
+                # Créer un fichier de configuration par défaut
+                self._create_default_config()
+                self.save()
     
     def save(self) -> None:
-        """Sauvegarde la configuration dans le fichier"""
-        with open(self.config_file, 'w') as f:
-            self.config.write(f)
+        """
+        Sauvegarde la configuration dans le fichier
+        
+        Le contenu est écrit dans un fichier temporaire du même répertoire puis
+        renommé : une interruption ne laisse jamais un config.ini tronqué. Les
+        permissions du fichier existant sont conservées.
+        """
+        with self._lock:
+            self._cancel_timer()
+            self._dirty = False
+            directory = self.config_file.parent
+            fd, temp_path = tempfile.mkstemp(prefix=f".{self.config_file.name}.", suffix=".tmp", dir=directory)
+            try:
+                # mkstemp crée le fichier en 0600 : reprendre le mode qu'aurait un fichier ordinaire
+                os.chmod(temp_path, self._file_mode())
+                with os.fdopen(fd, 'w') as f:
+                    self.config.write(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.config_file)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            # Nos propres écritures ne doivent pas déclencher de rechargement
+            self._file_stamp = self._stat()
+            self._saved = self._snapshot()
+    
+    def _snapshot(self) -> Dict[str, Dict[str, str]]:
+        """Retourne une copie brute (sans interpolation) du contenu de chaque section"""
+        return {section: {key: self.config.get(section, key, raw=True) for key in self.config.options(section)}
+                for section in self.config.sections()}
+    
+    def _merge_pending(self, parser: configparser.ConfigParser) -> None:
+        """
+        Applique à une configuration relue les modifications locales pas encore écrites
+        
+        Args:
+            parser: Configuration lue depuis le fichier modifié
+        """
+        current = self._snapshot()
+        for section in self._saved.keys() - current.keys():
+            parser.remove_section(section)
+        for section, values in current.items():
+            before = self._saved.get(section)
+            if before is None and not parser.has_section(section):
+                parser.add_section(section)
+            before = before or {}
+            for key, value in values.items():
+                if before.get(key) != value:
+                    if not parser.has_section(section):
+                        parser.add_section(section)
+                    parser.set(section, key, value)
+            for key in before.keys() - values.keys():
+                if parser.has_section(section):
+                    parser.remove_option(section, key)
+    
+    def _file_mode(self) -> int:
+        """Retourne les permissions du fichier existant, ou celles d'un nouveau fichier selon l'umask"""
+        try:
+            return stat.S_IMODE(self.config_file.stat().st_mode)
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Retourne la date de modification et la taille du fichier (None s'il n'existe pas)"""
+        try:
+            stat = self.config_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Recharge le fichier s'il a été modifié depuis la dernière lecture ou écriture
+        
+        Les modifications locales pas encore écrites (écriture différée) sont
+        appliquées par-dessus le fichier modifié puis écrites : seules les clés
+        modifiées localement l'emportent sur celles du fichier. Un fichier
+        illisible (en cours d'édition) est ignoré et la configuration en cours
+        conservée. Les fonctions enregistrées avec add_listener sont appelées
+        après le rechargement.
+        
+        Returns:
+            True si la configuration a été rechargée
+        """
+        with self._lock:
+            if self._config is None or self._batch_depth:
+                return False
+            stamp = self._stat()
+            if stamp is None or stamp == self._file_stamp:
+                return False
+            self._file_stamp = stamp
+            parser = configparser.ConfigParser()
+            try:
+                parser.read(self.config_file)
+            except configparser.Error as e:
+                logger.warning("Config reload skipped, %s is invalid: %s", self.config_file, e)
+                return False
+            pending = self._dirty
+            if pending:
+                self._merge_pending(parser)
+            self._config = parser
+            self._values.clear()
+            if pending:
+                self.save()
+            else:
+                self._saved = self._snapshot()
+            listeners = list(self._listeners)
+        
+        for listener in listeners:
+            try:
+                listener(self)
+            except Exception:
+                logger.exception("Config reload listener failed")
+        return True
+    
+    def add_listener(self, callback: Callable[['ConfigManager'], None]) -> None:
+        """
+        Enregistre une fonction appelée après chaque rechargement du fichier
+        
+        Args:
+            callback: Fonction recevant le gestionnaire (appelée depuis le thread de surveillance)
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def remove_listener(self, callback: Callable[['ConfigManager'], None]) -> None:
+        """Retire une fonction enregistrée avec add_listener"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def watch(self, interval: float = 2.0) -> None:
+        """
+        Surveille le fichier dans un thread démon et le recharge quand il change
+        
+        Args:
+            interval: Intervalle de vérification en secondes (par défaut: 2s)
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        
+        def poll():
+            while not self._stop_watching.wait(interval):
+                self.reload_if_changed()
+        
+        self._watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+        self._watcher.start()
+    
+    def watch_if_enabled(self) -> bool:
+        """
+        Démarre watch() si la section [reload] l'active (désactivé par défaut)
+        
+        À appeler depuis le point d'entrée d'un processus de longue durée
+        (interface, serveur de playlists), pas depuis une bibliothèque.
+        
+        Returns:
+            True si le fichier est surveillé
+        """
+        if not self.get('reload', 'enabled', False):
+            return False
+        self.watch(self.get('reload', 'interval_seconds', 2.0))
+        return True
+    
+    def stop_watching(self) -> None:
+        """Arrête la surveillance du fichier"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def flush(self) -> None:
+        """Écrit immédiatement les modifications en attente"""
+        with self._lock:
+            if self._dirty:
+                self.save()
+    
+    @contextmanager
+    def transaction(self) -> Iterator['ConfigManager']:
+        """
+        Regroupe plusieurs modifications en une seule écriture
+        
+        Les appels à set, delete et delete_section faits dans le bloc ne
+        réécrivent pas le fichier : il est écrit une fois à la sortie du bloc
+        le plus externe. Si le bloc lève une exception, toutes ses
+        modifications sont annulées.
+        
+        Yields:
+            Le gestionnaire de configuration
+        """
+        with self._lock:
+            if self._batch_depth == 0:
+                snapshot = {section: dict(self.config[section]) for section in self.config.sections()}
+                dirty = self._dirty
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if self._batch_depth == 1:
+                    self.config.clear()
+                    self.config.read_dict(snapshot)
+                    self._values.clear()
+                    self._dirty = dirty
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._changed(invalidate=False)
+    
+    def _changed(self, invalidate: bool = True) -> None:
+        """Enregistre une modification : écriture immédiate, différée ou en fin de transaction"""
+        if invalidate:
+            self._values.clear()
+        if self._batch_depth:
+            self._dirty = True
+            return
+        if not self._dirty and not invalidate:
+            return
+        self._dirty = True
+        if self.flush_delay <= 0:
+            self.save()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _cancel_timer(self) -> None:
+        """Annule l'écriture différée programmée"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
     
     def _create_default_config(self) -> None:
         """Crée un fichier de configuration par défaut"""
@@ -49,12 +324,131 @@ class ConfigManager:
         self.config['cache'] = {
             'enabled': 'True',
             'max_age_seconds': '300',
-            'max_items': '100'
+            'max_items': '100',
+            'catalog_max_age_seconds': '300',
+            'catalog_max_items': '20'
+        }
+        
+        self.config['refresh'] = {
+            'enabled': 'False',
+            'refresh_ahead': '0.8',
+            'jitter': '0.1',
+            'max_concurrent': '4',
+            'idle_seconds': '900'
         }
         
         self.config['testing'] = {
             'max_concurrent_tests': '10',
-            'timeout_seconds': '5'
+            'timeout_seconds': '5',
+            'checkpoint_dir': 'checkpoints',
+            'checkpoint_flush_every': '100'
+        }
+        
+        self.config['series'] = {
+            'max_concurrent_requests': '8',
+            'cache_max_age_seconds': '3600',
+            'cache_max_items': '10000'
+        }
+        
+        self.config['retry'] = {
+            'max_attempts': '3',
+            'base_delay': '0.5',
+            'max_delay': '10.0',
+            'jitter': '1.0',
+            'retry_statuses': '408,429,500,502,503,504'
+        }
+        
+        # Les catalogues volumineux méritent plus de tentatives
+        self.config['retry.get_vod_streams'] = {
+            'max_attempts': '5'
+        }
+        
+        self.config['retry.get_series_info'] = {
+            'max_attempts': '3'
+        }
+        
+        self.config['rate_limit'] = {
+            'enabled': 'True',
+            'requests_per_second': '50.0',
+            'burst': '100'
+        }
+        
+        self.config['circuit_breaker'] = {
+            'failure_threshold': '5',
+            'reset_timeout_seconds': '30.0'
+        }
+        
+        self.config['performance'] = {
+            'json_backend': 'auto',
+            'typed_decoding': 'True',
+            'process_workers': 'auto',
+            'offload_min_bytes': '1048576'
+        }
+        
+        self.config['radio'] = {
+            'keywords': 'radio,radios,radiostation,radiostations,station,fm,am',
+            'match_categories': 'False'
+        }
+        
+        self.config['epg'] = {
+            'read_timeout_seconds': '60'
+        }
+        
+        self.config['compression'] = {
+            'chunk_size': '262144'
+        }
+        
+        self.config['metrics'] = {
+            'exporter': 'none',
+            'path': ''
+        }
+        
+        self.config['tracing'] = {
+            'enabled': 'False',
+            'path': 'traces.jsonl',
+            'service_name': 'iptv-to-m3u'
+        }
+        
+        self.config['merge'] = {
+            'max_concurrent_accounts': '4'
+        }
+        
+        self.config['health'] = {
+            'path': '',
+            'smoothing': '0.3',
+            'max_items': '200000'
+        }
+        
+        self.config['server'] = {
+            'host': '127.0.0.1',
+            'port': '8088',
+            'public_url': '',
+            'kinds': 'live',
+            'epg': 'False',
+            'ttl_seconds': '3600',
+            'retry_seconds': '60',
+            'gzip_level': '6',
+            'proxy': 'False'
+        }
+        
+        self.config['accounts'] = {
+            'path': 'accounts.db'
+        }
+        
+        self.config['proxy'] = {
+            'max_connections': '0',
+            'overflow': 'queue',
+            'queue_timeout_seconds': '30',
+            'buffer_chunks': '256',
+            'read_timeout_seconds': '30'
+        }
+        
+        # Comptes servis par server.py : nom = URL du compte
+        self.config['server_accounts'] = {}
+        
+        self.config['reload'] = {
+            'enabled': 'False',
+            'interval_seconds': '2.0'
         }
         
         self.config['ui'] = {
@@ -82,6 +476,24 @@ class ConfigManager:
         Returns:
             La valeur de configuration
         """
+        # Valeur déjà convertie : évite configparser (interpolation, conversion) à chaque appel
+        cache_key = (section, key, type(default))
+        value = self._values.get(cache_key)
+        if value is None:
+            # Sous le verrou : un rechargement concurrent ne peut pas vider le cache
+            # entre la lecture de l'ancienne valeur et son enregistrement
+            with self._lock:
+                config = self.config
+                if section not in config or key not in config[section]:
+                    value = _MISSING
+                else:
+                    value = self._read(section, key, default)
+                self._values[cache_key] = value
+        # Clé absente : la valeur par défaut de l'appelant s'applique
+        return default if value is _MISSING else value
+    
+    def _read(self, section: str, key: str, default: Any) -> Any:
+        """Lit et convertit une valeur selon le type de la valeur par défaut"""
         try:
             if section not in self.config:
                 return default
@@ -110,11 +522,12 @@ class ConfigManager:
             key: Clé de la configuration
             value: Valeur à stocker
         """
-        if section not in self.config:
-            self.config[section] = {}
-        
-        self.config[section][key] = str(value)
-        self.save()
+        with self._lock:
+            if section not in self.config:
+                self.config[section] = {}
+            
+            self.config[section][key] = str(value)
+            self._changed()
     
     def get_section(self, section: str) -> Dict[str, Any]:
         """
@@ -144,6 +557,31 @@ class ConfigManager:
         
         return result
     
+    def get_raw_section(self, section: str) -> Dict[str, str]:
+        """
+        Lit une section telle qu'elle est écrite dans le fichier
+        
+        Les clés gardent leur casse et les valeurs ne sont ni interpolées ni
+        converties : pour les sections dont les clés sont des noms choisis par
+        l'utilisateur et les valeurs des URLs, où « % » est légitime.
+        
+        Args:
+            section: Section du fichier de configuration
+            
+        Returns:
+            Dictionnaire des valeurs brutes de la section (vide si elle n'existe pas)
+        """
+        with self._lock:
+            # Crée le fichier par défaut au besoin et y écrit les modifications en attente
+            self.config
+            self.flush()
+            parser = configparser.RawConfigParser(interpolation=None)
+            parser.optionxform = str
+            parser.read(self.config_file)
+        if not parser.has_section(section):
+            return {}
+        return dict(parser.items(section))
+    
     def get_all(self) -> Dict[str, Dict[str, Any]]:
         """
         Récupère toutes les configurations
@@ -158,9 +596,10 @@ class ConfigManager:
     
     def reset_to_defaults(self) -> None:
         """Réinitialise la configuration aux valeurs par défaut"""
-        self.config.clear()
-        self._create_default_config()
-        self.save()
+        with self._lock:
+            self.config.clear()
+            self._create_default_config()
+            self._changed()
     
     def delete(self, section: str, key: str) -> None:
         """
@@ -170,9 +609,10 @@ class ConfigManager:
             section: Section du fichier de configuration
             key: Clé de la configuration
         """
-        if section in self.config and key in self.config[section]:
-            del self.config[section][key]
-            self.save()
+        with self._lock:
+            if section in self.config and key in self.config[section]:
+                del self.config[section][key]
+                self._changed()
     
     def delete_section(self, section: str) -> None:
         """
@@ -181,9 +621,10 @@ class ConfigManager:
         Args:
             section: Section du fichier de configuration
         """
-        if section in self.config:
-            del self.config[section]
-            self.save()
+        with self._lock:
+            if section in self.config:
+                del self.config[section]
+                self._changed()
     
     def get_cache_config(self) -> Dict[str, Any]:
         """Récupère la configuration du cache"""
@@ -203,4 +644,6 @@ class ConfigManager:
 
 
 # Instance globale du gestionnaire de configuration
-CONFIG = ConfigManager()
+# Chargée au premier accès : importer un module ne lit ni n'écrit config.ini.
+# Les modifications rapprochées sont regroupées en une écriture par seconde
+CONFIG = ConfigManager(lazy=True, flush_delay=1.0)
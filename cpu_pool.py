@@ -0,0 +1,119 @@
+"""
+Module d'exécution des traitements CPU pour l'application IPTV to M3U Converter
+Déporte le décodage JSON et le rendu des playlists dans un pool de processus
+pour que la boucle d'événements ne fasse que des entrées/sorties
+"""
+
+import asyncio
+import atexit
+import os
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
+
+# multiprocessing n'est importé qu'à la création du pool, pas au démarrage de l'application
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+_executor: Optional['ProcessPoolExecutor'] = None
+_workers = 0
+_min_bytes = 1024 * 1024
+_initializer: Optional[Callable[..., None]] = None
+_initargs: Tuple[Any, ...] = ()
+
+
+def configure(workers: Any = 'auto', min_bytes: int = 1024 * 1024,
+              initializer: Optional[Callable[..., None]] = None, initargs: Tuple[Any, ...] = ()) -> int:
+    """
+    Configure le pool de processus
+
+    Le pool existant est arrêté ; le nouveau est créé à la première utilisation.
+
+    Args:
+        workers: Nombre de processus, 'auto' pour le nombre de cœurs, 0 pour tout exécuter sur place
+        min_bytes: Taille minimale des données pour déporter un traitement (par défaut: 1 Mo)
+        initializer: Fonction appelée au démarrage de chaque processus
+        initargs: Arguments de la fonction d'initialisation
+
+    Returns:
+        Le nombre de processus configuré
+    """
+    global _workers, _min_bytes, _initializer, _initargs
+    shutdown()
+    if str(workers).strip().lower() == 'auto':
+        _workers = os.cpu_count() or 1
+    else:
+        _workers = max(0, int(workers))
+    _min_bytes = min_bytes
+    _initializer = initializer
+    _initargs = initargs
+    return _workers
+
+
+def get_executor() -> Optional['ProcessPoolExecutor']:
+    """Retourne le pool de processus, en le créant si nécessaire"""
+    global _executor
+    if _workers <= 0:
+        return None
+    if _executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn plutôt que fork : le processus parent peut avoir des threads (Qt, boucle asyncio)
+        _executor = ProcessPoolExecutor(
+            max_workers=_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initializer,
+            initargs=_initargs
+        )
+    return _executor
+
+
+async def run_cpu(func: Callable[..., Any], *args: Any, size_hint: int = 0) -> Any:
+    """
+    Exécute un traitement CPU sans bloquer la boucle d'événements
+
+    Les petits traitements restent sur place : le coût de transfert vers un
+    autre processus dépasserait le gain.
+
+    Args:
+        func: Fonction de niveau module (doit pouvoir être sérialisée)
+        *args: Arguments de la fonction
+        size_hint: Taille approximative des données traitées en octets
+
+    Returns:
+        Le résultat de la fonction
+    """
+    executor = get_executor() if size_hint >= _min_bytes else None
+    if executor is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, size_hint: int = 0) -> Any:
+    """
+    Exécute un traitement bloquant (écriture disque, rendu) hors de la boucle d'événements
+
+    Les gros traitements vont dans le pool de processus ; les autres, ou tous
+    si le pool est désactivé, dans le pool de threads de la boucle.
+
+    Args:
+        func: Fonction de niveau module (doit pouvoir être sérialisée)
+        *args: Arguments de la fonction
+        size_hint: Taille approximative des données traitées en octets
+
+    Returns:
+        Le résultat de la fonction
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor() if size_hint >= _min_bytes else None
+    return await loop.run_in_executor(executor, func, *args)
+
+
+def shutdown() -> None:
+    """Arrête le pool de processus"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+atexit.register(shutdown)
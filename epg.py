@@ -0,0 +1,148 @@
+"""
+Module EPG (XMLTV) pour l'application IPTV to M3U Converter
+Filtre un guide XMLTV en flux continu pour ne garder que les chaînes d'une playlist
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+from xml.sax.saxutils import quoteattr
+
+from catalog import Catalog, StreamRecord
+
+# Préfixes de pays (« FR: », « UK | ») et suffixes de qualité ignorés pour rapprocher les noms
+_PREFIX_RE = re.compile(r'^\s*[a-z]{2,3}\s*[:|]\s*')
+_QUALITY_RE = re.compile(r'\b(?:sd|hd|fhd|uhd|4k|hevc|h265)\b')
+_BRACKETS_RE = re.compile(r'[\[(].*?[\])]')
+_NON_ALNUM_RE = re.compile(r'[\W_]+')
+
+
+@dataclass
+class XMLTVResult:
+    """Résultat du filtrage d'un guide XMLTV"""
+    tvg_ids: Dict[int, str] = field(default_factory=dict)  # Position dans le catalogue -> id XMLTV
+    channels: int = 0
+    channels_kept: int = 0
+    programmes: int = 0
+    programmes_kept: int = 0
+
+
+def normalize_channel_name(name: str) -> str:
+    """
+    Normalise un nom de chaîne pour le rapprochement avec le guide
+
+    Args:
+        name: Nom de la chaîne (playlist ou display-name XMLTV)
+
+    Returns:
+        Le nom en minuscules, sans préfixe de pays, qualité ni ponctuation
+    """
+    name = _BRACKETS_RE.sub(' ', _PREFIX_RE.sub('', name.lower()))
+    return _NON_ALNUM_RE.sub('', _QUALITY_RE.sub(' ', name))
+
+
+def filter_xmltv(source_path: str, dest_path: str, catalog: Catalog) -> XMLTVResult:
+    """
+    Filtre un guide XMLTV sur les chaînes d'un catalogue
+
+    Le document est lu avec `iterparse` : chaque élément `<channel>` ou
+    `<programme>` est écrit ou ignoré dès sa fin de lecture, puis libéré, si
+    bien que la mémoire utilisée ne dépend pas de la taille du guide. Une
+    chaîne du guide est rattachée aux flux dont l'`epg_channel_id` correspond
+    à son identifiant ou, à défaut, dont le nom normalisé correspond à l'un de
+    ses `display-name`. Comme l'impose la DTD XMLTV, les chaînes doivent
+    précéder les programmes.
+
+    Fonction de niveau module pour pouvoir être exécutée dans le pool de processus.
+
+    Args:
+        source_path: Chemin du guide XMLTV téléchargé
+        dest_path: Chemin du guide filtré à écrire
+        catalog: Catalogue des chaînes de la playlist
+
+    Returns:
+        Le rattachement des flux aux chaînes du guide et les statistiques de filtrage
+    """
+    by_id: Dict[str, List[int]] = {}
+    by_name: Dict[str, List[int]] = {}
+    for position, record in enumerate(catalog):
+        if record.epg_id:
+            by_id.setdefault(record.epg_id.lower(), []).append(position)
+        by_name.setdefault(normalize_channel_name(record.name), []).append(position)
+    by_name.pop('', None)
+
+    result = XMLTVResult()
+    name_matches: Dict[int, str] = {}
+    kept_channels: Set[str] = set()
+    depth = 0
+    root = None
+
+    with open(dest_path, 'w', encoding='utf-8', buffering=1024 * 1024) as out:
+        for event, elem in ET.iterparse(source_path, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                    attributes = ''.join(f' {key}={quoteattr(value)}' for key, value in elem.attrib.items())
+                    out.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<tv{attributes}>\n')
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+
+            if elem.tag == 'channel':
+                result.channels += 1
+                channel_id = elem.get('id', '')
+                matched = False
+                for position in by_id.get(channel_id.lower(), ()):
+                    result.tvg_ids[position] = channel_id
+                    matched = True
+                for display_name in elem.iterfind('display-name'):
+                    for position in by_name.get(normalize_channel_name(display_name.text or ''), ()):
+                        name_matches.setdefault(position, channel_id)
+                        matched = True
+                if matched:
+                    kept_channels.add(channel_id)
+                    result.channels_kept += 1
+                    _write_element(out, elem)
+            elif elem.tag == 'programme':
+                result.programmes += 1
+                if elem.get('channel') in kept_channels:
+                    result.programmes_kept += 1
+                    _write_element(out, elem)
+            # Libérer les éléments déjà traités
+            root.clear()
+
+        out.write('</tv>\n')
+
+    # Une correspondance par identifiant EPG prime sur une correspondance par nom
+    for position, channel_id in name_matches.items():
+        result.tvg_ids.setdefault(position, channel_id)
+    return result
+
+
+def apply_tvg_ids(catalog: Catalog, tvg_ids: Dict[int, str]) -> Catalog:
+    """
+    Renseigne l'identifiant EPG des flux rattachés au guide
+
+    Args:
+        catalog: Catalogue des chaînes
+        tvg_ids: Identifiants XMLTV par position dans le catalogue
+
+    Returns:
+        Un nouveau catalogue dont les flux rattachés portent l'identifiant du guide
+    """
+    return Catalog(
+        StreamRecord(record.stream_id, record.name, record.category_id, record.icon, record.extension,
+                     tvg_ids.get(position, record.epg_id), record.archive_days)
+        for position, record in enumerate(catalog)
+    )
+
+
+def _write_element(out, elem: ET.Element) -> None:
+    """Écrit un élément XMLTV sur sa propre ligne"""
+    elem.tail = None
+    out.write('  ')
+    out.write(ET.tostring(elem, encoding='unicode'))
+    out.write('\n')
@@ -0,0 +1,243 @@
+"""
+Module d'export multi-format pour l'application IPTV to M3U Converter
+Écrit un catalogue en M3U, M3U plus, JSON ou CSV, en flux continu vers le disque
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Type
+
+from catalog import Catalog
+from compression import open_text
+from playlist import m3u_attribute, m3u_text
+
+
+class PlaylistEntry:
+    """Représente une entrée de playlist prête à être écrite"""
+
+    __slots__ = ('name', 'group', 'logo', 'url', 'tvg_id', 'catchup_days')
+
+    def __init__(self, name: str, group: str, logo: str, url: str, tvg_id: str = "", catchup_days: int = 0):
+        self.name = name
+        self.group = group
+        self.logo = logo
+        self.url = url
+        self.tvg_id = tvg_id
+        self.catchup_days = catchup_days
+
+    def to_dict(self) -> Dict:
+        """Convertit l'entrée en dictionnaire"""
+        return {
+            'name': self.name,
+            'group': self.group,
+            'logo': self.logo,
+            'url': self.url,
+            'tvg_id': self.tvg_id,
+            'catchup_days': self.catchup_days
+        }
+
+
+def iter_entries(catalog: Catalog, cat_map: Dict[str, str], url_prefix: str, default_extension: str,
+                 use_extension: bool = False) -> Iterator[PlaylistEntry]:
+    """
+    Parcourt un catalogue sous forme d'entrées de playlist
+
+    Args:
+        catalog: Catalogue compact des flux
+        cat_map: Noms des catégories par identifiant
+        url_prefix: Préfixe des URLs de flux (ex: http://host/live/user/pass)
+        default_extension: Extension utilisée quand le flux n'en précise pas
+        use_extension: Utiliser l'extension du conteneur de chaque flux (VOD)
+
+    Yields:
+        Les entrées de playlist, dans l'ordre du catalogue
+    """
+    for record in catalog:
+        extension = (record.extension if use_extension else "") or default_extension
+        yield PlaylistEntry(
+            record.name,
+            cat_map.get(record.category_id, "Unknown"),
+            record.icon,
+            f"{url_prefix}/{record.stream_id}.{extension}",
+            record.epg_id,
+            record.archive_days
+        )
+
+
+class PlaylistSink:
+    """
+    Destination d'export écrivant les entrées au fil de l'eau
+
+    Les sous-classes implémentent `write_header`, `write_entry` et
+    `write_footer` ; les écritures passent par le tampon du fichier et aucune
+    représentation complète de la playlist n'est construite en mémoire. Un
+    chemin se terminant par `.gz` ou `.zst` est compressé au fil de l'eau.
+    """
+
+    extension = ""
+
+    def __init__(self, path: str):
+        """
+        Initialise la destination
+
+        Args:
+            path: Chemin du fichier à écrire
+        """
+        self.path = Path(path)
+        self.count = 0
+        self._file = None
+
+    def write(self, entries: Iterator[PlaylistEntry]) -> int:
+        """
+        Écrit toutes les entrées dans le fichier
+
+        Args:
+            entries: Entrées de la playlist
+
+        Returns:
+            Le nombre d'octets écrits sur disque (après compression)
+        """
+        self.open()
+        try:
+            self.write_entries(entries)
+        except BaseException:
+            self._file.close()
+            raise
+        return self.close()
+
+    def open(self) -> None:
+        """Ouvre le fichier et écrit l'en-tête, pour une écriture en plusieurs fois"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open_text(str(self.path), newline='')
+        self.write_header(self._file)
+
+    def write_entries(self, entries: Iterator[PlaylistEntry]) -> int:
+        """
+        Ajoute des entrées au fichier ouvert avec open
+
+        Args:
+            entries: Entrées de la playlist
+
+        Returns:
+            Le nombre d'entrées écrites
+        """
+        written = 0
+        for entry in entries:
+            self.write_entry(self._file, entry)
+            self.count += 1
+            written += 1
+        return written
+
+    def close(self) -> int:
+        """
+        Écrit la fin du fichier et le ferme
+
+        Returns:
+            Le nombre d'octets écrits sur disque (après compression)
+        """
+        self.write_footer(self._file)
+        self._file.close()
+        return self.path.stat().st_size
+
+    def write_header(self, f) -> None:
+        pass
+
+    def write_entry(self, f, entry: PlaylistEntry) -> None:
+        raise NotImplementedError
+
+    def write_footer(self, f) -> None:
+        pass
+
+
+class M3USink(PlaylistSink):
+    """Playlist M3U simple (tvg-logo et group-title), identique à generate_m3u"""
+
+    extension = ".m3u"
+
+    def write_header(self, f) -> None:
+        f.write("#EXTM3U")
+
+    def write_entry(self, f, entry: PlaylistEntry) -> None:
+        f.write(f'\n#EXTINF:-1 tvg-logo="{m3u_attribute(entry.logo)}" group-title="{m3u_attribute(entry.group)}",'
+                f'{m3u_text(entry.name)}\n{m3u_text(entry.url)}')
+
+
+class M3UPlusSink(PlaylistSink):
+    """Playlist M3U plus avec tvg-id, tvg-name et attributs de replay"""
+
+    extension = ".m3u8"
+
+    def write_header(self, f) -> None:
+        f.write("#EXTM3U\n")
+
+    def write_entry(self, f, entry: PlaylistEntry) -> None:
+        catchup = f' catchup="xc" catchup-days="{entry.catchup_days}"' if entry.catchup_days else ""
+        f.write(
+            f'#EXTINF:-1 tvg-id="{m3u_attribute(entry.tvg_id)}" tvg-name="{m3u_attribute(entry.name)}" '
+            f'tvg-logo="{m3u_attribute(entry.logo)}" group-title="{m3u_attribute(entry.group)}"{catchup},'
+            f'{m3u_text(entry.name)}\n{m3u_text(entry.url)}\n'
+        )
+
+
+class JSONSink(PlaylistSink):
+    """Tableau JSON d'entrées, écrit élément par élément"""
+
+    extension = ".json"
+
+    def write_header(self, f) -> None:
+        f.write("[")
+
+    def write_entry(self, f, entry: PlaylistEntry) -> None:
+        f.write(("\n  " if self.count == 0 else ",\n  ") + json.dumps(entry.to_dict(), ensure_ascii=False))
+
+    def write_footer(self, f) -> None:
+        f.write("\n]\n" if self.count else "]\n")
+
+
+class CSVSink(PlaylistSink):
+    """Fichier CSV avec une ligne par entrée"""
+
+    extension = ".csv"
+    columns = ['name', 'group', 'logo', 'url', 'tvg_id', 'catchup_days']
+
+    def write_header(self, f) -> None:
+        self._writer = csv.writer(f)
+        self._writer.writerow(self.columns)
+
+    def write_entry(self, f, entry: PlaylistEntry) -> None:
+        self._writer.writerow([entry.name, entry.group, entry.logo, entry.url, entry.tvg_id, entry.catchup_days])
+
+
+# Formats d'export disponibles
+SINKS: Dict[str, Type[PlaylistSink]] = {
+    'm3u': M3USink,
+    'm3u_plus': M3UPlusSink,
+    'json': JSONSink,
+    'csv': CSVSink,
+}
+
+
+def export_catalog(fmt: str, path: str, catalog: Catalog, cat_map: Dict[str, str], url_prefix: str,
+                   default_extension: str, use_extension: bool = False) -> int:
+    """
+    Exporte un catalogue dans un format donné
+
+    Fonction de niveau module pour pouvoir être exécutée dans le pool de processus.
+
+    Args:
+        fmt: Format d'export (clé de SINKS)
+        path: Chemin du fichier à écrire
+        catalog: Catalogue compact des flux
+        cat_map: Noms des catégories par identifiant
+        url_prefix: Préfixe des URLs de flux
+        default_extension: Extension utilisée quand le flux n'en précise pas
+        use_extension: Utiliser l'extension du conteneur de chaque flux (VOD)
+
+    Returns:
+        Le nombre d'octets écrits
+    """
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown export format '{fmt}' (available: {', '.join(SINKS)})")
+    sink = SINKS[fmt](path)
+    return sink.write(iter_entries(catalog, cat_map, url_prefix, default_extension, use_extension))
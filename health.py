@@ -0,0 +1,154 @@
+"""
+Module de santé des flux pour l'application IPTV to M3U Converter
+Conserve, par URL de flux, le taux de succès et le temps de première réponse
+mesurés par les tests de chaînes, pour classer des sources équivalentes
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class StreamStats:
+    """Statistiques des tests d'un flux"""
+
+    __slots__ = ('probes', 'successes', 'ttfb')
+
+    def __init__(self, probes: int = 0, successes: int = 0, ttfb: Optional[float] = None):
+        self.probes = probes
+        self.successes = successes
+        self.ttfb = ttfb  # Temps de première réponse lissé, en secondes (None si jamais mesuré)
+
+    @property
+    def success_rate(self) -> float:
+        """Taux de succès estimé (lissage de Laplace : 0.5 pour un flux jamais testé)"""
+        return (self.successes + 1) / (self.probes + 2)
+
+    def __repr__(self) -> str:
+        return f"StreamStats(probes={self.probes}, successes={self.successes}, ttfb={self.ttfb})"
+
+
+class ChannelHealth:
+    """
+    Registre de santé des flux, alimenté par IPTVClient.test_channels
+
+    Le temps de première réponse (TTFB) est lissé par moyenne mobile
+    exponentielle. Le registre est borné : au-delà de `max_items` URLs, les
+    moins récemment testées sont oubliées.
+    """
+
+    def __init__(self, smoothing: float = 0.3, max_items: int = 200000):
+        """
+        Initialise le registre
+
+        Args:
+            smoothing: Poids d'une nouvelle mesure de TTFB (par défaut: 0.3)
+            max_items: Nombre maximal d'URLs suivies (par défaut: 200000)
+        """
+        self.smoothing = smoothing
+        self.max_items = max_items
+        self._stats: Dict[str, StreamStats] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def record(self, url: str, working: bool, ttfb: Optional[float] = None) -> None:
+        """
+        Enregistre le résultat d'un test
+
+        Args:
+            url: URL du flux
+            working: Le flux a répondu avec succès
+            ttfb: Temps de première réponse en secondes (pour un flux qui a répondu)
+        """
+        with self._lock:
+            stats = self._stats.pop(url, None) or StreamStats()
+            # Réinséré en fin de dictionnaire : les URLs les plus anciennes sont en tête
+            self._stats[url] = stats
+            stats.probes += 1
+            if working:
+                stats.successes += 1
+            if ttfb is not None:
+                stats.ttfb = ttfb if stats.ttfb is None else stats.ttfb + self.smoothing * (ttfb - stats.ttfb)
+            while len(self._stats) > self.max_items:
+                del self._stats[next(iter(self._stats))]
+            self.dirty = True
+
+    def get(self, url: str) -> Optional[StreamStats]:
+        """Retourne les statistiques d'une URL, ou None si elle n'a jamais été testée"""
+        return self._stats.get(url)
+
+    def score(self, url: str) -> Tuple[float, float]:
+        """
+        Clé de tri d'une URL : les plus fiables puis les plus rapides en premier
+
+        Args:
+            url: URL du flux
+
+        Returns:
+            (opposé du taux de succès, TTFB), l'infini si le TTFB est inconnu
+        """
+        stats = self._stats.get(url) or StreamStats()
+        return -stats.success_rate, stats.ttfb if stats.ttfb is not None else float('inf')
+
+    def rank(self, urls: Iterable[str]) -> List[str]:
+        """Trie des URLs équivalentes de la meilleure à la moins bonne (ordre d'origine en cas d'égalité)"""
+        return sorted(urls, key=self.score)
+
+    def save(self, path: str) -> None:
+        """
+        Sauvegarde le registre en JSON (écriture atomique)
+
+        Args:
+            path: Chemin du fichier
+        """
+        with self._lock:
+            data = {url: [stats.probes, stats.successes, stats.ttfb] for url, stats in self._stats.items()}
+            self.dirty = False
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, target)
+
+    def load(self, path: str) -> int:
+        """
+        Charge un registre sauvegardé (un fichier absent ou illisible est ignoré)
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            Le nombre d'URLs chargées
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        with self._lock:
+            for url, (probes, successes, ttfb) in data.items():
+                self._stats[url] = StreamStats(probes, successes, ttfb)
+        return len(data)
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'ChannelHealth':
+        """
+        Crée le registre selon la section `health` et charge le fichier configuré
+
+        Args:
+            config: Instance de ConfigManager
+
+        Returns:
+            Le registre
+        """
+        health = cls(config.get('health', 'smoothing', 0.3), config.get('health', 'max_items', 200000))
+        path = config.get('health', 'path', '')
+        if path:
+            health.load(path)
+        return health
@@ -1,24 +1,135 @@
+from __future__ import annotations
+
 import asyncio
-import aiohttp
 from urllib.parse import urlparse, parse_qs
 import json
 import platform
 import datetime
-from typing import Optional, Tuple, Dict, List, Any
+import time
+import weakref
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, List, Any, Callable, Union, NamedTuple, Awaitable, AsyncIterator
 from cache import ServerCache
+from refresh import RefreshScheduler, create_refresh_scheduler
 from config_manager import CONFIG
+from retry import RetryPolicy, CircuitBreaker, CircuitOpenError, IDEMPOTENT_METHODS
+from rate_limiter import TokenBucket, ConcurrencyLimiter
+from checkpoint import ChannelTestJournal, default_journal_path
+from catalog import Catalog, build_category_map
+import json_backend
+import cpu_pool
+import playlist
+from radio import RadioClassifier
+from health import ChannelHealth
+from compression import ACCEPT_ENCODING, COMPRESSED_SUFFIXES, StreamDecoder, TransferStats, open_text
+from metrics import METRICS, configure_export
+from tracing import TRACER, configure_tracing
+import loop_thread
+
+# aiohttp coûte environ 0,2 s à l'import : il n'est importé qu'au premier accès réseau ;
+# les modules d'export et d'EPG (csv, xml) ne le sont qu'à leur première utilisation
+if TYPE_CHECKING:
+    import aiohttp
+    from epg import XMLTVResult
 
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+_configured = False
 
-class IPTVClient:
-    # Cache global partagé entre toutes les instances
-    _global_cache = ServerCache(
-        max_age_seconds=CONFIG.get('cache', 'max_age_seconds', 300),
-        max_items=CONFIG.get('cache', 'max_items', 100)
+
+def configure_runtime() -> None:
+    """Apply config.ini runtime settings once, when the first client is created rather than at import."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    
+    json_backend.set_backend(
+        CONFIG.get('performance', 'json_backend', 'auto'),
+        CONFIG.get('performance', 'typed_decoding', True)
+    )
+    
+    # Les processus du pool décodent avec le même backend JSON que le processus principal
+    cpu_pool.configure(
+        CONFIG.get('performance', 'process_workers', 'auto'),
+        CONFIG.get('performance', 'offload_min_bytes', 1048576),
+        json_backend.set_backend,
+        (json_backend.get_backend(), json_backend.get_typed_decoding())
     )
     
+    # Export des métriques à la fin du programme ([metrics] exporter)
+    configure_export(CONFIG)
+    
+    # Spans des étapes fetch → parse → render → write ([tracing] enabled)
+    configure_tracing(CONFIG)
+    
+    # Rechargement à chaud de config.ini, démarré par l'interface ou le serveur
+    # ([reload] enabled) : les limiteurs, disjoncteurs et tests en cours reçoivent
+    # les nouvelles valeurs
+    CONFIG.add_listener(lambda config: IPTVClient.apply_config())
+
+REQUEST_DURATION = METRICS.histogram('iptv_request_duration_seconds', 'HTTP request latency by host and action')
+REQUESTS = METRICS.counter('iptv_requests_total', 'HTTP requests by host, action and status')
+BYTES_RECEIVED = METRICS.counter('iptv_received_bytes_total', 'Response bytes received on the wire by host')
+BYTES_DECODED = METRICS.counter('iptv_decoded_bytes_total', 'Response bytes after decompression by host')
+BYTES_WRITTEN = METRICS.counter('iptv_written_bytes_total', 'Bytes written to disk by output kind')
+PARSE_DURATION = METRICS.histogram('iptv_json_parse_seconds', 'JSON decoding time by action')
+RENDER_DURATION = METRICS.histogram('iptv_render_seconds', 'Playlist rendering time by format')
+PROBES = METRICS.counter('iptv_channel_probes_total', 'Channel probes by outcome')
+PROBE_DURATION = METRICS.histogram('iptv_channel_probe_seconds', 'Channel probe latency by outcome')
+SERIES_INFO_FAILURES = METRICS.counter('iptv_series_info_failures_total', 'Series dropped after a failed get_series_info by host')
+
+
+# Endpoints et format des URLs par type de contenu :
+# (action catégories, action flux, clé d'identifiant, chemin des flux, extension par défaut, extension du conteneur)
+CATALOG_KINDS = {
+    "live": ("get_live_categories", "get_live_streams", "stream_id", "live", "ts", False),
+    # Radios use 'id' instead of 'stream_id'
+    "radio": ("get_radio_categories", "get_radio_streams", "id", "radio", "ts", False),
+    # Les films utilisent leur container_extension, mp4 par défaut
+    "vod": ("get_vod_categories", "get_vod_streams", "stream_id", "movie", "mp4", True),
+}
+
+
+class CatalogSource(NamedTuple):
+    """A fetched catalog together with everything needed to build its stream URLs."""
+    cat_map: Dict[str, str]
+    catalog: Catalog
+    url_prefix: str
+    default_extension: str
+    use_extension: bool
+
+
+class IPTVClient:
+    # Cache global partagé entre toutes les instances, créé au premier usage
+    _global_cache: Optional[ServerCache] = None
+    
+    # Cache dédié aux réponses get_series_info (une entrée par série)
+    _series_cache: Optional[ServerCache] = None
+    
+    # Catalogues (catégories et flux) par compte et type de contenu
+    _catalog_cache: Optional[ServerCache] = None
+    
+    # Rafraîchissement anticipé de chaque cache, par nom de cache, créé au premier usage
+    _refreshers: Dict[str, RefreshScheduler] = {}
+    
+    # Taux de succès et temps de première réponse des flux testés, créé au premier usage
+    _channel_health: Optional[ChannelHealth] = None
+    
+    # Disjoncteurs par hôte partagés entre toutes les instances
+    _breakers: Dict[str, CircuitBreaker] = {}
+    
+    # Limiteurs de débit par hôte partagés par toutes les opérations
+    _limiters: Dict[str, TokenBucket] = {}
+    
+    # Boucle d'événements des dernières requêtes : les limiteurs partagés n'y sont modifiés que depuis elle
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    # Limiteurs de concurrence des opérations en cours et réglage (section, clé, défaut) qui les pilote
+    _concurrency_limiters: 'weakref.WeakKeyDictionary[ConcurrencyLimiter, Tuple[str, str, int]]' = weakref.WeakKeyDictionary()
+    
     def __init__(self, url: str, use_cache: bool = True):
         self.url = url
         self.host: Optional[str] = None
@@ -28,6 +139,9 @@ class IPTVClient:
         self.scheme: str = "http"
         self.use_cache = use_cache
         self.cache_key = None
+        # Octets reçus, décompressés et écrits par ce client
+        self.transfer = TransferStats()
+        configure_runtime()
 
     def parse_url(self) -> Tuple[Optional[str], Optional[int], Optional[str], Optional[str]]:
         """Parse URL to extract host, port, username, password."""
@@ -63,22 +177,350 @@ class IPTVClient:
         return f"{self.scheme}://{self.host}{port_str}"
 
     async def fetch(self, session: aiohttp.ClientSession, url: str, method: str = "GET", 
-                    data: Optional[Dict] = None, headers: Optional[Dict] = None) -> str:
-        """Perform async HTTP request."""
+                    data: Optional[Dict] = None, headers: Optional[Dict] = None,
+                    action: Optional[str] = None, idempotent: Optional[bool] = None,
+                    raw: bool = False, dest: Optional[str] = None) -> Union[str, bytes]:
+        """Perform async HTTP request, retrying transient failures per action policy.
+        
+        With raw=True the undecoded response bytes are returned, so JSON can be parsed
+        without an intermediate str copy. With dest, the body is streamed to that file
+        instead of being held in memory, and the path is returned.
+        """
+        import aiohttp
+        
         default_headers = {
             "Accept": "*/*",
             "User-Agent": "Dalvik/2.1.0 (Linux; U; Android 14; 22101320G Build/UKQ1.231003.002)",
             "Accept-Language": "en-US,en;q=0.5",
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
         if headers:
             default_headers.update(headers)
         
+        parsed = urlparse(url)
+        if action is None:
+            action = (data or {}).get("action") or parse_qs(parsed.query).get("action", ["default"])[0]
+        # Les actions get_* de player_api sont en lecture seule, même envoyées en POST
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS or action.startswith("get_")
+        
+        policy = RetryPolicy.from_config(CONFIG, action)
+        attempts = policy.max_attempts if idempotent else 1
+        host = parsed.hostname or parsed.netloc
+        breaker = self._get_breaker(parsed.netloc)
+        limiter = self._get_limiter(host)
+        IPTVClient._loop = asyncio.get_running_loop()
+        options = {}
+        if dest:
+            # Un gros téléchargement peut dépasser le délai total par défaut de la session
+            options["timeout"] = aiohttp.ClientTimeout(
+                total=None, sock_read=CONFIG.get('epg', 'read_timeout_seconds', 60)
+            )
+        
+        with self._trace("fetch", action=action, host=host, method=method.upper()) as span:
+            for attempt in range(attempts):
+                # En half_open, cette requête est la seule requête d'essai : elle doit
+                # la libérer sur toute sortie qui n'enregistre ni succès ni échec
+                trial = breaker.state == CircuitBreaker.HALF_OPEN
+                if not breaker.allow_request():
+                    raise CircuitOpenError(
+                        f"HTTP request failed: circuit open for {parsed.netloc}, retry in {breaker.retry_after():.0f}s"
+                    )
+                last_attempt = attempt == attempts - 1
+                span.set_attribute("attempts", attempt + 1)
+                await limiter.acquire()
+                started = time.perf_counter()
+                retry_delay = None
+                try:
+                    async with session.request(method, url, data=data, headers=default_headers, **options) as resp:
+                        if policy.is_retryable_status(resp.status) and not last_attempt:
+                            self._observe_request(host, action, resp.status, started)
+                            # 429 (et les autres 4xx à reprendre) signale une limite de débit, pas un hôte en panne
+                            if resp.status >= 500:
+                                breaker.record_failure()
+                            elif trial:
+                                breaker.release_trial()
+                            trial = False
+                            retry_delay = policy.compute_delay(attempt)
+                            retry_after = resp.headers.get("Retry-After", "")
+                            if retry_after.isdigit():
+                                retry_delay = max(retry_delay, min(float(retry_after), policy.max_delay))
+                        else:
+                            resp.raise_for_status()
+                            if getattr(session, "auto_decompress", True):
+                                # Session externe : aiohttp décompresse lui-même le corps
+                                decoder = None
+                            else:
+                                decoder = StreamDecoder(resp.headers.get("Content-Encoding"))
+                            if dest:
+                                received, decoded = await self._download(resp, dest, decoder)
+                                body = dest
+                            elif decoder is None:
+                                body = await resp.read() if raw else await resp.text()
+                                received = decoded = len(body)
+                            else:
+                                content, received = await self._read_body(resp, decoder)
+                                decoded = len(content)
+                                body = content if raw else content.decode(resp.charset or "utf-8", errors="replace")
+                    if retry_delay is None:
+                        self._observe_request(host, action, resp.status, started)
+                        self._count_received(received, decoded, host)
+                        span.set_attributes(status=resp.status, bytes_received=received, bytes_decoded=decoded)
+                        breaker.record_success()
+                        return body
+                except aiohttp.ClientResponseError as e:
+                    self._observe_request(host, action, e.status, started)
+                    # L'hôte a répondu : seuls les statuts 5xx comptent comme des pannes,
+                    # et une limite de débit (429) ne prouve pas qu'il est rétabli
+                    if e.status >= 500:
+                        breaker.record_failure()
+                    elif policy.is_retryable_status(e.status):
+                        if trial:
+                            breaker.release_trial()
+                    else:
+                        breaker.record_success()
+                    raise Exception(f"HTTP request failed: {e}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self._observe_request(host, action, "error", started)
+                    breaker.record_failure()
+                    if last_attempt:
+                        raise Exception(f"HTTP request failed: {e}")
+                    retry_delay = policy.compute_delay(attempt)
+                except BaseException:
+                    # Annulation, corps illisible ou écriture impossible : l'hôte n'est pas en cause
+                    if trial:
+                        breaker.release_trial()
+                    raise
+                # Réponse libérée : sa connexion retourne au pool pendant l'attente
+                await asyncio.sleep(retry_delay)
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Provide an HTTP session leaving decompression to fetch, so transferred bytes can be counted."""
+        import aiohttp
+        # Sur la boucle persistante de l'interface, toutes les opérations partagent
+        # une session (et son pool de connexions) qui reste ouverte entre elles
+        shared_loop = loop_thread.current()
+        if shared_loop is not None:
+            yield shared_loop.shared("http_session", lambda: aiohttp.ClientSession(auto_decompress=False))
+            return
+        async with aiohttp.ClientSession(auto_decompress=False) as session:
+            yield session
+
+    @staticmethod
+    def _observe_request(host: str, action: str, status: Union[int, str], started: float) -> None:
+        """Record the latency and outcome of one HTTP attempt."""
+        REQUEST_DURATION.observe(time.perf_counter() - started, host=host, action=action)
+        REQUESTS.inc(host=host, action=action, status=status)
+
+    def _count_received(self, received: int, decoded: int, host: str) -> None:
+        """Add response bytes to the transfer statistics and metrics."""
+        self.transfer.bytes_received += received
+        self.transfer.bytes_decoded += decoded
+        BYTES_RECEIVED.inc(received, host=host)
+        BYTES_DECODED.inc(decoded, host=host)
+
+    def _count_written(self, written: int, kind: str) -> None:
+        """Add bytes written to disk to the transfer statistics and metrics."""
+        self.transfer.bytes_written += written
+        BYTES_WRITTEN.inc(written, kind=kind)
+
+    async def _read_body(self, resp: aiohttp.ClientResponse, decoder: StreamDecoder) -> Tuple[bytes, int]:
+        """Read a response body, decompressing it chunk by chunk as it arrives.
+        
+        Returns the decompressed body and the number of bytes received.
+        """
+        body = bytearray()
+        received = 0
+        async for chunk in resp.content.iter_chunked(CONFIG.get('compression', 'chunk_size', 262144)):
+            received += len(chunk)
+            body += decoder.decompress(chunk)
+        body += decoder.flush()
+        return bytes(body), received
+
+    async def _download(self, resp: aiohttp.ClientResponse, dest: str,
+                        decoder: Optional[StreamDecoder] = None) -> Tuple[int, int]:
+        """Stream a response body to a file, replacing it only once the download is complete.
+        
+        Returns the number of bytes received and written.
+        """
+        partial = Path(f"{dest}.part")
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        received = decoded = 0
         try:
-            async with session.request(method, url, data=data, headers=default_headers) as resp:
-                resp.raise_for_status()
-                return await resp.text()
-        except aiohttp.ClientError as e:
-            raise Exception(f"HTTP request failed: {e}")
+            with open(partial, "wb") as f:
+                async for chunk in resp.content.iter_chunked(CONFIG.get('compression', 'chunk_size', 262144)):
+                    received += len(chunk)
+                    if decoder is not None:
+                        chunk = decoder.decompress(chunk)
+                    decoded += len(chunk)
+                    f.write(chunk)
+                if decoder is not None:
+                    tail = decoder.flush()
+                    decoded += len(tail)
+                    f.write(tail)
+            partial.replace(dest)
+        except BaseException:
+            if partial.exists():
+                partial.unlink()
+            raise
+        return received, decoded
+
+    def get_transfer_stats(self) -> Dict[str, Any]:
+        """Return the bytes received, decompressed and written by this client."""
+        return self.transfer.to_dict()
+
+    def _trace(self, name: str, **attributes: Any):
+        """Open a tracing span tagged with this client's account (no-op unless [tracing] is enabled)."""
+        return TRACER.span(name, account=f"{self.username}@{self.host}", **attributes)
+
+    @classmethod
+    def _get_global_cache(cls) -> ServerCache:
+        """Return the server-info cache shared by all instances, creating it on first use."""
+        if cls._global_cache is None:
+            cls._global_cache = ServerCache(
+                max_age_seconds=CONFIG.get('cache', 'max_age_seconds', 300),
+                max_items=CONFIG.get('cache', 'max_items', 100),
+                name="server_info"
+            )
+        return cls._global_cache
+
+    @classmethod
+    def _get_series_cache(cls) -> ServerCache:
+        """Return the get_series_info cache shared by all instances, creating it on first use."""
+        if cls._series_cache is None:
+            cls._series_cache = ServerCache(
+                max_age_seconds=CONFIG.get('series', 'cache_max_age_seconds', 3600),
+                max_items=CONFIG.get('series', 'cache_max_items', 10000),
+                name="series_info"
+            )
+        return cls._series_cache
+
+    @classmethod
+    def _get_catalog_cache(cls) -> ServerCache:
+        """Return the category and stream catalog cache shared by all instances, creating it on first use."""
+        if cls._catalog_cache is None:
+            cls._catalog_cache = ServerCache(
+                max_age_seconds=CONFIG.get('cache', 'catalog_max_age_seconds', 300),
+                max_items=CONFIG.get('cache', 'catalog_max_items', 20),
+                name="catalog"
+            )
+        return cls._catalog_cache
+
+    @classmethod
+    def get_channel_health(cls) -> ChannelHealth:
+        """Return the stream health registry fed by test_channels, loading it on first use."""
+        if cls._channel_health is None:
+            cls._channel_health = ChannelHealth.from_config(CONFIG)
+        return cls._channel_health
+
+    @classmethod
+    def _get_refresher(cls, cache: ServerCache) -> RefreshScheduler:
+        """Return the refresh-ahead scheduler of a shared cache, creating it on first use."""
+        refresher = cls._refreshers.get(cache.name)
+        if refresher is None or refresher.cache is not cache:
+            refresher = create_refresh_scheduler(cache, CONFIG)
+            cls._refreshers[cache.name] = refresher
+        return refresher
+
+    @classmethod
+    def _keep_warm(cls, cache: ServerCache, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Refresh a cached entry in the background before it expires, if [refresh] is enabled."""
+        if not CONFIG.get('refresh', 'enabled', False):
+            return
+        # Le rafraîchissement tourne sur la boucle en cours : celle de l'interface,
+        # du serveur de playlists ou d'un asyncio.run, qui l'annule en se fermant
+        refresher = cls._get_refresher(cache)
+        refresher.watch(key, loader)
+        refresher.start()
+
+    def _cache_server_info(self, info: Dict[str, Any]) -> None:
+        """Store server info in the shared cache and keep it warm in the background if enabled."""
+        self._get_global_cache().set(self.cache_key, info)
+        self._keep_warm(self._get_global_cache(), self.cache_key, IPTVClient(self.url, use_cache=False).get_server_info)
+
+    @classmethod
+    def _get_breaker(cls, host: str) -> CircuitBreaker:
+        """Return the circuit breaker shared by all requests to a host."""
+        breaker = cls._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=CONFIG.get('circuit_breaker', 'failure_threshold', 5),
+                reset_timeout=CONFIG.get('circuit_breaker', 'reset_timeout_seconds', 30.0)
+            )
+            cls._breakers[host] = breaker
+        return breaker
+
+    @classmethod
+    def _get_limiter(cls, host: str) -> TokenBucket:
+        """Return the token bucket shared by all requests to a host."""
+        limiter = cls._limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucket(*cls._limiter_settings(host))
+            cls._limiters[host] = limiter
+        return limiter
+
+    @staticmethod
+    def _limiter_settings(host: str) -> Tuple[float, int]:
+        """Return the configured (rate, burst) of a host limiter."""
+        # Une section [rate_limit.<host>] peut surcharger les valeurs par défaut
+        rate = CONFIG.get('rate_limit', 'requests_per_second', 50.0)
+        burst = CONFIG.get('rate_limit', 'burst', 100)
+        rate = CONFIG.get(f'rate_limit.{host}', 'requests_per_second', rate)
+        burst = CONFIG.get(f'rate_limit.{host}', 'burst', burst)
+        if not CONFIG.get('rate_limit', 'enabled', True):
+            rate = 0.0
+        return rate, burst
+
+    @classmethod
+    def _concurrency_limiter(cls, section: str, key: str, default: int) -> ConcurrencyLimiter:
+        """Create a concurrency limiter whose limit follows a config setting for as long as it is in use."""
+        limiter = ConcurrencyLimiter(CONFIG.get(section, key, default))
+        cls._concurrency_limiters[limiter] = (section, key, default)
+        return limiter
+
+    @classmethod
+    def apply_config(cls) -> None:
+        """Push reloaded config values into the shared limiters, breakers and running operations.
+        
+        Called from the config watcher thread, the update is handed over to the event loop
+        that uses those objects rather than mutating them under its running requests.
+        """
+        loop = cls._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is not loop:
+                try:
+                    loop.call_soon_threadsafe(cls._apply_config)
+                    return
+                except RuntimeError:
+                    # Boucle fermée entre-temps : plus aucune requête ne l'utilise
+                    pass
+        cls._apply_config()
+
+    @classmethod
+    def _apply_config(cls) -> None:
+        """Apply config values to the shared limiters and breakers, from their event loop."""
+        for host, limiter in list(cls._limiters.items()):
+            limiter.configure(*cls._limiter_settings(host))
+        for breaker in list(cls._breakers.values()):
+            breaker.failure_threshold = CONFIG.get('circuit_breaker', 'failure_threshold', 5)
+            breaker.reset_timeout = CONFIG.get('circuit_breaker', 'reset_timeout_seconds', 30.0)
+        for limiter, (section, key, default) in list(cls._concurrency_limiters.items()):
+            limiter.set_limit(CONFIG.get(section, key, default))
+
+    def get_breaker(self) -> Optional[CircuitBreaker]:
+        """Return the circuit breaker guarding this account's server, or None before any request to it."""
+        # fetch indexe les disjoncteurs par netloc (hôte et port éventuel) de l'URL demandée
+        return self._breakers.get(urlparse(self.construct_base_url()).netloc)
+
+    @classmethod
+    def get_rate_limit_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """Return queueing-delay statistics of every host limiter."""
+        return {host: limiter.get_stats() for host, limiter in cls._limiters.items()}
 
     async def get_server_info(self) -> Dict[str, Any]:
         """Fetch and parse server/user info, with fallback for get.php only servers."""
@@ -87,9 +529,8 @@ class IPTVClient:
         
         # Vérifier le cache si activé
         if self.use_cache:
-            cached = self._global_cache.get(self.cache_key)
+            cached = self._get_global_cache().get(self.cache_key)
             if cached:
-                print(f"Cache hit for {self.cache_key}")
                 return cached
         
         base_url = self.construct_base_url()
@@ -97,11 +538,11 @@ class IPTVClient:
         
         headers = {"Referer": base_url, "Host": self.host}
         
-        async with aiohttp.ClientSession() as session:
+        async with self._session() as session:
             try:
                 resp_text = await self.fetch(session, api_url, headers=headers)
                 try:
-                    info = json.loads(resp_text)
+                    info = json_backend.loads(resp_text)
                     if "user_info" in info or "server_info" in info:
                         user_info = info.get("user_info", {})
                         server_info = info.get("server_info", {})
@@ -119,21 +560,18 @@ class IPTVClient:
                         
                         # Fetch total live channels
                         streams_url = f"{base_url}/player_api.php?username={self.username}&password={self.password}&action=get_live_streams"
-                        streams_resp = await self.fetch(session, streams_url, headers=headers)
-                        streams = json.loads(streams_resp) if streams_resp else []
-                        total_channels = len(streams) if isinstance(streams, list) else 0
+                        streams_resp = await self.fetch(session, streams_url, headers=headers, raw=True)
+                        total_channels = json_backend.count_items(streams_resp)
 
                         # Fetch total radios
                         radios_url = f"{base_url}/player_api.php?username={self.username}&password={self.password}&action=get_radio_streams"
-                        radios_resp = await self.fetch(session, radios_url, headers=headers)
-                        radios = json.loads(radios_resp) if radios_resp else []
-                        total_radios = len(radios) if isinstance(radios, list) else 0
+                        radios_resp = await self.fetch(session, radios_url, headers=headers, raw=True)
+                        total_radios = json_backend.count_items(radios_resp)
 
                         # Fetch total VOD
                         vod_url = f"{base_url}/player_api.php?username={self.username}&password={self.password}&action=get_vod_streams"
-                        vod_resp = await self.fetch(session, vod_url, headers=headers)
-                        vods = json.loads(vod_resp) if vod_resp else []
-                        total_vod = len(vods) if isinstance(vods, list) else 0
+                        vod_resp = await self.fetch(session, vod_url, headers=headers, raw=True)
+                        total_vod = json_backend.count_items(vod_resp)
                         
                         # Masquer le mot de passe pour la sécurité
                         info = {
@@ -154,7 +592,7 @@ class IPTVClient:
                         
                         # Stocker dans le cache si activé
                         if self.use_cache:
-                            self._global_cache.set(self.cache_key, info)
+                            self._cache_server_info(info)
                         
                         return info
                     else:
@@ -187,7 +625,7 @@ class IPTVClient:
                         
                         # Stocker dans le cache si activé
                         if self.use_cache:
-                            self._global_cache.set(self.cache_key, info)
+                            self._cache_server_info(info)
                         
                         return info
                     except Exception as m3u_error:
@@ -197,210 +635,423 @@ class IPTVClient:
             except json.JSONDecodeError as e:
                 raise Exception(f"Failed to parse server info: {e}")
 
+    async def get_user_info(self) -> Dict[str, Any]:
+        """Fetch only the player_api.php user_info block (status, expiry, connection limits), without catalogs."""
+        self.parse_url()
+        base_url = self.construct_base_url()
+        api_url = f"{base_url}/player_api.php?username={self.username}&password={self.password}"
+        headers = {"Referer": base_url, "Host": self.host}
+        
+        async with self._session() as session:
+            info = json_backend.loads(await self.fetch(session, api_url, headers=headers, raw=True))
+        user_info = info.get("user_info") if isinstance(info, dict) else None
+        if not isinstance(user_info, dict):
+            raise ValueError("Invalid player_api response")
+        return user_info
+    
     async def generate_m3u(self) -> str:
         """Generate M3U playlist content for live TV."""
         self.parse_url()
+        
+        async with self._session() as session:
+            with self._trace("generate", kind="live"):
+                return await self._render_source(await self._fetch_source(session, "live"))
+
+    async def generate_radio_m3u(self) -> str:
+        """Generate M3U playlist content for radios."""
+        self.parse_url()
+        
+        async with self._session() as session:
+            with self._trace("generate", kind="radio"):
+                return await self._render_source(await self._fetch_source(session, "radio"))
+
+    async def generate_vod_m3u(self) -> str:
+        """Generate M3U playlist content for VOD (movies)."""
+        self.parse_url()
+        
+        async with self._session() as session:
+            with self._trace("generate", kind="vod"):
+                return await self._render_source(await self._fetch_source(session, "vod"))
+
+    async def generate_all(self) -> Dict[str, str]:
+        """Generate live, radio and VOD playlists from concurrent catalog fetches on one session."""
+        self.parse_url()
+        
+        async with self._session() as session:
+            with self._trace("generate", kind="all"):
+                sources = await self._fetch_sources(session, ("live", "radio", "vod"))
+                contents = await asyncio.gather(*[self._render_source(source) for source in sources.values()])
+                return dict(zip(sources, contents))
+
+    async def get_source(self, kind: str = "live") -> CatalogSource:
+        """Fetch one catalog (live, radio or vod) with everything needed to write its playlist."""
+        self.parse_url()
+        
+        async with self._session() as session:
+            return await self._fetch_source(session, kind)
+
+    async def generate_epg(self, epg_path: str, epg_url: Optional[str] = None) -> Tuple[str, XMLTVResult]:
+        """Download the XMLTV guide, keep the live playlist's channels and return the M3U with tvg-id."""
+        from epg import filter_xmltv, apply_tvg_ids
+        self.parse_url()
         base_url = self.construct_base_url()
+        xmltv_url = f"{base_url}/xmltv.php?username={self.username}&password={self.password}"
+        download_path = f"{epg_path}.download"
+        
+        async with self._session() as session:
+            try:
+                # Le guide est téléchargé sur disque pendant la récupération du catalogue live
+                source, _ = await asyncio.gather(
+                    self._fetch_source(session, "live"),
+                    self.fetch(session, xmltv_url, headers={"Referer": base_url}, action="xmltv", dest=download_path)
+                )
+                size = Path(download_path).stat().st_size
+                with self._trace("parse", action="xmltv", bytes=size) as span:
+                    result = await cpu_pool.run_blocking(filter_xmltv, download_path, epg_path, source.catalog,
+                                                         size_hint=size)
+                    span.set_attributes(channels=result.channels_kept, programmes=result.programmes_kept)
+            finally:
+                if Path(download_path).exists():
+                    Path(download_path).unlink()
+        self._count_written(Path(epg_path).stat().st_size, "epg")
+        
+        catalog = apply_tvg_ids(source.catalog, result.tvg_ids)
+        with self._trace("render", format="m3u", items=len(catalog)):
+            content = await cpu_pool.run_cpu(playlist.render_m3u, catalog, source.cat_map, source.url_prefix,
+                                             source.default_extension, source.use_extension,
+                                             epg_url or Path(epg_path).name, size_hint=catalog.nbytes())
+        return content, result
+
+    async def export(self, output_dir: str, kinds: Tuple[str, ...] = ("live", "radio", "vod"),
+                     formats: Tuple[str, ...] = ("m3u",), basename: Optional[str] = None,
+                     compression: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """Export catalogs to several formats, fetching each catalog only once.
+        
+        With compression ("gz" or "zst"), every file is compressed while it is written.
+        """
+        from export import SINKS
+        self.parse_url()
+        unknown = [fmt for fmt in formats if fmt not in SINKS]
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(unknown)} (available: {', '.join(SINKS)})")
+        if compression and f".{compression}" not in COMPRESSED_SUFFIXES:
+            raise ValueError(f"Unknown compression '{compression}' (available: gz, zst)")
+        if not basename:
+            basename = f"{self.host}_{self.username}".replace(":", "_").replace("/", "_").replace("?", "_")
+        
+        async with self._session() as session:
+            with self._trace("export", kinds=",".join(kinds), formats=",".join(formats)):
+                sources = await self._fetch_sources(session, kinds)
+                results = await asyncio.gather(*[
+                    self._export_source(source, output_dir, f"{basename}_{kind}", formats, compression)
+                    for kind, source in sources.items()
+                ])
+                return dict(zip(sources, results))
+
+    async def _export_source(self, source: CatalogSource, output_dir: str, basename: str,
+                             formats: Tuple[str, ...], compression: Optional[str] = None) -> Dict[str, str]:
+        """Write one catalog to every requested format concurrently."""
+        from export import SINKS, export_catalog
+        suffix = f".{compression}" if compression else ""
+        paths = {fmt: str(Path(output_dir) / f"{basename}{SINKS[fmt].extension}{suffix}") for fmt in formats}
+        
+        async def write(fmt: str, path: str) -> int:
+            # Le rendu et l'écriture sont faits en une seule passe par export_catalog
+            with RENDER_DURATION.time(format=fmt), self._trace("write", format=fmt, items=len(source.catalog)) as span:
+                size = await cpu_pool.run_blocking(export_catalog, fmt, path, source.catalog, source.cat_map,
+                                                   source.url_prefix, source.default_extension, source.use_extension,
+                                                   size_hint=source.catalog.nbytes())
+                span.set_attribute("bytes", size)
+                return size
+        
+        # Chaque format est écrit en flux continu depuis le même catalogue, en parallèle
+        written = await asyncio.gather(*[write(fmt, path) for fmt, path in paths.items()])
+        for fmt, size in zip(paths, written):
+            self._count_written(size, fmt)
+        return paths
+
+    async def _fetch_sources(self, session: aiohttp.ClientSession, kinds: Tuple[str, ...]) -> Dict[str, CatalogSource]:
+        """Fetch several catalogs concurrently, sharing the live catalog with the radio fallback."""
+        tasks: Dict[str, asyncio.Future] = {}
+        # Le catalogue live est lancé en premier pour pouvoir être partagé
+        for kind in sorted(kinds, key=lambda kind: kind != "live"):
+            if kind == "radio" and "live" in tasks:
+                tasks[kind] = asyncio.ensure_future(self._fetch_radio_source(session, tasks["live"]))
+            else:
+                tasks[kind] = asyncio.ensure_future(self._fetch_source(session, kind))
+        
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return {kind: tasks[kind].result() for kind in kinds}
+
+    async def _fetch_source(self, session: aiohttp.ClientSession, kind: str) -> CatalogSource:
+        """Fetch the catalog of one content kind (live, radio or vod) with its URL layout."""
+        if kind == "radio":
+            return await self._fetch_radio_source(session)
+        if kind not in CATALOG_KINDS:
+            raise ValueError(f"Unknown catalog kind '{kind}' (available: live, radio, vod)")
+        categories_action, streams_action, id_key, path, extension, use_extension = CATALOG_KINDS[kind]
+        cat_map, catalog = await self._fetch_catalog(session, categories_action, streams_action, id_key)
+        return CatalogSource(cat_map, catalog, self.stream_prefix(path), extension, use_extension)
+
+    async def _fetch_radio_source(self, session: aiohttp.ClientSession,
+                                  live: Optional[Awaitable[CatalogSource]] = None) -> CatalogSource:
+        """Fetch radios, falling back to live streams filtered by radio keywords.
+        
+        When a pending live catalog fetch is given, the fallback reuses it instead of
+        downloading the live catalog again.
+        """
+        # Try dedicated radio endpoints first
+        try:
+            categories_action, streams_action, id_key, path, extension, use_extension = CATALOG_KINDS["radio"]
+            cat_map, radios = await self._fetch_catalog(session, categories_action, streams_action, id_key)
+            if len(radios) > 0:
+                return CatalogSource(cat_map, radios, self.stream_prefix(path), extension, use_extension)
+        except Exception:
+            # Fallback to filtering live streams if dedicated fails or empty
+            pass
         
+        # Fallback: Filter live streams by radio keywords
+        live = await (live if live is not None else self._fetch_source(session, "live"))
+        radios = RadioClassifier.from_config(CONFIG).filter(live.catalog, live.cat_map)
+        return live._replace(catalog=radios)
+
+    def stream_prefix(self, path: str) -> str:
+        """Return the stream URL prefix for a content path (live, radio, movie)."""
+        return f"{self.construct_base_url()}/{path}/{self.username}/{self.password}"
+
+    def stream_url(self, path: str, stream: str) -> str:
+        """Return the URL of a stream (identifier and extension, e.g. 1234.ts) under a content path."""
+        return f"{self.stream_prefix(path)}/{stream}"
+
+    async def _fetch_catalog(self, session: aiohttp.ClientSession, categories_action: str, streams_action: str,
+                             id_key: str = "stream_id") -> Tuple[Dict[str, str], Catalog]:
+        """Fetch a category map and a compact stream catalog from player_api, with caching."""
+        cache_key = f"catalog_{self.host}_{self.username}_{streams_action}"
+        if self.use_cache:
+            cached = self._get_catalog_cache().get(cache_key)
+            if cached:
+                return cached
+        
+        result = await self._download_catalog(session, categories_action, streams_action, id_key)
+        if self.use_cache:
+            self._get_catalog_cache().set(cache_key, result)
+            refresher = IPTVClient(self.url, use_cache=False)
+            self._keep_warm(self._get_catalog_cache(), cache_key,
+                            lambda: refresher._load_catalog(categories_action, streams_action, id_key))
+        return result
+    
+    async def _load_catalog(self, categories_action: str, streams_action: str,
+                            id_key: str = "stream_id") -> Tuple[Dict[str, str], Catalog]:
+        """Fetch a catalog in its own session, for background refreshes."""
+        self.parse_url()
+        async with self._session() as session:
+            return await self._download_catalog(session, categories_action, streams_action, id_key)
+    
+    async def _download_catalog(self, session: aiohttp.ClientSession, categories_action: str, streams_action: str,
+                                id_key: str = "stream_id") -> Tuple[Dict[str, str], Catalog]:
+        """Download and decode a category map and a compact stream catalog from player_api."""
+        base_url = self.construct_base_url()
         headers = {"Referer": base_url, "Host": self.host}
+        cat_headers = headers.copy()
+        cat_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
+        cat_url = f"{base_url}/player_api.php"
         
-        async with aiohttp.ClientSession() as session:
-            # Get categories
-            cat_data = {
-                "username": self.username,
-                "password": self.password,
-                "action": "get_live_categories"
-            }
-            cat_headers = headers.copy()
-            cat_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
-            
-            cat_url = f"{base_url}/player_api.php"
-            cat_resp = await self.fetch(session, cat_url, "POST", cat_data, cat_headers)
-            categories = json.loads(cat_resp)
-            cat_map = {c["category_id"]: c["category_name"] for c in categories if "category_id" in c and "category_name" in c}
-            
-            # Get streams
-            stream_data = {
-                "username": self.username,
-                "password": self.password,
-                "action": "get_live_streams"
-            }
-            stream_resp = await self.fetch(session, cat_url, "POST", stream_data, cat_headers)
-            streams = json.loads(stream_resp)
-            
-            m3u_lines = ["#EXTM3U"]
-            for stream in streams:
-                if not isinstance(stream, dict):
-                    continue
-                cat_id = str(stream.get("category_id", ""))
-                cat_name = cat_map.get(cat_id, "Unknown")
-                stream_icon = stream.get("stream_icon", "")
-                name = stream.get("name", "")
-                stream_id = stream.get("stream_id", "")
-                
-                if not (name and stream_id):
-                    continue
-                
-                m3u_lines.append(f'#EXTINF:-1 tvg-logo="{stream_icon}" group-title="{cat_name}",{name}')
-                stream_url = f"{base_url}/live/{self.username}/{self.password}/{stream_id}.ts"
-                m3u_lines.append(stream_url)
-            
-            return "\n".join(m3u_lines)
+        # Get categories
+        cat_data = {
+            "username": self.username,
+            "password": self.password,
+            "action": categories_action
+        }
+        cat_resp = await self.fetch(session, cat_url, "POST", cat_data, cat_headers, raw=True)
+        with PARSE_DURATION.time(action=categories_action), \
+                self._trace("parse", action=categories_action, bytes=len(cat_resp)):
+            categories = await cpu_pool.run_cpu(json_backend.loads, cat_resp, size_hint=len(cat_resp))
+        cat_map = build_category_map(categories)
+        
+        # Get streams
+        stream_data = {
+            "username": self.username,
+            "password": self.password,
+            "action": streams_action
+        }
+        stream_resp = await self.fetch(session, cat_url, "POST", stream_data, cat_headers, raw=True)
+        # Décodage direct des octets vers le catalogue compact, hors de la boucle d'événements
+        with PARSE_DURATION.time(action=streams_action), \
+                self._trace("parse", action=streams_action, bytes=len(stream_resp)) as span:
+            catalog = await cpu_pool.run_cpu(json_backend.decode_catalog, stream_resp, id_key,
+                                             size_hint=len(stream_resp))
+            span.set_attribute("items", len(catalog))
+        return cat_map, catalog
 
-    async def generate_radio_m3u(self) -> str:
-        """Generate M3U playlist content for radios."""
+    async def _render_source(self, source: CatalogSource) -> str:
+        """Render a catalog as M3U playlist content in the CPU pool."""
+        with RENDER_DURATION.time(format="m3u"), self._trace("render", format="m3u", items=len(source.catalog)):
+            return await cpu_pool.run_cpu(playlist.render_m3u, source.catalog, source.cat_map, source.url_prefix,
+                                          source.default_extension, source.use_extension,
+                                          size_hint=source.catalog.nbytes())
+
+    async def generate_series_m3u(self, on_progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Generate M3U playlist content for series episodes."""
         self.parse_url()
         base_url = self.construct_base_url()
         
         headers = {"Referer": base_url, "Host": self.host}
         
-        async with aiohttp.ClientSession() as session:
-            # Try dedicated radio endpoints first
-            try:
-                # Get radio categories
-                cat_data = {
-                    "username": self.username,
-                    "password": self.password,
-                    "action": "get_radio_categories"
-                }
-                cat_headers = headers.copy()
-                cat_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
-                
-                cat_url = f"{base_url}/player_api.php"
-                cat_resp = await self.fetch(session, cat_url, "POST", cat_data, cat_headers)
-                categories = json.loads(cat_resp)
-                cat_map = {c["category_id"]: c["category_name"] for c in categories if "category_id" in c and "category_name" in c}
-                
-                # Get radios
-                radio_data = {
-                    "username": self.username,
-                    "password": self.password,
-                    "action": "get_radio_streams"
-                }
-                radio_resp = await self.fetch(session, cat_url, "POST", radio_data, cat_headers)
-                radios = json.loads(radio_resp)
-                
-                if radios and isinstance(radios, list) and len(radios) > 0:
-                    # Use dedicated radios
-                    m3u_lines = ["#EXTM3U"]
-                    for radio in radios:
-                        if not isinstance(radio, dict):
-                            continue
-                        cat_id = str(radio.get("category_id", ""))
-                        cat_name = cat_map.get(cat_id, "Unknown")
-                        stream_icon = radio.get("stream_icon", "")
-                        name = radio.get("name", "")
-                        stream_id = radio.get("id", "")  # Radios use 'id' instead of 'stream_id'
-                        
-                        if not (name and stream_id):
-                            continue
-                        
-                        m3u_lines.append(f'#EXTINF:-1 tvg-logo="{stream_icon}" group-title="{cat_name}",{name}')
-                        radio_url = f"{base_url}/radio/{self.username}/{self.password}/{stream_id}.ts"
-                        m3u_lines.append(radio_url)
-                    
-                    return "\n".join(m3u_lines)
-            except Exception:
-                # Fallback to filtering live streams if dedicated fails or empty
-                pass
-            
-            # Fallback: Filter live streams by radio keywords
-            # Get live categories
+        async with self._session() as session:
+            # Get series categories
             cat_data = {
                 "username": self.username,
                 "password": self.password,
-                "action": "get_live_categories"
+                "action": "get_series_categories"
             }
             cat_headers = headers.copy()
             cat_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
             
-            cat_resp = await self.fetch(session, cat_url, "POST", cat_data, cat_headers)
-            categories = json.loads(cat_resp)
-            cat_map = {c["category_id"]: c["category_name"] for c in categories if "category_id" in c and "category_name" in c}
+            cat_url = f"{base_url}/player_api.php"
+            cat_resp = await self.fetch(session, cat_url, "POST", cat_data, cat_headers, raw=True)
+            with PARSE_DURATION.time(action="get_series_categories"), \
+                    self._trace("parse", action="get_series_categories", bytes=len(cat_resp)):
+                categories = await cpu_pool.run_cpu(json_backend.loads, cat_resp, size_hint=len(cat_resp))
+            cat_map = build_category_map(categories)
             
-            # Get live streams
-            stream_data = {
+            # Get series
+            series_data = {
                 "username": self.username,
                 "password": self.password,
-                "action": "get_live_streams"
+                "action": "get_series"
             }
-            stream_resp = await self.fetch(session, cat_url, "POST", stream_data, cat_headers)
-            streams = json.loads(stream_resp)
+            series_resp = await self.fetch(session, cat_url, "POST", series_data, cat_headers, raw=True)
+            with PARSE_DURATION.time(action="get_series"), \
+                    self._trace("parse", action="get_series", bytes=len(series_resp)) as span:
+                payload = await cpu_pool.run_cpu(json_backend.loads, series_resp, size_hint=len(series_resp))
+                series_list = [s for s in payload if isinstance(s, dict) and s.get("series_id")]
+                span.set_attribute("items", len(series_list))
+            
+            # Limiter le nombre de requêtes get_series_info simultanées (ajustable à chaud)
+            semaphore = self._concurrency_limiter('series', 'max_concurrent_requests', 8)
             
-            radio_keywords = ["radio", "radiostation", "station", "fm", "am", "radiostations"]
+            async def resolve(series):
+                async with semaphore:
+                    info = await self._get_series_info(session, cat_url, cat_headers, series["series_id"])
+                return series, info
             
+            total = len(series_list)
+            done = failed = 0
             m3u_lines = ["#EXTM3U"]
-            for stream in streams:
-                if not isinstance(stream, dict):
-                    continue
-                name = stream.get("name", "").lower()
-                if any(keyword in name for keyword in radio_keywords):
-                    cat_id = str(stream.get("category_id", ""))
-                    cat_name = cat_map.get(cat_id, "Unknown")
-                    stream_icon = stream.get("stream_icon", "")
-                    stream_id = stream.get("stream_id", "")
-                    
-                    if not (name and stream_id):
-                        continue
-                    
-                    m3u_lines.append(f'#EXTINF:-1 tvg-logo="{stream_icon}" group-title="{cat_name}",{name}')
-                    stream_url = f"{base_url}/live/{self.username}/{self.password}/{stream_id}.ts"
-                    m3u_lines.append(stream_url)
+            tasks = [asyncio.ensure_future(resolve(s)) for s in series_list]
+            # Les épisodes sont ajoutés dans l'ordre où les séries sont résolues
+            with self._trace("resolve", action="get_series_info", series=total) as span:
+                try:
+                    for future in asyncio.as_completed(tasks):
+                        series, info = await future
+                        done += 1
+                        if info:
+                            cat_name = cat_map.get(str(series.get("category_id", "")), "Unknown")
+                            m3u_lines.extend(self._series_episode_lines(base_url, series, info, cat_name))
+                        else:
+                            failed += 1
+                        if on_progress:
+                            on_progress(done, total)
+                finally:
+                    # Disjoncteur ouvert ou annulation : les séries restantes ne sont pas demandées
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                span.set_attributes(items=(len(m3u_lines) - 1) // 2, failed=failed)
             
             return "\n".join(m3u_lines)
 
-    async def generate_vod_m3u(self) -> str:
-        """Generate M3U playlist content for VOD (movies)."""
+    async def _get_series_info(self, session: aiohttp.ClientSession, url: str, headers: dict,
+                               series_id: Any) -> Optional[Dict[str, Any]]:
+        """Fetch get_series_info for one series, with caching.
+        
+        Returns None when the series cannot be fetched or decoded; CircuitOpenError
+        propagates, since every remaining series of the host would fail the same way.
+        """
+        cache_key = f"series_info_{self.host}_{self.username}_{series_id}"
+        if self.use_cache:
+            cached = self._get_series_cache().get(cache_key)
+            if cached:
+                return cached
+        
+        data = {
+            "username": self.username,
+            "password": self.password,
+            "action": "get_series_info",
+            "series_id": str(series_id)
+        }
+        try:
+            # Débit et reprises gérés par fetch ([rate_limit] et [retry.get_series_info])
+            info = json_backend.loads(await self.fetch(session, url, "POST", data, headers, raw=True))
+        except CircuitOpenError:
+            raise
+        except Exception:
+            SERIES_INFO_FAILURES.inc(host=self.host)
+            return None
+        
+        if not isinstance(info, dict):
+            SERIES_INFO_FAILURES.inc(host=self.host)
+            return None
+        if self.use_cache:
+            self._get_series_cache().set(cache_key, info)
+            refresher = IPTVClient(self.url, use_cache=False)
+            self._keep_warm(self._get_series_cache(), cache_key, lambda: refresher._load_series_info(series_id))
+        return info
+    
+    async def _load_series_info(self, series_id: Any) -> Dict[str, Any]:
+        """Fetch get_series_info for one series in its own session, for background refreshes."""
         self.parse_url()
         base_url = self.construct_base_url()
+        headers = {"Referer": base_url, "Host": self.host,
+                   "Content-Type": "application/x-www-form-urlencoded; charset=utf-8"}
+        async with self._session() as session:
+            info = await self._get_series_info(session, f"{base_url}/player_api.php", headers, series_id)
+        if info is None:
+            # Le planificateur garde l'ancienne valeur et réessaie plus tard
+            raise ValueError(f"get_series_info failed for series {series_id}")
+        return info
+
+    def _series_episode_lines(self, base_url: str, series: Dict[str, Any], info: Dict[str, Any],
+                              cat_name: str) -> List[str]:
+        """Build M3U lines for every episode of a series."""
+        series_name = series.get("name", "")
+        cover = series.get("cover", "")
         
-        headers = {"Referer": base_url, "Host": self.host}
+        # Les épisodes sont indexés par saison (dict) ou fournis en liste selon les panels
+        episodes = info.get("episodes") or {}
+        if isinstance(episodes, dict):
+            seasons = [episodes[k] for k in sorted(episodes, key=lambda k: int(k) if str(k).isdigit() else 0)]
+        else:
+            seasons = episodes if episodes and isinstance(episodes[0], list) else [episodes]
         
-        async with aiohttp.ClientSession() as session:
-            # Get VOD categories
-            cat_data = {
-                "username": self.username,
-                "password": self.password,
-                "action": "get_vod_categories"
-            }
-            cat_headers = headers.copy()
-            cat_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=utf-8"
-            
-            cat_url = f"{base_url}/player_api.php"
-            cat_resp = await self.fetch(session, cat_url, "POST", cat_data, cat_headers)
-            categories = json.loads(cat_resp)
-            cat_map = {c["category_id"]: c["category_name"] for c in categories if "category_id" in c and "category_name" in c}
-            
-            # Get VOD streams
-            vod_data = {
-                "username": self.username,
-                "password": self.password,
-                "action": "get_vod_streams"
-            }
-            vod_resp = await self.fetch(session, cat_url, "POST", vod_data, cat_headers)
-            vods = json.loads(vod_resp)
-            
-            m3u_lines = ["#EXTM3U"]
-            for vod in vods:
-                if not isinstance(vod, dict):
-                    continue
-                cat_id = str(vod.get("category_id", ""))
-                cat_name = cat_map.get(cat_id, "Unknown")
-                stream_icon = vod.get("stream_icon", "")
-                name = vod.get("name", "")
-                stream_id = vod.get("stream_id", "")
-                
-                if not (name and stream_id):
+        lines = []
+        for season in seasons:
+            if not isinstance(season, list):
+                continue
+            for episode in season:
+                if not isinstance(episode, dict) or not episode.get("id"):
                     continue
+                season_num = episode.get("season", 0)
+                episode_num = episode.get("episode_num", 0)
+                try:
+                    label = f"S{int(season_num):02d}E{int(episode_num):02d}"
+                except (TypeError, ValueError):
+                    label = episode.get("title", "")
+                ep_info = episode.get("info") if isinstance(episode.get("info"), dict) else {}
+                icon = ep_info.get("movie_image") or cover
+                extension = episode.get("container_extension") or "mp4"
                 
-                m3u_lines.append(f'#EXTINF:-1 tvg-logo="{stream_icon}" group-title="{cat_name}",{name}')
-                vod_url = f"{base_url}/movie/{self.username}/{self.password}/{stream_id}.mp4"
-                m3u_lines.append(vod_url)
-            
-            return "\n".join(m3u_lines)
+                lines.append(f'#EXTINF:-1 tvg-logo="{icon}" group-title="{cat_name}",{series_name} {label}')
+                lines.append(f"{base_url}/series/{self.username}/{self.password}/{episode['id']}.{extension}")
+        return lines
 
-    def save_m3u(self, content: str, filename: Optional[str] = None) -> str:
-        """Save M3U content to file."""
+    def save_m3u(self, content: str, filename: Optional[str] = None, compression: Optional[str] = None) -> str:
+        """Save M3U content to file, gzip or zstd compressed for .gz/.zst names or when compression is given."""
         self.parse_url()
         if not content:
             raise ValueError("No content to save.")
@@ -408,21 +1059,27 @@ class IPTVClient:
         if not filename:
             userpass = f"_{self.username}_{self.password}" if self.username and self.password else ""
             filename = f"{self.host}{userpass}.m3u".replace(":", "_").replace("/", "_").replace("?", "_")
+        if compression and not filename.endswith(f".{compression}"):
+            filename = f"{filename}.{compression}"
         
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Écriture par tranches : le contenu compressé n'est jamais construit en entier
+        chunk_size = CONFIG.get('compression', 'chunk_size', 262144)
+        with self._trace("write", format="m3u") as span:
+            with open_text(filename) as f:
+                for start in range(0, len(content), chunk_size):
+                    f.write(content[start:start + chunk_size])
+            written = Path(filename).stat().st_size
+            span.set_attribute("bytes", written)
+        self._count_written(written, "m3u")
         
         return filename
 
-    async def test_channels(self, m3u_content: str) -> dict:
-        """Test accessibility of channels in M3U content."""
+    async def test_channels(self, m3u_content: str, journal_path: Optional[str] = None,
+                            resume: bool = True) -> dict:
+        """Test accessibility of channels in M3U content, checkpointing results to an optional journal."""
         self.parse_url()
         base_url = self.construct_base_url()
         
-        # Limiter le nombre de tests simultanés pour éviter de surcharger
-        MAX_CONCURRENT_TESTS = CONFIG.get('testing', 'max_concurrent_tests', 10)
-        TIMEOUT_SECONDS = CONFIG.get('testing', 'timeout_seconds', 5)
-        
         # Parse M3U to extract stream URLs (every even line after #EXTINF)
         lines = m3u_content.strip().split('\n')
         stream_urls = []
@@ -439,39 +1096,90 @@ class IPTVClient:
         if total == 0:
             return {'total': 0, 'working': 0, 'failed': 0, 'working_urls': set()}
         
-        working_urls = set()
-        working = 0
+        # Reprendre un test interrompu : les URLs déjà testées sont ignorées
+        journal = None
+        done: Dict[str, bool] = {}
+        if journal_path:
+            journal = ChannelTestJournal(journal_path, CONFIG.get('testing', 'checkpoint_flush_every', 100))
+            journal.open(resume=resume)
+            for url in stream_urls:
+                result = journal.get(url)
+                if result is not None:
+                    done[url] = result
+        pending = [url for url in stream_urls if url not in done]
+        PROBES.inc(total - len(pending), outcome="resumed")
+        
+        working_urls = {url for url in stream_urls if done.get(url)}
+        working = len(working_urls)
         headers = {"User-Agent": "Dalvik/2.1.0 (Linux; U; Android 14; 22101320G Build/UKQ1.231003.002)"}
         
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for url in stream_urls:
-                # Use HEAD to check accessibility quickly
-                task = self._test_single_channel(session, url, headers)
-                tasks.append(task)
-            
-            # Limiter le nombre de tests simultanés
-            semaphore = asyncio.Semaphore(MAX_CONCURRENT_TESTS)
-            
-            async def limited_test(task):
-                async with semaphore:
-                    return await task
-            
-            results = await asyncio.gather(*[limited_test(task) for task in tasks], return_exceptions=True)
-            for idx, result in enumerate(results):
-                if isinstance(result, Exception):
-                    continue
-                if result:
-                    working += 1
-                    working_urls.add(stream_urls[idx])
+        # Temps de première réponse mesurés dans ce run (le registre de santé n'en garde que la moyenne lissée)
+        ttfb: Dict[str, float] = {}
+        completed = False
+        try:
+            async with self._session() as session:
+                # Limiter le nombre de tests simultanés pour éviter de surcharger (ajustable à chaud)
+                semaphore = self._concurrency_limiter('testing', 'max_concurrent_tests', 10)
+                
+                async def limited_test(url):
+                    async with semaphore:
+                        # Use HEAD to check accessibility quickly
+                        result = await self._test_single_channel(session, url, headers, ttfb)
+                    if journal:
+                        journal.record(url, result)
+                    return result
+                
+                with self._trace("test_channels", total=total, resumed=total - len(pending)) as span:
+                    results = await asyncio.gather(*[limited_test(url) for url in pending], return_exceptions=True)
+                    for idx, result in enumerate(results):
+                        if isinstance(result, Exception):
+                            continue
+                        if result:
+                            working += 1
+                            working_urls.add(pending[idx])
+                    span.set_attributes(working=working, failed=total - working)
+            completed = True
+        finally:
+            # Le journal n'est conservé que si le test a été interrompu
+            if journal:
+                journal.close(remove=completed)
+            health = self.get_channel_health()
+            health_path = CONFIG.get('health', 'path', '')
+            if health_path and health.dirty:
+                health.save(health_path)
         
         failed = total - working
-        return {'total': total, 'working': working, 'failed': failed, 'working_urls': working_urls}
+        return {'total': total, 'working': working, 'failed': failed, 'working_urls': working_urls,
+                'resumed': total - len(pending), 'ttfb': ttfb}
+
+    def checkpoint_path(self) -> str:
+        """Return the default channel-test journal path for this account."""
+        self.parse_url()
+        return default_journal_path(self.host, self.username, CONFIG.get('testing', 'checkpoint_dir', 'checkpoints'))
     
-    async def _test_single_channel(self, session: aiohttp.ClientSession, url: str, headers: dict) -> bool:
-        """Test a single channel URL."""
+    async def _test_single_channel(self, session: aiohttp.ClientSession, url: str, headers: dict,
+                                   ttfb_out: Optional[Dict[str, float]] = None) -> bool:
+        """Test a single channel URL, storing its measured time to first byte in ttfb_out when it works."""
+        import aiohttp
+        await self._get_limiter(urlparse(url).hostname or "").acquire()
+        started = time.perf_counter()
+        ttfb = None
         try:
-            async with session.head(url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                return 200 <= resp.status < 300
+            # Relu à chaque test : un changement de config.ini s'applique aux tests suivants
+            timeout = aiohttp.ClientTimeout(total=CONFIG.get('testing', 'timeout_seconds', 5.0))
+            async with session.head(url, headers=headers, timeout=timeout) as resp:
+                # Les en-têtes viennent d'arriver : temps de première réponse du flux
+                ttfb = time.perf_counter() - started
+                outcome = "working" if 200 <= resp.status < 300 else "failed"
         except Exception:
-            return False
+            outcome = "error"
+        PROBE_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+        PROBES.inc(outcome=outcome)
+        if outcome != "working":
+            ttfb = None
+        elif ttfb_out is not None:
+            ttfb_out[url] = ttfb
+        self.get_channel_health().record(url, outcome == "working", ttfb)
+        return outcome == "working"
+
+
@@ -0,0 +1,170 @@
+"""
+Module de décodage JSON pour l'application IPTV to M3U Converter
+Utilise orjson ou msgspec quand ils sont installés, et la bibliothèque standard sinon
+"""
+
+import json
+from typing import Any, List, Optional, Union
+
+from catalog import Catalog, archive_days
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    msgspec = None
+
+# Backends utilisables dans cet environnement, du plus lent au plus rapide
+AVAILABLE_BACKENDS = ['json'] + (['msgspec'] if msgspec else []) + (['orjson'] if orjson else [])
+
+_backend = 'json'
+_typed_decoding = msgspec is not None
+
+
+if msgspec is not None:
+    _Scalar = Union[str, int, float, None]
+
+    class _StreamStruct(msgspec.Struct):
+        """Champs d'un flux player_api utiles au catalogue ; les autres clés sont ignorées au décodage"""
+        name: _Scalar = ""
+        stream_id: _Scalar = ""
+        id: _Scalar = ""
+        category_id: _Scalar = ""
+        stream_icon: _Scalar = ""
+        container_extension: _Scalar = ""
+        epg_channel_id: _Scalar = ""
+        tv_archive: _Scalar = 0
+        tv_archive_duration: _Scalar = 0
+
+    _stream_decoder = msgspec.json.Decoder(List[_StreamStruct])
+    _raw_list_decoder = msgspec.json.Decoder(List[msgspec.Raw])
+
+
+def set_backend(name: str = 'auto', typed_decoding: Optional[bool] = None) -> str:
+    """
+    Sélectionne le backend JSON
+
+    Args:
+        name: 'auto', 'orjson', 'msgspec' ou 'json'
+        typed_decoding: Décoder les catalogues directement en structures typées (msgspec)
+
+    Returns:
+        Le nom du backend sélectionné
+    """
+    global _backend, _typed_decoding
+    if name == 'auto':
+        name = AVAILABLE_BACKENDS[-1]
+    if name not in AVAILABLE_BACKENDS:
+        raise ValueError(f"JSON backend '{name}' is not available (installed: {', '.join(AVAILABLE_BACKENDS)})")
+    _backend = name
+    if typed_decoding is not None:
+        _typed_decoding = typed_decoding and msgspec is not None
+    return name
+
+
+def get_backend() -> str:
+    """Retourne le nom du backend JSON courant"""
+    return _backend
+
+
+def get_typed_decoding() -> bool:
+    """Indique si les catalogues sont décodés en structures typées"""
+    return _typed_decoding
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Décode un document JSON depuis des octets ou une chaîne
+
+    Args:
+        data: Corps de la réponse HTTP
+
+    Returns:
+        L'objet Python décodé
+
+    Raises:
+        json.JSONDecodeError: Si le document est invalide, quel que soit le backend
+    """
+    if _backend == 'orjson':
+        # orjson.JSONDecodeError hérite déjà de json.JSONDecodeError
+        return orjson.loads(data)
+    if _backend == 'msgspec':
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), _preview(data), 0) from None
+    return json.loads(data)
+
+
+def decode_catalog(data: Union[bytes, str], id_key: str = "stream_id") -> Catalog:
+    """
+    Décode une réponse get_*_streams directement en catalogue compact
+
+    Avec msgspec, seuls les champs utiles sont décodés, en une passe et sans
+    construire de dictionnaire par flux. Si la réponse ne correspond pas au
+    schéma attendu (objet d'erreur, champ imbriqué inattendu), le décodage
+    générique prend le relais.
+
+    Args:
+        data: Corps de la réponse HTTP
+        id_key: Clé contenant l'identifiant du flux
+
+    Returns:
+        Le catalogue compact
+    """
+    if _typed_decoding:
+        try:
+            items = _stream_decoder.decode(data)
+        except (msgspec.ValidationError, msgspec.DecodeError):
+            pass
+        else:
+            catalog = Catalog()
+            for item in items:
+                name = item.name
+                stream_id = getattr(item, id_key, "")
+                if not (name and stream_id):
+                    continue
+                catalog.append(
+                    stream_id,
+                    str(name),
+                    item.category_id,
+                    str(item.stream_icon or ""),
+                    str(item.container_extension or ""),
+                    str(item.epg_channel_id or ""),
+                    archive_days(item.tv_archive, item.tv_archive_duration)
+                )
+            return catalog
+    return Catalog.from_json(loads(data), id_key)
+
+
+def count_items(data: Union[bytes, str]) -> int:
+    """
+    Compte les éléments d'une réponse de type liste
+
+    Args:
+        data: Corps de la réponse HTTP
+
+    Returns:
+        Le nombre d'éléments, 0 si la réponse n'est pas une liste
+    """
+    if not data:
+        return 0
+    if msgspec is not None:
+        # Les éléments restent bruts : seule la structure de la liste est analysée
+        try:
+            return len(_raw_list_decoder.decode(data))
+        except (msgspec.ValidationError, msgspec.DecodeError):
+            pass
+    items = loads(data)
+    return len(items) if isinstance(items, list) else 0
+
+
+def _preview(data: Union[bytes, str]) -> str:
+    """Retourne le début du document pour les messages d'erreur"""
+    if isinstance(data, bytes):
+        data = data[:200].decode('utf-8', errors='replace')
+    return data[:200]
@@ -0,0 +1,158 @@
+"""
+Module de boucle d'événements persistante pour l'application IPTV to M3U Converter
+Une boucle asyncio unique tourne dans un thread dédié pendant toute la vie de
+l'application : les opérations y sont soumises depuis n'importe quel thread et
+peuvent partager des ressources (session HTTP, pool de connexions)
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class LoopThread:
+    """
+    Boucle d'événements asyncio exécutée dans un thread démon
+
+    Les coroutines soumises avec `submit` s'exécutent en parallèle sur la même
+    boucle ; les ressources créées avec `shared` leur sont communes et sont
+    fermées à l'arrêt.
+    """
+
+    def __init__(self, name: str = "iptv-event-loop"):
+        """
+        Initialise le thread (la boucle démarre avec start)
+
+        Args:
+            name: Nom du thread
+        """
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._resources: Dict[str, Any] = {}
+
+    @property
+    def running(self) -> bool:
+        """Indique si la boucle tourne"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'LoopThread':
+        """Démarre la boucle et attend qu'elle soit prête"""
+        if self.running:
+            return self
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """
+        Soumet une coroutine à la boucle depuis n'importe quel thread
+
+        Args:
+            coro: Coroutine à exécuter
+
+        Returns:
+            Un Future thread-safe ; l'annuler annule la tâche asyncio
+        """
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Exécute une coroutine sur la boucle et attend son résultat (hors du thread de la boucle)"""
+        return self.submit(coro).result(timeout)
+
+    def shared(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Retourne une ressource partagée par toutes les opérations de la boucle
+
+        À appeler depuis la boucle : la ressource est créée au premier appel.
+
+        Args:
+            key: Nom de la ressource
+            factory: Fonction créant la ressource
+
+        Returns:
+            La ressource
+        """
+        resource = self._resources.get(key)
+        if resource is None or getattr(resource, "closed", False):
+            resource = self._resources[key] = factory()
+        return resource
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Annule les opérations en cours, ferme les ressources partagées et arrête la boucle"""
+        if not self.running:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout)
+        except (concurrent.futures.TimeoutError, RuntimeError):
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
+        self._thread = None
+
+    async def _shutdown(self) -> None:
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        resources, self._resources = self._resources, {}
+        for resource in resources.values():
+            close = getattr(resource, "close", None)
+            if close is not None:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+
+
+_loop_thread: Optional[LoopThread] = None
+_lock = threading.Lock()
+
+
+def get_loop_thread() -> LoopThread:
+    """Retourne la boucle persistante de l'application, en la démarrant si nécessaire"""
+    global _loop_thread
+    with _lock:
+        if _loop_thread is None or not _loop_thread.running:
+            _loop_thread = LoopThread().start()
+        return _loop_thread
+
+
+def current() -> Optional[LoopThread]:
+    """Retourne la boucle persistante si l'appelant s'exécute dessus, sinon None"""
+    loop_thread = _loop_thread
+    if loop_thread is None or loop_thread.loop is None:
+        return None
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return loop_thread if running is loop_thread.loop else None
+
+
+def shutdown() -> None:
+    """Arrête la boucle persistante"""
+    global _loop_thread
+    with _lock:
+        if _loop_thread is not None:
+            _loop_thread.stop()
+            _loop_thread = None
+
+
+atexit.register(shutdown)
@@ -1,34 +1,63 @@
+import datetime
 import sys
-import asyncio
+from functools import partial
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout,
                              QLineEdit, QPushButton, QTextEdit, QLabel, QFileDialog, QProgressBar,
                              QMessageBox)
-from PyQt6.QtCore import pyqtSignal, QThread, Qt
+from PyQt6.QtCore import pyqtSignal, QObject, Qt
 from PyQt6.QtGui import QFont
 from iptv_client import IPTVClient
 from config_manager import CONFIG
+from tracing import TRACER
+import loop_thread
 
 
-class Worker(QThread):
+class Worker(QObject):
     finished = pyqtSignal(object)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
 
+    # Workers en cours : gardés en vie jusqu'à la fin de leur opération,
+    # même si l'onglet lance une autre opération entre-temps
+    _active = set()
+
     def __init__(self, func, *args, **kwargs):
         super().__init__()
         self.func = func
         self.args = args
         self.kwargs = kwargs
-
-    def run(self):
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.func(*self.args, **self.kwargs))
-            loop.close()
-            self.finished.emit(result)
-        except Exception as e:
-            self.error.emit(str(e))
+        self.future = None
+
+    def start(self):
+        # L'opération s'exécute sur la boucle persistante, en parallèle des autres ;
+        # les signaux émis depuis le thread de la boucle sont remis au thread Qt
+        Worker._active.add(self)
+        self.future = loop_thread.get_loop_thread().submit(self._run())
+        self.future.add_done_callback(self._done)
+
+    def report_progress(self, done, total):
+        # Rappel on_progress du client : pourcentage relayé au thread Qt
+        self.progress.emit(int(done * 100 / total))
+
+    def cancel(self):
+        if self.future is not None:
+            self.future.cancel()
+
+    async def _run(self):
+        # Span racine : les étapes du client s'y rattachent via le contexte de la tâche
+        with TRACER.span("worker", operation=getattr(self.func, "__name__", "task")):
+            return await self.func(*self.args, **self.kwargs)
+
+    def _done(self, future):
+        Worker._active.discard(self)
+        if future.cancelled():
+            self.error.emit("Operation cancelled")
+            return
+        error = future.exception()
+        if error is not None:
+            self.error.emit(str(error))
+        else:
+            self.finished.emit(future.result())
 
 
 class MultiInfoTab(QWidget):
@@ -47,12 +76,31 @@ class MultiInfoTab(QWidget):
         self.multi_urls.setMaximumHeight(100)
         layout.addWidget(self.multi_urls)
 
+        # Registre des comptes : utilisé quand la zone d'URLs est vide, ouvert au premier usage
+        self._registry = None
+        registry_layout = QHBoxLayout()
+        self.registry_filter = QLineEdit()
+        self.registry_filter.setPlaceholderText("Registry filter when no URL is pasted (e.g. host:example.com status:Active expiring:7 error)")
+        registry_layout.addWidget(self.registry_filter)
+        self.registry_btn = QPushButton("📇 Show Registry")
+        self.registry_btn.clicked.connect(self.show_registry)
+        registry_layout.addWidget(self.registry_btn)
+        layout.addLayout(registry_layout)
+
         # Buttons
         btn_layout = QHBoxLayout()
         self.multi_fetch_btn = QPushButton("🔍 Fetch All Server Infos")
         self.multi_fetch_btn.clicked.connect(self.fetch_multi_info)
         btn_layout.addWidget(self.multi_fetch_btn)
 
+        self.merge_btn = QPushButton("🔀 Merge Live Playlists")
+        self.merge_btn.clicked.connect(self.merge_multi)
+        btn_layout.addWidget(self.merge_btn)
+
+        self.failover_btn = QPushButton("⚡ Failover Playlist")
+        self.failover_btn.clicked.connect(self.failover_multi)
+        btn_layout.addWidget(self.failover_btn)
+
         self.clear_btn = QPushButton("🗑️ Clear")
         self.clear_btn.clicked.connect(self.clear_all)
         btn_layout.addWidget(self.clear_btn)
@@ -69,81 +117,77 @@ class MultiInfoTab(QWidget):
 
         self.multi_client = None
 
+    @property
+    def registry(self):
+        # sqlite3 et le module des comptes ne sont chargés qu'au premier usage, pas au démarrage
+        if self._registry is None:
+            from accounts import AccountRegistry
+            self._registry = AccountRegistry.from_config(CONFIG)
+        return self._registry
+
     def clear_all(self):
         self.multi_urls.clear()
         self.multi_results.clear()
 
     def clean_url(self, url_str):
         """Clean and convert URL to player_api.php format, handling direct stream URLs."""
-        if not url_str or url_str.strip().lower() in ['m3u', '']:
-            return None
-        url = url_str.strip()
-        from urllib.parse import urlparse, urlunparse, parse_qs
-
-        parsed = urlparse(url)
-        username = None
-        password = None
-
-        if len(parsed.path.split('/')) >= 4 and not 'get.php' in url and not 'player_api.php' in url:
-            # Assume direct stream format: /username/password/id
-            path_parts = [p for p in parsed.path.split('/') if p]
-            if len(path_parts) >= 3:
-                username = path_parts[-3]
-                password = path_parts[-2]
-                # Reconstruct base URL
-                host_port = f"{parsed.scheme}://{parsed.netloc}"
-                # Construct player_api URL with username/password
-                url = f"{host_port}/player_api.php?username={username}&password={password}"
-        elif 'get.php' in url or 'player_api.php' in url:
-            # Extract from query
-            query = parse_qs(parsed.query)
-            username = query.get('username', [None])[0]
-            password = query.get('password', [None])[0]
-            if username and password:
-                host_port = f"{parsed.scheme}://{parsed.netloc}"
-                # Ensure player_api format
-                if 'get.php' in url:
-                    url = f"{host_port}/player_api.php?username={username}&password={password}"
-                else:
-                    url = f"{host_port}/player_api.php?username={username}&password={password}"
-            else:
-                return None
-        else:
-            # Standard URL with query
-            username = parsed.username or parse_qs(parsed.query).get('username', [None])[0]
-            password = parsed.password or parse_qs(parsed.query).get('password', [None])[0]
-            if username and password:
-                host_port = f"{parsed.scheme}://{parsed.netloc}"
-                url = f"{host_port}/player_api.php?username={username}&password={password}"
-            else:
-                return None
-
-        return url if username and password and url.startswith(('http://', 'https://')) else None
+        from accounts import normalize_account_url
+        return normalize_account_url(url_str)
 
-    def fetch_multi_info(self):
+    def _collect_urls(self):
+        # URLs collées : importées dans le registre, qui les normalise une fois pour toutes ;
+        # sinon, la liste de travail vient d'une recherche dans le registre
+        from accounts import parse_filter
         urls_text = self.multi_urls.toPlainText().strip()
         if not urls_text:
-            self.multi_results.setText("Please enter URLs.")
-            return
+            try:
+                filters = parse_filter(self.registry_filter.text())
+            except ValueError as e:
+                self.multi_results.setText(f"Error: {e}")
+                return []
+            cleaned_urls = self.registry.urls(**filters)
+            if not cleaned_urls:
+                self.multi_results.setText("Please enter URLs, or a filter matching registered accounts.")
+            return cleaned_urls
+
+        result = self.registry.import_urls(urls_text.split('\n'))
+        self.multi_results.clear()
+        for raw in result.invalid:
+            self.multi_results.append(f"Skipped invalid: {raw}")
+        # Une URL collée deux fois n'est traitée qu'une fois
+        cleaned_urls = list(dict.fromkeys(result.urls))
+        if not cleaned_urls:
+            self.multi_results.setText("No valid URLs found after cleaning.")
+        return cleaned_urls
 
-        raw_urls = [url.strip() for url in urls_text.split('\n') if url.strip()]
-        cleaned_urls = []
-        for raw in raw_urls:
-            clean = self.clean_url(raw)
-            if clean:
-                cleaned_urls.append(clean)
-            else:
-                self.multi_results.append(f"Skipped invalid: {raw}")
+    def show_registry(self):
+        from accounts import parse_filter
+        try:
+            accounts = self.registry.find(**parse_filter(self.registry_filter.text()))
+        except ValueError as e:
+            self.multi_results.setText(f"Error: {e}")
+            return
+        lines = [f"{len(accounts)} registered account(s) matching the filter"]
+        for account in accounts:
+            expires = (datetime.datetime.fromtimestamp(account.expires_at).strftime("%Y-%m-%d")
+                       if account.expires_at else "Unlimited")
+            line = (f"{account.username}@{account.host}:{account.port}  status: {account.status}  "
+                    f"expires: {expires}  max connections: {account.max_connections or 'Unlimited'}")
+            if account.error:
+                line += f"  last error: {account.error}"
+            lines.append(line)
+        self.multi_results.setText("\n".join(lines))
 
+    def fetch_multi_info(self):
+        cleaned_urls = self._collect_urls()
         if not cleaned_urls:
-            self.multi_results.setText("No valid URLs found after cleaning.")
             return
 
         self.multi_fetch_btn.setEnabled(False)
-        self.worker = Worker(self._fetch_multi_async, cleaned_urls)
-        self.worker.finished.connect(self._on_multi_finished)
-        self.worker.error.connect(self._on_multi_error)
-        self.worker.start()
+        worker = Worker(self._fetch_multi_async, cleaned_urls)
+        worker.finished.connect(self._on_multi_finished)
+        worker.error.connect(self._on_multi_error)
+        worker.start()
 
     async def _fetch_multi_async(self, urls):
         results = {}
@@ -154,6 +198,8 @@ class MultiInfoTab(QWidget):
                 results[url] = info
             except Exception as e:
                 results[url] = {"error": str(e)}
+            # Dernier état connu, pour les recherches par statut et par expiration
+            self.registry.record_info(url, results[url])
         return results
 
     def _on_multi_finished(self, results):
@@ -172,6 +218,73 @@ class MultiInfoTab(QWidget):
         self.multi_fetch_btn.setEnabled(True)
         self.multi_results.setText(f"Error: {err}")
 
+    def merge_multi(self):
+        cleaned_urls = self._collect_urls()
+        if not cleaned_urls:
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Merged Playlist", "merged.m3u",
+                                                  "M3U Files (*.m3u);;Compressed M3U (*.m3u.gz)")
+        if not filename:
+            return
+
+        from merge import merge_playlists
+        self._set_merge_enabled(False)
+        self.multi_results.setText(f"Merging {len(cleaned_urls)} playlists...")
+        worker = Worker(merge_playlists, cleaned_urls, filename)
+        worker.finished.connect(self._on_merge_finished)
+        worker.error.connect(self._on_merge_error)
+        worker.start()
+
+    def failover_multi(self):
+        cleaned_urls = self._collect_urls()
+        if not cleaned_urls:
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Failover Playlist", "failover.m3u",
+                                                  "M3U Files (*.m3u);;Compressed M3U (*.m3u.gz)")
+        if not filename:
+            return
+
+        from merge import failover_playlist
+        self._set_merge_enabled(False)
+        self.multi_results.setText(f"Testing and ranking channels from {len(cleaned_urls)} accounts...")
+        worker = Worker(failover_playlist, cleaned_urls, filename, probe=True)
+        worker.finished.connect(self._on_failover_finished)
+        worker.error.connect(self._on_merge_error)
+        worker.start()
+
+    def _set_merge_enabled(self, enabled):
+        self.merge_btn.setEnabled(enabled)
+        self.failover_btn.setEnabled(enabled)
+
+    def _on_failover_finished(self, result):
+        self._set_merge_enabled(True)
+        output = f"Failover playlist saved to {result.path}\n"
+        output += f"{result.kept} channels, {result.duplicates} backup sources ranked by measured latency\n"
+        for account in result.accounts:
+            if account.error:
+                output += f"\n{account.account}: Error: {account.error}"
+            else:
+                output += f"\n{account.account}: best source for {account.kept}/{account.streams} channels"
+        self.multi_results.setText(output)
+
+    def _on_merge_finished(self, result):
+        self._set_merge_enabled(True)
+        output = f"Merged playlist saved to {result.path}\n"
+        output += f"{result.kept} channels kept, {result.duplicates} duplicates removed\n"
+        for account in result.accounts:
+            if account.error:
+                output += f"\n{account.account}: Error: {account.error}"
+            else:
+                output += (f"\n{account.account}: {account.kept}/{account.streams} channels kept "
+                           f"({account.latency:.2f}s)")
+        self.multi_results.setText(output)
+
+    def _on_merge_error(self, err):
+        self._set_merge_enabled(True)
+        self.multi_results.setText(f"Error: {err}")
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -246,6 +359,18 @@ class MainWindow(QMainWindow):
         self.vod_btn.clicked.connect(self.generate_vod)
         gen_layout.addWidget(self.vod_btn)
 
+        self.series_btn = QPushButton("📚 Generate Series M3U")
+        self.series_btn.clicked.connect(self.generate_series)
+        gen_layout.addWidget(self.series_btn)
+
+        self.epg_btn = QPushButton("🗓️ Generate TV M3U + EPG")
+        self.epg_btn.clicked.connect(self.generate_epg)
+        gen_layout.addWidget(self.epg_btn)
+
+        self.export_btn = QPushButton("📦 Export All Formats")
+        self.export_btn.clicked.connect(self.export_all)
+        gen_layout.addWidget(self.export_btn)
+
         single_layout.addLayout(gen_layout)
 
         # M3U preview
@@ -344,18 +469,21 @@ class MainWindow(QMainWindow):
             return
 
         self.fetch_btn.setEnabled(False)
-        self.worker = Worker(self._fetch_info_async, url, use_cache=True)
-        self.worker.finished.connect(self._on_fetch_finished)
-        self.worker.error.connect(self._on_error)
-        self.worker.start()
-
-    async def _fetch_info_async(self, url, use_cache=True):
-        self.client = IPTVClient(url, use_cache=use_cache)
-        info = await self.client.get_server_info()
-        return info
-
-    def _on_fetch_finished(self, result):
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "get_server_info",
+                                     self._on_fetch_finished)
+        worker.start()
+
+    def _client_worker(self, client, method, on_finished, *args, **kwargs):
+        # Chaque opération a son propre worker et son propre client, liés au résultat :
+        # des opérations simultanées sur la boucle partagée ne se mélangent pas
+        worker = Worker(getattr(client, method), *args, **kwargs)
+        worker.finished.connect(partial(on_finished, client))
+        worker.error.connect(self._on_error)
+        return worker
+
+    def _on_fetch_finished(self, client, result):
         self.fetch_btn.setEnabled(True)
+        self.client = client
         if isinstance(result, dict):
             # Hide password in display
             display_info = {k: v for k, v in result.items() if k != "password"}
@@ -372,14 +500,9 @@ class MainWindow(QMainWindow):
 
         self.generate_btn.setEnabled(False)
         self.radio_btn.setEnabled(False)
-        self.worker = Worker(self._generate_async, url, use_cache=True)
-        self.worker.finished.connect(self._on_generate_finished)
-        self.worker.error.connect(self._on_error)
-        self.worker.start()
-
-    async def _generate_async(self, url, use_cache=True):
-        self.client = IPTVClient(url, use_cache=use_cache)
-        return await self.client.generate_m3u()
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "generate_m3u",
+                                     self._on_generate_finished)
+        worker.start()
 
     def generate_radio(self):
         url = self.url_input.text().strip()
@@ -390,14 +513,9 @@ class MainWindow(QMainWindow):
         self.radio_btn.setEnabled(False)
         self.generate_btn.setEnabled(False)
         self.vod_btn.setEnabled(False)
-        self.worker = Worker(self._generate_radio_async, url, use_cache=True)
-        self.worker.finished.connect(self._on_generate_finished)
-        self.worker.error.connect(self._on_error)
-        self.worker.start()
-
-    async def _generate_radio_async(self, url, use_cache=True):
-        self.client = IPTVClient(url, use_cache=use_cache)
-        return await self.client.generate_radio_m3u()
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "generate_radio_m3u",
+                                     self._on_generate_finished)
+        worker.start()
 
     def generate_vod(self):
         url = self.url_input.text().strip()
@@ -408,20 +526,92 @@ class MainWindow(QMainWindow):
         self.vod_btn.setEnabled(False)
         self.generate_btn.setEnabled(False)
         self.radio_btn.setEnabled(False)
-        self.worker = Worker(self._generate_vod_async, url, use_cache=True)
-        self.worker.finished.connect(self._on_generate_finished)
-        self.worker.error.connect(self._on_error)
-        self.worker.start()
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "generate_vod_m3u",
+                                     self._on_generate_finished)
+        worker.start()
+
+    def generate_series(self):
+        url = self.url_input.text().strip()
+        if not url:
+            self.m3u_text.setText("Please enter a URL.")
+            return
+
+        self.series_btn.setEnabled(False)
+        self.generate_btn.setEnabled(False)
+        self.radio_btn.setEnabled(False)
+        self.vod_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "generate_series_m3u",
+                                     self._on_generate_finished)
+        worker.kwargs["on_progress"] = worker.report_progress
+        worker.progress.connect(self.progress_bar.setValue)
+        worker.start()
+
+    def generate_epg(self):
+        url = self.url_input.text().strip()
+        if not url:
+            self.m3u_text.setText("Please enter a URL.")
+            return
+
+        epg_path, _ = QFileDialog.getSaveFileName(self, "Save EPG", "epg.xml", "XMLTV Files (*.xml)")
+        if not epg_path:
+            return
+
+        self.epg_btn.setEnabled(False)
+        self.generate_btn.setEnabled(False)
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "generate_epg",
+                                     partial(self._on_epg_finished, epg_path=epg_path), epg_path)
+        worker.start()
+
+    def _on_epg_finished(self, client, outcome, epg_path):
+        content, result = outcome
+        self.epg_btn.setEnabled(True)
+        self._on_generate_finished(client, content)
+        self.info_text.append(
+            f"EPG saved to: {epg_path}\n"
+            f"Channels: {result.channels_kept}/{result.channels}, "
+            f"programmes: {result.programmes_kept}/{result.programmes}, "
+            f"streams with tvg-id: {len(result.tvg_ids)}"
+        )
+
+    def export_all(self):
+        url = self.url_input.text().strip()
+        if not url:
+            self.m3u_text.setText("Please enter a URL.")
+            return
 
-    async def _generate_vod_async(self, url, use_cache=True):
-        self.client = IPTVClient(url, use_cache=use_cache)
-        return await self.client.generate_vod_m3u()
+        output_dir = QFileDialog.getExistingDirectory(self, "Export Directory")
+        if not output_dir:
+            return
 
-    def _on_generate_finished(self, content):
+        self.export_btn.setEnabled(False)
+        worker = self._client_worker(IPTVClient(url, use_cache=True), "export", self._on_export_finished,
+                                     output_dir, formats=("m3u", "m3u_plus", "json", "csv"))
+        worker.start()
+
+    def _on_export_finished(self, client, paths):
+        self.export_btn.setEnabled(True)
+        files = [path for kind_paths in paths.values() for path in kind_paths.values()]
+        # Statistiques du client de cet export, pas de la dernière opération lancée
+        stats = client.get_transfer_stats()
+        self.m3u_text.setText(
+            "Exported files:\n" + "\n".join(files) +
+            f"\n\nDownloaded: {stats['bytes_received'] / 1e6:.1f} MB "
+            f"({stats['bytes_decoded'] / 1e6:.1f} MB uncompressed), "
+            f"written: {stats['bytes_written'] / 1e6:.1f} MB"
+        )
+
+    def _on_generate_finished(self, client, content):
         self.generate_btn.setEnabled(True)
         self.radio_btn.setEnabled(True)
         self.vod_btn.setEnabled(True)
+        self.series_btn.setEnabled(True)
+        self.progress_bar.setVisible(False)
         if content:
+            # Le client qui a produit la playlist affichée sert au test et à l'enregistrement
+            self.client = client
             self.m3u_content = content
             self.m3u_lines = content.split('\n')
             self.filter_m3u()
@@ -440,19 +630,20 @@ class MainWindow(QMainWindow):
         self.test_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate
-        self.worker = Worker(self._test_async, self.m3u_content)
-        self.worker.finished.connect(self._on_test_finished)
-        self.worker.error.connect(self._on_error)
-        self.worker.progress.connect(self.progress_bar.setValue)
-        self.worker.start()
-
-    async def _test_async(self, m3u_content):
-        if not self.client:
-            url = self.url_input.text().strip()
-            self.client = IPTVClient(url, use_cache=True)
-        return await self.client.test_channels(m3u_content)
-
-    def _on_test_finished(self, results):
+        client = self.client or IPTVClient(self.url_input.text().strip(), use_cache=True)
+        try:
+            # Un test interrompu reprend là où il s'était arrêté
+            journal_path = client.checkpoint_path()
+        except ValueError as e:
+            self.test_btn.setEnabled(True)
+            self._on_error(str(e))
+            return
+        worker = self._client_worker(client, "test_channels", self._on_test_finished,
+                                     self.m3u_content, journal_path=journal_path)
+        worker.progress.connect(self.progress_bar.setValue)
+        worker.start()
+
+    def _on_test_finished(self, client, results):
         self.test_btn.setEnabled(True)
         self.remove_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
@@ -461,7 +652,9 @@ class MainWindow(QMainWindow):
             working = results.get('working', 0)
             failed = results.get('failed', 0)
             self.working_urls = results.get('working_urls', set())
-            self.test_results.setText(f"Total: {total}, Working: {working}, Failed: {failed}")
+            resumed = results.get('resumed', 0)
+            resumed_str = f" (resumed {resumed} from checkpoint)" if resumed else ""
+            self.test_results.setText(f"Total: {total}, Working: {working}, Failed: {failed}{resumed_str}")
         else:
             self.test_results.setText("Test failed.")
             self.working_urls = set()
@@ -520,7 +713,7 @@ class MainWindow(QMainWindow):
             return
 
         filename, _ = QFileDialog.getSaveFileName(
-            self, "Save M3U", "playlist.m3u", "M3U Files (*.m3u)"
+            self, "Save M3U", "playlist.m3u", "M3U Files (*.m3u);;Compressed M3U (*.m3u.gz)"
         )
         if filename:
             try:
@@ -537,6 +730,10 @@ class MainWindow(QMainWindow):
         self.generate_btn.setEnabled(True)
         self.radio_btn.setEnabled(True)
         self.vod_btn.setEnabled(True)
+        self.series_btn.setEnabled(True)
+        self.epg_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.progress_bar.setVisible(False)
         self.remove_btn.setEnabled(False)
         self.info_text.setText(f"Error: {err}")
         self.m3u_text.setText("")
@@ -546,6 +743,8 @@ class MainWindow(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    # Rechargement à chaud de config.ini ([reload] enabled)
+    CONFIG.watch_if_enabled()
 
     # Apply original simple styling
     app.setStyleSheet("""
@@ -636,7 +835,9 @@ def main():
 
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    status = app.exec()
+    loop_thread.shutdown()
+    sys.exit(status)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,358 @@
+"""
+Module de fusion de playlists pour l'application IPTV to M3U Converter
+Fusionne les catalogues de plusieurs comptes en une seule playlist sans doublons,
+écrite dans l'ordre de fiabilité des comptes
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config_manager import CONFIG
+from epg import normalize_channel_name
+from export import SINKS, PlaylistEntry, iter_entries
+from iptv_client import IPTVClient
+from rate_limiter import ConcurrencyLimiter
+from tracing import TRACER
+
+# Durée de récupération lissée (moyenne mobile exponentielle) de chaque compte lors des fusions précédentes
+_latencies: Dict[str, float] = {}
+_LATENCY_SMOOTHING = 0.3
+
+# Modes d'écriture des sources équivalentes (voir failover_playlist)
+FAILOVER_MODES = ("ordered", "backup")
+
+
+@dataclass
+class AccountResult:
+    """Contribution d'un compte à une fusion"""
+    account: str
+    streams: int = 0
+    kept: int = 0
+    duplicates: int = 0
+    latency: float = 0.0
+    error: str = ""
+
+
+@dataclass
+class MergeResult:
+    """Résultat d'une fusion de playlists"""
+    path: str
+    accounts: List[AccountResult] = field(default_factory=list)  # Dans l'ordre d'écriture
+    bytes_written: int = 0
+
+    @property
+    def kept(self) -> int:
+        """Nombre de chaînes écrites"""
+        return sum(account.kept for account in self.accounts)
+
+    @property
+    def duplicates(self) -> int:
+        """Nombre de chaînes ignorées car déjà présentes dans la playlist"""
+        return sum(account.duplicates for account in self.accounts)
+
+
+class DedupIndex:
+    """
+    Index de hachage des chaînes déjà écrites
+
+    Une chaîne est un doublon si son tvg-id ou son nom normalisé a déjà été
+    vu. Seuls les hachages des clés sont conservés : la mémoire dépend du
+    nombre de chaînes distinctes, pas de la taille des catalogues.
+    """
+
+    __slots__ = ('_seen',)
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, entry: PlaylistEntry) -> bool:
+        """
+        Enregistre une chaîne
+
+        Args:
+            entry: Entrée de playlist
+
+        Returns:
+            True si la chaîne est nouvelle, False si c'est un doublon
+        """
+        keys = _dedup_keys(entry)
+        if not keys:
+            # Ni identifiant ni nom exploitable : impossible de reconnaître un doublon
+            return True
+        if any(key in self._seen for key in keys):
+            return False
+        self._seen.update(keys)
+        return True
+
+
+def _dedup_keys(entry: PlaylistEntry) -> List[int]:
+    """Hachages du tvg-id et du nom normalisé d'une chaîne (vide si aucun n'est exploitable)"""
+    keys = []
+    if entry.tvg_id:
+        keys.append(hash(('id', entry.tvg_id.lower())))
+    name = normalize_channel_name(entry.name)
+    if name:
+        keys.append(hash(('name', name)))
+    return keys
+
+
+def group_equivalents(entries: Iterator[PlaylistEntry]) -> List[List[PlaylistEntry]]:
+    """
+    Regroupe les chaînes équivalentes (même tvg-id ou même nom normalisé)
+
+    Args:
+        entries: Entrées de playlist, du compte prioritaire au dernier
+
+    Returns:
+        Les groupes, dans l'ordre de première apparition, chacun dans l'ordre des entrées
+    """
+    groups: List[List[PlaylistEntry]] = []
+    index: Dict[int, int] = {}
+    for entry in entries:
+        keys = _dedup_keys(entry)
+        group_id = next((index[key] for key in keys if key in index), None)
+        if group_id is None:
+            group_id = len(groups)
+            groups.append([])
+        groups[group_id].append(entry)
+        for key in keys:
+            index.setdefault(key, group_id)
+    return groups
+
+
+def rank_accounts(clients: List[IPTVClient]) -> List[IPTVClient]:
+    """
+    Classe les comptes du plus fiable au moins fiable
+
+    Les comptes dont le disjoncteur a enregistré des échecs passent après les
+    autres, puis les plus rapides lors des fusions précédentes passent en premier.
+
+    Args:
+        clients: Clients des comptes (URL déjà analysée)
+
+    Returns:
+        Les clients classés
+    """
+    def score(client: IPTVClient):
+        breaker = client.get_breaker()
+        failures = breaker.failures if breaker is not None else 0
+        return failures, _latencies.get(_account_label(client), float('inf'))
+    return sorted(clients, key=score)
+
+
+def _account_label(client: IPTVClient) -> str:
+    """Identifiant du compte sans mot de passe (plusieurs panels peuvent partager un hôte)"""
+    return f"{client.username}@{client.host}:{client.port}"
+
+
+def _unique_entries(entries: Iterator[PlaylistEntry], index: DedupIndex,
+                    result: AccountResult) -> Iterator[PlaylistEntry]:
+    """Filtre les doublons d'un catalogue en comptant les chaînes gardées et ignorées"""
+    for entry in entries:
+        result.streams += 1
+        if index.add(entry):
+            result.kept += 1
+            yield entry
+        else:
+            result.duplicates += 1
+
+
+async def merge_playlists(urls: List[str], path: str, kind: str = "live", fmt: str = "m3u",
+                          max_concurrent: Optional[int] = None,
+                          on_account: Optional[Callable[[AccountResult], None]] = None) -> MergeResult:
+    """
+    Fusionne les playlists de plusieurs comptes en un seul fichier
+
+    Les catalogues sont téléchargés en parallèle (au plus `max_concurrent` à
+    la fois, lancés dans l'ordre de rank_accounts) et écrits dans ce même
+    ordre : les comptes les mieux classés fournissent les chaînes, les suivants
+    ne complètent qu'avec celles qui manquent. Un catalogue arrivé avant celui
+    d'un compte mieux classé attend son tour en gardant sa place ; chaque
+    catalogue est libéré dès qu'il est écrit, si bien que la mémoire est bornée
+    par `max_concurrent` catalogues quel que soit le nombre de comptes.
+
+    Args:
+        urls: URLs des comptes (player_api.php ou get.php)
+        path: Chemin du fichier fusionné (.gz ou .zst pour le compresser)
+        kind: Type de contenu (live, radio ou vod)
+        fmt: Format du fichier (clé de export.SINKS)
+        max_concurrent: Nombre maximal de catalogues en cours (par défaut: [merge] max_concurrent_accounts)
+        on_account: Fonction appelée après l'écriture (ou l'échec) de chaque compte
+
+    Returns:
+        Le résultat de la fusion, avec la contribution de chaque compte
+    """
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown export format '{fmt}' (available: {', '.join(SINKS)})")
+    clients = []
+    for url in urls:
+        client = IPTVClient(url)
+        client.parse_url()
+        clients.append(client)
+    if max_concurrent is None:
+        max_concurrent = CONFIG.get('merge', 'max_concurrent_accounts', 4)
+
+    result = MergeResult(path=str(Path(path)))
+    index = DedupIndex()
+    sink = SINKS[fmt](path)
+    limiter = ConcurrencyLimiter(max_concurrent)
+    ranked = rank_accounts(clients)
+    # Levé quand le compte de ce rang est écrit (ou en échec) : le suivant peut écrire
+    written = [asyncio.Event() for _ in ranked]
+
+    async def merge_account(position: int) -> None:
+        client = ranked[position]
+        account = AccountResult(_account_label(client))
+        # Le limiteur admet les comptes dans l'ordre d'arrivée, donc de classement :
+        # le compte qui précède a toujours déjà sa place, l'attente ne peut pas bloquer
+        async with limiter:
+            started = time.perf_counter()
+            source = None
+            try:
+                source = await client.get_source(kind)
+            except Exception as e:
+                account.error = str(e) or type(e).__name__
+            else:
+                account.latency = time.perf_counter() - started
+                previous = _latencies.get(account.account)
+                _latencies[account.account] = account.latency if previous is None else (
+                    previous + _LATENCY_SMOOTHING * (account.latency - previous))
+            if position:
+                await written[position - 1].wait()
+            if source is not None:
+                entries = iter_entries(source.catalog, source.cat_map, source.url_prefix,
+                                       source.default_extension, source.use_extension)
+                # Un seul catalogue écrit à la fois, dans l'ordre du classement, hors de la boucle d'événements
+                await asyncio.to_thread(sink.write_entries, _unique_entries(entries, index, account))
+                del source, entries
+        result.accounts.append(account)
+        if on_account:
+            on_account(account)
+        written[position].set()
+
+    with TRACER.span("merge", kind=kind, format=fmt, accounts=len(clients)) as span:
+        await asyncio.to_thread(sink.open)
+        tasks = [asyncio.ensure_future(merge_account(position)) for position in range(len(ranked))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Écriture en échec : les comptes suivants attendraient leur tour indéfiniment
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            result.bytes_written = await asyncio.to_thread(sink.close)
+        span.set_attributes(items=result.kept, duplicates=result.duplicates, bytes=result.bytes_written)
+    return result
+
+
+def _failover_entries(groups: List[List[PlaylistEntry]], mode: str) -> Iterator[PlaylistEntry]:
+    """Parcourt des groupes déjà classés selon le mode d'écriture"""
+    if mode == "ordered":
+        for group in groups:
+            yield from group
+        return
+    # Mode backup : la meilleure source de chaque chaîne, puis les sources de secours
+    for group in groups:
+        yield group[0]
+    for group in groups:
+        for entry in group[1:]:
+            yield PlaylistEntry(entry.name, f"{entry.group} (Backup)", entry.logo, entry.url,
+                                entry.tvg_id, entry.catchup_days)
+
+
+async def failover_playlist(urls: List[str], path: str, kind: str = "live", fmt: str = "m3u",
+                            mode: str = "ordered", probe: bool = False,
+                            max_concurrent: Optional[int] = None) -> MergeResult:
+    """
+    Génère une playlist où chaque chaîne liste ses sources de la plus fiable à la moins fiable
+
+    Les chaînes équivalentes des différents comptes sont regroupées puis
+    classées par taux de succès et temps de première réponse mesurés par
+    IPTVClient.test_channels (registre ChannelHealth). Contrairement à
+    merge_playlists, tous les catalogues sont gardés en mémoire le temps du
+    regroupement.
+
+    Args:
+        urls: URLs des comptes (player_api.php ou get.php)
+        path: Chemin du fichier (.gz ou .zst pour le compresser)
+        kind: Type de contenu (live, radio ou vod)
+        fmt: Format du fichier (clé de export.SINKS)
+        mode: "ordered" (sources d'une chaîne consécutives, la meilleure en premier)
+              ou "backup" (meilleures sources d'abord, les autres dans des groupes « (Backup) »)
+        probe: Tester d'abord les sources des chaînes présentes sur plusieurs comptes
+        max_concurrent: Nombre maximal de catalogues en cours (par défaut: [merge] max_concurrent_accounts)
+
+    Returns:
+        Le résultat : `kept` compte les chaînes distinctes (par compte, celles dont
+        il fournit la meilleure source) et `duplicates` les sources de secours
+    """
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown export format '{fmt}' (available: {', '.join(SINKS)})")
+    if mode not in FAILOVER_MODES:
+        raise ValueError(f"Unknown failover mode '{mode}' (available: {', '.join(FAILOVER_MODES)})")
+    clients = []
+    for url in urls:
+        client = IPTVClient(url)
+        client.parse_url()
+        clients.append(client)
+    clients = rank_accounts(clients)
+    if max_concurrent is None:
+        max_concurrent = CONFIG.get('merge', 'max_concurrent_accounts', 4)
+
+    result = MergeResult(path=str(Path(path)))
+    accounts = [AccountResult(_account_label(client)) for client in clients]
+    catalogs: List[List[PlaylistEntry]] = [[] for _ in clients]
+    limiter = ConcurrencyLimiter(max_concurrent)
+
+    async def fetch_account(position: int) -> None:
+        account = accounts[position]
+        async with limiter:
+            started = time.perf_counter()
+            try:
+                source = await clients[position].get_source(kind)
+            except Exception as e:
+                account.error = str(e) or type(e).__name__
+                return
+            account.latency = time.perf_counter() - started
+            catalogs[position] = list(iter_entries(source.catalog, source.cat_map, source.url_prefix,
+                                                   source.default_extension, source.use_extension))
+            account.streams = len(catalogs[position])
+
+    with TRACER.span("failover", kind=kind, format=fmt, mode=mode, accounts=len(clients)) as span:
+        await asyncio.gather(*(fetch_account(position) for position in range(len(clients))))
+        # Les comptes prioritaires d'abord : à mesures égales, leur source reste en tête
+        owners = {}
+        for position, entries in enumerate(catalogs):
+            for entry in entries:
+                owners[entry.url] = position
+        groups = group_equivalents(entry for entries in catalogs for entry in entries)
+        del catalogs
+
+        health = IPTVClient.get_channel_health()
+        if probe and clients:
+            candidates = [entry for group in groups if len(group) > 1 for entry in group]
+            if candidates:
+                lines = ["#EXTM3U"]
+                for entry in candidates:
+                    lines += [f"#EXTINF:-1,{entry.name}", entry.url]
+                await clients[0].test_channels("\n".join(lines))
+        # Tri stable : les sources jamais testées gardent l'ordre des comptes
+        for group in groups:
+            group.sort(key=lambda entry: health.score(entry.url))
+            accounts[owners[group[0].url]].kept += 1
+            for entry in group[1:]:
+                accounts[owners[entry.url]].duplicates += 1
+
+        sink = SINKS[fmt](path)
+        await asyncio.to_thread(sink.open)
+        try:
+            await asyncio.to_thread(sink.write_entries, _failover_entries(groups, mode))
+        finally:
+            result.bytes_written = await asyncio.to_thread(sink.close)
+        result.accounts = accounts
+        span.set_attributes(items=result.kept, duplicates=result.duplicates, bytes=result.bytes_written)
+    return result
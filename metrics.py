@@ -0,0 +1,267 @@
+"""
+Module de métriques pour l'application IPTV to M3U Converter
+Compteurs et histogrammes en mémoire, exportés au format texte Prometheus ou en JSON
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Bornes par défaut des histogrammes de durée, en secondes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """Retourne une clé hashable et ordonnée pour un jeu de labels"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Counter:
+    """Compteur monotone, avec une série par combinaison de labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self._lock = lock
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """
+        Incrémente le compteur
+
+        Args:
+            amount: Valeur à ajouter (positive)
+            **labels: Labels de la série
+        """
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Retourne la valeur d'une série (0 si elle n'existe pas)"""
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[Dict[str, Any]]:
+        """Retourne les séries sous forme de dictionnaires"""
+        with self._lock:
+            return [{'labels': dict(key), 'value': value} for key, value in self._values.items()]
+
+
+class Histogram:
+    """Histogramme à bornes fixes, avec une série par combinaison de labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, lock: threading.Lock, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = lock
+        # Par série : [compte par borne (non cumulé, dernière case = +Inf), somme, nombre]
+        self._series: Dict[LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Enregistre une observation
+
+        Args:
+            value: Valeur observée (ex: durée en secondes)
+            **labels: Labels de la série
+        """
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Mesure la durée d'un bloc et l'enregistre, y compris en cas d'exception"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        """Retourne le nombre d'observations d'une série"""
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> List[Dict[str, Any]]:
+        """Retourne les séries avec leurs comptes cumulés par borne"""
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                cumulative = 0
+                buckets = {}
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    buckets['+Inf' if bound == float('inf') else repr(bound)] = cumulative
+                samples.append({'labels': dict(key), 'buckets': buckets, 'sum': total, 'count': count})
+        return samples
+
+
+class MetricsRegistry:
+    """Registre des métriques de l'application"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """Retourne le compteur nommé, en le créant si nécessaire"""
+        return self._get_or_create(name, lambda: Counter(name, help_text, self._lock))
+
+    def histogram(self, name: str, help_text: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Retourne l'histogramme nommé, en le créant si nécessaire"""
+        return self._get_or_create(name, lambda: Histogram(name, help_text, self._lock, buckets))
+
+    def _get_or_create(self, name: str, factory) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        return metric
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retourne l'état de toutes les métriques
+
+        Returns:
+            Dictionnaire sérialisable en JSON, par nom de métrique
+        """
+        return {
+            name: {'type': metric.kind, 'help': metric.help, 'samples': metric.samples()}
+            for name, metric in sorted(self._metrics.items())
+        }
+
+    def reset(self) -> None:
+        """Supprime toutes les métriques"""
+        with self._lock:
+            self._metrics.clear()
+
+
+def _escape(value: str) -> str:
+    """Échappe une valeur de label (antislash, guillemet, retour à la ligne)"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    """Formate les labels au format d'exposition Prometheus"""
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+def to_prometheus(registry: MetricsRegistry) -> str:
+    """
+    Formate les métriques au format texte Prometheus
+
+    Args:
+        registry: Registre à exporter
+
+    Returns:
+        Le texte d'exposition, lisible par le collecteur textfile de node_exporter
+    """
+    lines = []
+    for name, metric in registry.snapshot().items():
+        if metric['help']:
+            lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for sample in metric['samples']:
+            labels = sample['labels']
+            if metric['type'] == 'histogram':
+                for bound, count in sample['buckets'].items():
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {sample['sum']!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {sample['value']!r}")
+    return '\n'.join(lines) + '\n'
+
+
+def to_json(registry: MetricsRegistry) -> str:
+    """
+    Formate les métriques en instantané JSON
+
+    Args:
+        registry: Registre à exporter
+
+    Returns:
+        Le document JSON, horodaté
+    """
+    return json.dumps({'timestamp': time.time(), 'metrics': registry.snapshot()}, indent=2)
+
+
+# Formats d'export disponibles
+EXPORTERS = {
+    'prometheus': to_prometheus,
+    'json': to_json,
+}
+
+
+def write_metrics(path: str, fmt: str = 'prometheus', registry: Optional[MetricsRegistry] = None) -> str:
+    """
+    Écrit les métriques dans un fichier, de façon atomique
+
+    Args:
+        path: Chemin du fichier
+        fmt: Format d'export ('prometheus' ou 'json')
+        registry: Registre à exporter (par défaut: METRICS)
+
+    Returns:
+        Le chemin du fichier écrit
+    """
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown metrics format '{fmt}' (available: {', '.join(EXPORTERS)})")
+    content = EXPORTERS[fmt](registry or METRICS)
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Fichier temporaire puis renommage : un collecteur ne lit jamais un fichier à moitié écrit
+    temp_path = target.with_name(f".{target.name}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, target)
+    return str(target)
+
+
+def configure_export(config: Any) -> Optional[str]:
+    """
+    Active l'export des métriques à la sortie du programme selon la section `metrics`
+
+    Args:
+        config: Instance de ConfigManager
+
+    Returns:
+        Le chemin du fichier d'export, ou None si l'export est désactivé
+    """
+    fmt = config.get('metrics', 'exporter', 'none')
+    if not fmt or fmt == 'none':
+        return None
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown metrics exporter '{fmt}' (available: none, {', '.join(EXPORTERS)})")
+    path = config.get('metrics', 'path', '') or ('metrics.prom' if fmt == 'prometheus' else 'metrics.json')
+    atexit.register(write_metrics, path, fmt)
+    return path
+
+
+# Registre global de l'application
+METRICS = MetricsRegistry()
@@ -0,0 +1,59 @@
+"""
+Module de rendu des playlists pour l'application IPTV to M3U Converter
+Fonctions de rendu sans état, exécutables dans un processus séparé
+"""
+
+from typing import Dict, Optional
+
+from catalog import Catalog
+
+# Un guillemet fermerait la valeur d'un attribut et un saut de ligne couperait l'entrée en deux
+_ATTRIBUTE_TABLE = str.maketrans({'"': "'", '\r': ' ', '\n': ' '})
+_TEXT_TABLE = str.maketrans({'\r': ' ', '\n': ' '})
+
+
+def m3u_attribute(value: object) -> str:
+    """Rend une valeur sûre entre les guillemets d'un attribut #EXTINF (tvg-logo, group-title...)"""
+    return str(value).translate(_ATTRIBUTE_TABLE)
+
+
+def m3u_text(value: object) -> str:
+    """Rend une valeur sûre sur sa propre ligne M3U (nom affiché, URL)"""
+    return str(value).translate(_TEXT_TABLE)
+
+
+def render_m3u(catalog: Catalog, cat_map: Dict[str, str], url_prefix: str, default_extension: str,
+               use_extension: bool = False, epg_url: Optional[str] = None) -> str:
+    """
+    Génère le contenu M3U d'un catalogue
+
+    Args:
+        catalog: Catalogue compact des flux
+        cat_map: Noms des catégories par identifiant
+        url_prefix: Préfixe des URLs de flux (ex: http://host/live/user/pass)
+        default_extension: Extension utilisée quand le flux n'en précise pas
+        use_extension: Utiliser l'extension du conteneur de chaque flux (VOD)
+        epg_url: URL du guide XMLTV ; si elle est fournie, l'en-tête porte `url-tvg`
+            et chaque entrée son `tvg-id`
+
+    Returns:
+        Le contenu de la playlist M3U
+    """
+    if epg_url is None:
+        m3u_lines = ["#EXTM3U"]
+        for record in catalog:
+            cat_name = cat_map.get(record.category_id, "Unknown")
+            extension = (record.extension if use_extension else "") or default_extension
+            m3u_lines.append(f'#EXTINF:-1 tvg-logo="{m3u_attribute(record.icon)}" '
+                             f'group-title="{m3u_attribute(cat_name)}",{m3u_text(record.name)}')
+            m3u_lines.append(f"{url_prefix}/{record.stream_id}.{extension}")
+    else:
+        m3u_lines = [f'#EXTM3U url-tvg="{epg_url}"']
+        for record in catalog:
+            cat_name = cat_map.get(record.category_id, "Unknown")
+            extension = (record.extension if use_extension else "") or default_extension
+            m3u_lines.append(f'#EXTINF:-1 tvg-id="{m3u_attribute(record.epg_id)}" tvg-logo="{m3u_attribute(record.icon)}" '
+                             f'group-title="{m3u_attribute(cat_name)}",{m3u_text(record.name)}')
+            m3u_lines.append(f"{url_prefix}/{record.stream_id}.{extension}")
+
+    return "\n".join(m3u_lines)
@@ -0,0 +1,92 @@
+"""
+Module de détection des radios pour l'application IPTV to M3U Converter
+Identifie les radios parmi les chaînes live quand le serveur n'expose pas d'API radio
+"""
+
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from catalog import Catalog, StreamRecord
+
+# Mots-clés utilisés par défaut pour reconnaître une radio
+DEFAULT_KEYWORDS = ('radio', 'radios', 'radiostation', 'radiostations', 'station', 'fm', 'am')
+
+
+class RadioClassifier:
+    """
+    Classifieur de radios par mots-clés
+
+    Tous les mots-clés sont compilés une seule fois en une alternance
+    d'expressions régulières, insensible à la casse. Un mot-clé ne correspond
+    que s'il n'est ni précédé ni suivi d'une lettre : « FM » reconnaît
+    « Nova FM » et « 104.5FM », mais « am » ne reconnaît plus « Amazon » ni
+    « Panama ».
+    """
+
+    def __init__(self, keywords: Iterable[str] = DEFAULT_KEYWORDS, match_categories: bool = False):
+        """
+        Initialise le classifieur
+
+        Args:
+            keywords: Mots-clés identifiant une radio
+            match_categories: Rechercher aussi les mots-clés dans le nom de la catégorie
+        """
+        self.keywords = tuple(sorted({k.strip().lower() for k in keywords if k.strip()}, key=len, reverse=True))
+        self.match_categories = match_categories
+        if self.keywords:
+            alternation = '|'.join(re.escape(keyword) for keyword in self.keywords)
+            # Frontières sur les lettres uniquement : les chiffres et la ponctuation séparent les mots
+            self._search = re.compile(rf'(?<![^\W\d_])(?:{alternation})(?![^\W\d_])', re.IGNORECASE).search
+        else:
+            self._search = lambda text: None
+
+    def matches(self, name: str, category: str = "") -> bool:
+        """
+        Indique si une chaîne est une radio
+
+        Args:
+            name: Nom de la chaîne
+            category: Nom de la catégorie de la chaîne
+
+        Returns:
+            True si un mot-clé apparaît dans le nom (ou la catégorie si l'option est active)
+        """
+        if self._search(name) is not None:
+            return True
+        return self.match_categories and bool(category) and self._search(category) is not None
+
+    def filter(self, catalog: Catalog, cat_map: Optional[Dict[str, str]] = None) -> Catalog:
+        """
+        Extrait les radios d'un catalogue live
+
+        Args:
+            catalog: Catalogue des chaînes live
+            cat_map: Noms des catégories par identifiant
+
+        Returns:
+            Le catalogue des radios
+        """
+        search = self._search
+        category_radio: Dict[str, bool] = {}
+        if self.match_categories and cat_map:
+            # Une seule recherche par catégorie, quel que soit le nombre de chaînes
+            category_radio = {cat_id: search(name) is not None for cat_id, name in cat_map.items()}
+
+        def is_radio(record: StreamRecord) -> bool:
+            return category_radio.get(record.category_id, False) or search(record.name) is not None
+
+        return catalog.filter(is_radio)
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'RadioClassifier':
+        """
+        Crée un classifieur à partir de la section `radio` de la configuration
+
+        Args:
+            config: Instance de ConfigManager
+
+        Returns:
+            Le classifieur
+        """
+        keywords = config.get('radio', 'keywords', ','.join(DEFAULT_KEYWORDS))
+        return cls(str(keywords).split(','), config.get('radio', 'match_categories', False))
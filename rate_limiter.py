@@ -0,0 +1,193 @@
+"""
+Module de limitation de débit pour l'application IPTV to M3U Converter
+Implémente un token bucket par hôte pour ne pas dépasser le débit toléré par un panel,
+et un limiteur de concurrence dont la limite peut changer en cours d'exécution
+"""
+
+import asyncio
+import collections
+import time
+from typing import Any, Deque, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Limiteur de débit de type token bucket
+
+    Le seau se remplit de `rate` jetons par seconde jusqu'à `burst` jetons.
+    Chaque requête consomme un jeton ; quand le seau est vide, la requête
+    réserve le prochain jeton et attend son tour. Les réservations étant
+    servies dans l'ordre d'arrivée, le limiteur est équitable et ne dépend
+    d'aucune primitive liée à une boucle d'événements.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialise le limiteur
+
+        Args:
+            rate: Nombre de requêtes autorisées par seconde (0 = illimité)
+            burst: Nombre de requêtes pouvant partir immédiatement (par défaut: 1)
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+        # Statistiques de mise en file d'attente
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def configure(self, rate: float, burst: int) -> None:
+        """
+        Modifie le débit et la rafale sans perdre les réservations en cours
+
+        Args:
+            rate: Nouveau nombre de requêtes par seconde (0 = illimité)
+            burst: Nouvelle taille de rafale
+        """
+        self._refill(time.monotonic())
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = min(self.tokens, float(self.burst))
+
+    def reserve(self) -> float:
+        """
+        Réserve un jeton
+
+        Returns:
+            Le délai en secondes à attendre avant d'envoyer la requête
+        """
+        self.requests += 1
+        if self.rate <= 0:
+            return 0.0
+
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            self.delayed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    async def acquire(self) -> float:
+        """
+        Attend qu'un jeton soit disponible
+
+        Returns:
+            Le délai d'attente effectif en secondes
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques de mise en file d'attente
+
+        Returns:
+            Dictionnaire avec le débit, la rafale et les délais d'attente
+        """
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'requests': self.requests,
+            'delayed': self.delayed,
+            'total_wait': round(self.total_wait, 3),
+            'max_wait': round(self.max_wait, 3),
+            'avg_wait': round(self.total_wait / self.requests, 3) if self.requests else 0.0
+        }
+
+    def _refill(self, now: float) -> None:
+        """Ajoute les jetons accumulés depuis la dernière mise à jour"""
+        if self.rate > 0:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class ConcurrencyLimiter:
+    """
+    Sémaphore asyncio dont la limite peut être modifiée en cours d'exécution
+
+    Augmenter la limite réveille immédiatement les tâches en attente ; la
+    réduire laisse terminer les tâches en cours et n'en admet de nouvelles
+    qu'une fois le nombre de tâches actives repassé sous la limite.
+    `set_limit` peut être appelé depuis n'importe quel thread.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialise le limiteur
+
+        Args:
+            limit: Nombre maximal de tâches simultanées
+        """
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def set_limit(self, limit: int) -> None:
+        """Modifie la limite et réveille les tâches qu'elle admet désormais"""
+        self.limit = max(1, limit)
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                # Boucle fermée entre-temps : plus aucune tâche à réveiller
+                pass
+
+    @property
+    def waiting(self) -> int:
+        """Nombre de tâches en attente d'une place"""
+        return len(self._waiters)
+
+    def locked(self) -> bool:
+        """Indique si une nouvelle tâche devrait attendre"""
+        return self.active >= self.limit or bool(self._waiters)
+
+    async def acquire(self) -> None:
+        """Attend qu'une place se libère"""
+        self._loop = asyncio.get_running_loop()
+        # Les nouvelles tâches passent après celles qui attendent déjà
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        waiter = self._loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            # La place est réservée par _wake avant le réveil
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Réveillée puis annulée : la place revient à la tâche suivante
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Libère une place"""
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Confie, dans l'ordre d'arrivée, chaque place libre à une tâche en attente"""
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def __aenter__(self) -> 'ConcurrencyLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
@@ -0,0 +1,192 @@
+"""
+Module de rafraîchissement anticipé pour l'application IPTV to M3U Converter
+Revalide en arrière-plan les entrées de cache consultées avant leur expiration
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cache import ServerCache
+from metrics import METRICS
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class RefreshScheduler:
+    """
+    Planificateur de rafraîchissement anticipé (refresh-ahead) d'un ServerCache
+
+    Chaque clé surveillée est rechargée peu avant son expiration, à un instant
+    tiré au hasard dans une fenêtre pour étaler les requêtes. Seules les
+    entrées chaudes (lues récemment) sont rafraîchies : les entrées froides
+    cessent d'être surveillées et expirent normalement.
+    """
+
+    def __init__(self, cache: ServerCache, refresh_ahead: float = 0.8, jitter: float = 0.1,
+                 max_concurrent: int = 4, idle_seconds: float = 900.0):
+        """
+        Initialise le planificateur
+
+        Args:
+            cache: Cache dont les entrées sont rafraîchies
+            refresh_ahead: Fraction de la durée de vie après laquelle rafraîchir (par défaut: 0.8)
+            jitter: Fraction de la durée de vie retranchée au hasard de l'échéance (par défaut: 0.1)
+            max_concurrent: Nombre maximal de rafraîchissements simultanés (par défaut: 4)
+            idle_seconds: Durée sans lecture après laquelle une entrée est froide (par défaut: 900s)
+        """
+        self.cache = cache
+        self.refresh_ahead = min(max(refresh_ahead, 0.0), 1.0)
+        self.jitter = min(max(jitter, 0.0), self.refresh_ahead)
+        self.max_concurrent = max(1, max_concurrent)
+        self.idle_seconds = idle_seconds
+        self._loaders: Dict[str, Loader] = {}
+        self._due: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refreshes = METRICS.counter('iptv_cache_refreshes_total', 'Background cache refreshes by cache and result')
+
+    def watch(self, key: str, loader: Loader) -> None:
+        """
+        Surveille une clé du cache
+
+        Args:
+            key: Clé de l'entrée (déjà présente dans le cache)
+            loader: Coroutine sans argument retournant la nouvelle valeur
+        """
+        self._loaders[key] = loader
+        self._schedule(key)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def unwatch(self, key: str) -> None:
+        """Cesse de surveiller une clé (l'entrée reste dans le cache jusqu'à son expiration)"""
+        self._loaders.pop(key, None)
+        self._due.pop(key, None)
+
+    @property
+    def watched(self) -> Dict[str, float]:
+        """Échéance de rafraîchissement (timestamp) de chaque clé surveillée"""
+        return dict(self._due)
+
+    @property
+    def running(self) -> bool:
+        """Indique si la tâche de fond tourne sur une boucle encore ouverte"""
+        return self._task is not None and not self._task.done() and not self._task.get_loop().is_closed()
+
+    def start(self) -> None:
+        """Démarre la tâche de fond sur la boucle en cours (sans effet si elle y tourne déjà)"""
+        loop = asyncio.get_running_loop()
+        if self.running and self._task.get_loop() is loop:
+            return
+        # Tâche restée sur une autre boucle (terminée ou fermée) : elle est remplacée
+        self.stop()
+        self._task = loop.create_task(self.run())
+
+    def stop(self) -> None:
+        """Arrête la tâche de fond"""
+        if self._task is not None:
+            if not self._task.get_loop().is_closed():
+                self._task.get_loop().call_soon_threadsafe(self._task.cancel)
+            self._task = None
+
+    async def run(self) -> None:
+        """Boucle de fond : attend la prochaine échéance puis rafraîchit les entrées dues"""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                timeout = None
+                if self._due:
+                    timeout = max(0.0, min(self._due.values()) - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.run_once()
+        finally:
+            self._wakeup = None
+
+    async def run_once(self, now: Optional[float] = None) -> int:
+        """
+        Rafraîchit les entrées arrivées à échéance
+
+        Args:
+            now: Instant de référence (par défaut: maintenant)
+
+        Returns:
+            Le nombre d'entrées rafraîchies avec succès
+        """
+        now = time.time() if now is None else now
+        due = [key for key, when in self._due.items() if when <= now]
+        refresh = []
+        for key in due:
+            entry = self.cache.cache.get(key)
+            if entry is None or entry.is_expired:
+                # Entrée évincée ou déjà expirée : plus rien à servir à chaud
+                self._refreshes.inc(cache=self.cache.name, result="expired")
+                self.unwatch(key)
+            elif self.cache.access_times.get(key, 0.0) < now - self.idle_seconds:
+                # Entrée froide : on la laisse expirer
+                self._refreshes.inc(cache=self.cache.name, result="cold")
+                self.unwatch(key)
+            else:
+                refresh.append(key)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def refresh_one(key: str) -> bool:
+            async with semaphore:
+                loader = self._loaders.get(key)
+                if loader is None:
+                    return False
+                try:
+                    value = await loader()
+                except Exception:
+                    # L'ancienne valeur reste servie ; nouvel essai à mi-chemin de l'expiration
+                    self._refreshes.inc(cache=self.cache.name, result="error")
+                    entry = self.cache.cache.get(key)
+                    if entry is not None and key in self._due:
+                        expires = entry.timestamp + entry.ttl
+                        self._due[key] = now + max(1.0, (expires - now) / 2)
+                    return False
+                if key not in self._loaders:
+                    return False
+                # Sans mettre à jour l'heure d'accès : seules les lectures gardent l'entrée chaude
+                self.cache.set(key, value, touch=False)
+                self._refreshes.inc(cache=self.cache.name, result="ok")
+                self._schedule(key)
+                return True
+
+        results = await asyncio.gather(*(refresh_one(key) for key in refresh))
+        return sum(results)
+
+    def _schedule(self, key: str) -> None:
+        """Calcule l'échéance de rafraîchissement d'une clé, avec un décalage aléatoire"""
+        entry = self.cache.cache.get(key)
+        if entry is None:
+            self.unwatch(key)
+            return
+        fraction = self.refresh_ahead - random.uniform(0.0, self.jitter)
+        self._due[key] = entry.timestamp + entry.ttl * fraction
+
+
+def create_refresh_scheduler(cache: ServerCache, config: Any) -> RefreshScheduler:
+    """
+    Crée un planificateur selon la section `refresh`
+
+    Args:
+        cache: Cache dont les entrées sont rafraîchies
+        config: Instance de ConfigManager
+
+    Returns:
+        Le planificateur (à démarrer avec start)
+    """
+    return RefreshScheduler(
+        cache,
+        refresh_ahead=config.get('refresh', 'refresh_ahead', 0.8),
+        jitter=config.get('refresh', 'jitter', 0.1),
+        max_concurrent=config.get('refresh', 'max_concurrent', 4),
+        idle_seconds=config.get('refresh', 'idle_seconds', 900.0),
+    )
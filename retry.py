@@ -0,0 +1,146 @@
+"""
+Module de reprise pour l'application IPTV to M3U Converter
+Gère les politiques de reprise (backoff exponentiel avec jitter) et les disjoncteurs par hôte
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Statuts HTTP pour lesquels une nouvelle tentative a du sens
+RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+# Méthodes HTTP sans effet de bord
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class RetryPolicy:
+    """Représente une politique de reprise pour une action"""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 10.0
+    jitter: float = 1.0  # Part aléatoire du délai (0 = aucun jitter, 1 = full jitter)
+    retry_statuses: Tuple[int, ...] = RETRYABLE_STATUSES
+
+    def compute_delay(self, attempt: int) -> float:
+        """
+        Calcule le délai d'attente avant la tentative suivante
+
+        Args:
+            attempt: Numéro de la tentative échouée (0 pour la première)
+
+        Returns:
+            Le délai en secondes
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        jitter = min(max(self.jitter, 0.0), 1.0)
+        return cap * (1 - jitter) + random.uniform(0, cap * jitter)
+
+    def is_retryable_status(self, status: int) -> bool:
+        """Vérifie si un statut HTTP justifie une nouvelle tentative"""
+        return status in self.retry_statuses
+
+    @classmethod
+    def from_config(cls, config: Any, action: Optional[str] = None) -> 'RetryPolicy':
+        """
+        Crée une politique à partir de la configuration
+
+        Les valeurs de la section `retry` servent de base, et une section
+        `retry.<action>` peut les surcharger pour une action donnée.
+
+        Args:
+            config: Instance de ConfigManager
+            action: Action player_api concernée (ex: get_vod_streams)
+
+        Returns:
+            La politique de reprise
+        """
+        defaults = cls()
+        values: Dict[str, Any] = {}
+        for section in ['retry'] + ([f'retry.{action}'] if action else []):
+            values['max_attempts'] = config.get(section, 'max_attempts', values.get('max_attempts', defaults.max_attempts))
+            values['base_delay'] = config.get(section, 'base_delay', values.get('base_delay', defaults.base_delay))
+            values['max_delay'] = config.get(section, 'max_delay', values.get('max_delay', defaults.max_delay))
+            values['jitter'] = config.get(section, 'jitter', values.get('jitter', defaults.jitter))
+            statuses = config.get(section, 'retry_statuses', None)
+            if statuses:
+                values['retry_statuses'] = tuple(int(s) for s in str(statuses).split(',') if s.strip())
+        values['max_attempts'] = max(1, values['max_attempts'])
+        return cls(**values)
+
+
+class CircuitOpenError(Exception):
+    """Levée quand le disjoncteur d'un hôte est ouvert"""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur pour un hôte
+
+    Après `failure_threshold` échecs consécutifs, le disjoncteur s'ouvre et les
+    requêtes échouent immédiatement pendant `reset_timeout` secondes. Une seule
+    requête d'essai est ensuite autorisée (état half_open) pour décider de la
+    fermeture ou d'une nouvelle ouverture.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialise le disjoncteur
+
+        Args:
+            failure_threshold: Nombre d'échecs consécutifs avant ouverture (par défaut: 5)
+            reset_timeout: Durée d'ouverture en secondes (par défaut: 30s)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Retourne l'état courant du disjoncteur"""
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Vérifie si une requête peut être envoyée"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Enregistre une requête réussie et ferme le disjoncteur"""
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Enregistre un échec et ouvre le disjoncteur si le seuil est atteint"""
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Libère la requête d'essai sans statuer (429, annulation ou erreur locale)"""
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """Retourne le temps restant avant la prochaine requête d'essai"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
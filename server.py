@@ -0,0 +1,552 @@
+"""
+Module serveur de playlists pour l'application IPTV to M3U Converter
+Sert en HTTP les playlists M3U et guides EPG pré-générés des comptes configurés,
+régénérés en arrière-plan à chaque expiration, et éventuellement leurs flux live
+
+Usage autonome :
+    python server.py [--host 127.0.0.1] [--port 8088] [--ttl 3600] [--account nom=URL ...]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+import cpu_pool
+from config_manager import CONFIG
+from iptv_client import IPTVClient
+from metrics import METRICS, to_prometheus
+from stream_proxy import StreamProxy
+from tracing import TRACER
+
+REQUESTS = METRICS.counter('iptv_server_requests_total', 'Playlist server requests by document and status')
+RENDERS = METRICS.counter('iptv_server_renders_total', 'Background playlist regenerations by account and result')
+RENDER_DURATION = METRICS.histogram('iptv_server_render_seconds', 'Background playlist regeneration duration')
+
+# Types de contenu servis et méthode de génération correspondante
+KINDS = {
+    "live": "generate_m3u",
+    "radio": "generate_radio_m3u",
+    "vod": "generate_vod_m3u",
+}
+M3U_TYPE = "audio/x-mpegurl; charset=utf-8"
+XMLTV_TYPE = "application/xml; charset=utf-8"
+
+_ACCOUNT_NAME_RE = re.compile(r'^[A-Za-z0-9_.-]+$')
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Adresses d'écoute sur toutes les interfaces, et l'adresse locale qui les joint
+_WILDCARD_HOSTS = {"": "127.0.0.1", "0.0.0.0": "127.0.0.1", "::": "::1"}
+
+
+@dataclass(frozen=True)
+class RenderedDocument:
+    """Document pré-généré, avec sa version compressée et son ETag"""
+    body: bytes
+    gzipped: bytes
+    etag: str
+    content_type: str
+    generated_at: float
+
+    @property
+    def gzip_etag(self) -> str:
+        """ETag de la version compressée (une représentation différente doit avoir son propre ETag)"""
+        return f'{self.etag[:-1]}-gzip"'
+
+
+def render_document(body: bytes, content_type: str, gzip_level: int = 6,
+                    generated_at: Optional[float] = None) -> RenderedDocument:
+    """
+    Prépare un document à servir : ETag et compression gzip calculés une seule fois
+
+    Args:
+        body: Contenu du document
+        content_type: Type MIME
+        gzip_level: Niveau de compression gzip (par défaut: 6)
+        generated_at: Date de génération (par défaut: maintenant)
+
+    Returns:
+        Le document prêt à être servi
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    # mtime=0 : une même playlist donne toujours les mêmes octets compressés
+    gzipped = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return RenderedDocument(body, gzipped, etag, content_type,
+                            time.time() if generated_at is None else generated_at)
+
+
+def etag_matches(header: str, etags: Tuple[str, ...]) -> bool:
+    """
+    Indique si un en-tête If-None-Match désigne l'un des ETags (comparaison faible)
+
+    Args:
+        header: Valeur de l'en-tête
+        etags: ETags du document
+
+    Returns:
+        True si le client possède déjà le document
+    """
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Analyse un en-tête Range à une seule plage d'octets
+
+    Args:
+        header: Valeur de l'en-tête (ex: bytes=0-1023, bytes=1024-, bytes=-500)
+        size: Taille du document
+
+    Returns:
+        (début, fin incluse), ou None si l'en-tête est ignoré (syntaxe inconnue, plusieurs plages)
+
+    Raises:
+        ValueError: Si la plage est hors du document (réponse 416)
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffixe : les N derniers octets
+        length = int(end)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    first = int(start)
+    last = min(int(end), size - 1) if end else size - 1
+    if first >= size or first > last:
+        raise ValueError("Range not satisfiable")
+    return first, last
+
+
+def _accepts_gzip(header: str) -> bool:
+    """Indique si un en-tête Accept-Encoding accepte gzip (q=0 le refuse)"""
+    for coding in header.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def build_response(document: RenderedDocument, request_headers: Any, max_age: float = 0) -> web.Response:
+    """
+    Construit la réponse HTTP d'un document selon les en-têtes de la requête
+
+    Gère If-None-Match (304), Range/If-Range (206, 416) sur la version non
+    compressée et Accept-Encoding (version gzip pré-calculée).
+
+    Args:
+        document: Document à servir
+        request_headers: En-têtes de la requête
+        max_age: Durée de fraîcheur annoncée au client, en secondes
+
+    Returns:
+        La réponse aiohttp
+    """
+    headers = {
+        "Content-Type": document.content_type,
+        "Last-Modified": formatdate(document.generated_at, usegmt=True),
+        "Cache-Control": f"public, max-age={max(0, int(max_age))}",
+        "Vary": "Accept-Encoding",
+        "Accept-Ranges": "bytes",
+    }
+    range_header = request_headers.get("Range", "")
+    use_gzip = not range_header and _accepts_gzip(request_headers.get("Accept-Encoding", ""))
+    headers["ETag"] = document.gzip_etag if use_gzip else document.etag
+
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match and etag_matches(if_none_match, (document.etag, document.gzip_etag)):
+        del headers["Content-Type"]
+        return web.Response(status=304, headers=headers)
+
+    status, body = 200, document.body
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        body = document.gzipped
+    elif range_header:
+        # If-Range : la plage n'est servie que si le client a la même version du document
+        if_range = request_headers.get("If-Range")
+        if not if_range or if_range.strip() == document.etag:
+            size = len(document.body)
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{size}"
+                return web.Response(status=416, headers=headers)
+            if byte_range is not None:
+                first, last = byte_range
+                status, body = 206, document.body[first:last + 1]
+                headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    return web.Response(status=status, body=body, headers=headers)
+
+
+class AccountJob:
+    """Génération des documents d'un compte, relancée à chaque expiration"""
+
+    def __init__(self, name: str, url: str, kinds: Tuple[str, ...] = ("live",), epg: bool = False,
+                 public_url: str = "", proxy: bool = False):
+        """
+        Initialise la génération
+
+        Args:
+            name: Nom du compte dans les URLs du serveur
+            url: URL du compte (player_api.php ou get.php)
+            kinds: Types de contenu servis (clés de KINDS)
+            epg: Servir aussi le guide EPG filtré (la playlist live porte alors les tvg-id)
+            public_url: URL de base du serveur, annoncée aux lecteurs dans url-tvg
+                (par défaut: l'adresse d'écoute, fixée par PlaylistServer.start)
+            proxy: Faire pointer les flux live des playlists vers le proxy du serveur
+        """
+        if not _ACCOUNT_NAME_RE.match(name):
+            raise ValueError(f"Invalid account name '{name}' (letters, digits, '.', '_' and '-' only)")
+        unknown = [kind for kind in kinds if kind not in KINDS]
+        if unknown:
+            raise ValueError(f"Unknown playlist kind '{unknown[0]}' (available: {', '.join(KINDS)})")
+        self.name = name
+        self.url = url
+        self.kinds = tuple(kinds)
+        self.epg = epg
+        self.public_url = public_url.rstrip("/")
+        self.proxy = proxy
+        self.last_error = ""
+        self.ready: Optional[asyncio.Event] = None  # Levé après la première tentative de génération
+
+    @property
+    def needs_public_url(self) -> bool:
+        """Indique si les documents du compte contiennent des URLs du serveur (url-tvg, flux relayés)"""
+        return self.epg or self.proxy
+
+    def document_names(self) -> List[str]:
+        """Noms des documents servis pour ce compte"""
+        names = [f"{kind}.m3u" for kind in self.kinds]
+        if self.epg:
+            names.append("epg.xml")
+        return names
+
+    async def render(self) -> Dict[str, Tuple[bytes, str]]:
+        """
+        Génère les documents du compte
+
+        Returns:
+            Le contenu et le type MIME de chaque document, par nom
+        """
+        client = IPTVClient(self.url)
+        documents: Dict[str, Tuple[bytes, str]] = {}
+
+        async def render_kind(kind: str) -> None:
+            if kind == "live" and self.epg:
+                fd, epg_path = tempfile.mkstemp(suffix=".xml", prefix=f"{self.name}-epg-")
+                os.close(fd)
+                try:
+                    content, _ = await client.generate_epg(epg_path, f"{self.public_url}/{self.name}/epg.xml")
+                    with open(epg_path, "rb") as f:
+                        documents["epg.xml"] = f.read(), XMLTV_TYPE
+                finally:
+                    os.unlink(epg_path)
+            else:
+                content = await getattr(client, KINDS[kind])()
+            if self.proxy:
+                # Les lecteurs passent par le proxy, qui partage les connexions du compte
+                content = content.replace(f"{client.stream_prefix('live')}/",
+                                          f"{self.public_url}/{self.name}/live/")
+            documents[f"{kind}.m3u"] = content.encode("utf-8"), M3U_TYPE
+
+        await asyncio.gather(*(render_kind(kind) for kind in self.kinds))
+        return documents
+
+
+class PlaylistServer:
+    """
+    Serveur HTTP des playlists pré-générées
+
+    Chaque compte est régénéré en arrière-plan toutes les `ttl` secondes :
+    les panels ne voient qu'une génération par expiration, quel que soit le
+    nombre de lecteurs. Les requêtes sont servies depuis la mémoire (ETag,
+    Range, gzip pré-calculé) ; en cas d'échec, la version précédente reste
+    servie et une nouvelle tentative a lieu après `retry_seconds`. Les comptes
+    dotés d'un StreamProxy servent aussi leurs flux live sous /<compte>/live/.
+    """
+
+    def __init__(self, jobs: List[AccountJob], ttl: float = 3600.0, retry_seconds: float = 60.0,
+                 gzip_level: int = 6, proxies: Optional[Dict[str, StreamProxy]] = None):
+        """
+        Initialise le serveur
+
+        Args:
+            jobs: Générations des comptes servis
+            ttl: Durée de validité d'une génération, en secondes (par défaut: 3600)
+            retry_seconds: Délai avant une nouvelle tentative après un échec (par défaut: 60)
+            gzip_level: Niveau de compression gzip (par défaut: 6)
+            proxies: Proxy des flux live par nom de compte
+        """
+        self.jobs = {job.name: job for job in jobs}
+        if len(self.jobs) != len(jobs):
+            raise ValueError("Duplicate account name")
+        self.ttl = ttl
+        self.retry_seconds = retry_seconds
+        self.gzip_level = gzip_level
+        self.proxies = proxies or {}
+        self._documents: Dict[Tuple[str, str], RenderedDocument] = {}
+        self._expires: Dict[str, float] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def create_app(self) -> web.Application:
+        """Crée l'application aiohttp (GET et HEAD)"""
+        app = web.Application()
+        app.router.add_get("/", self._index)
+        app.router.add_get("/metrics", self._metrics)
+        app.router.add_get("/{account}/{document}", self._document)
+        app.router.add_get("/{account}/live/{stream}", self._stream)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8088) -> str:
+        """
+        Lance les générations en arrière-plan et démarre l'écoute
+
+        Les comptes sans `public_url` annoncent l'adresse d'écoute réelle (port
+        attribué compris) ; sur une adresse générique (0.0.0.0, ::), celle-ci
+        n'est pas joignable par les lecteurs et `public_url` est obligatoire
+        pour les comptes dont les documents contiennent des URLs du serveur.
+
+        Args:
+            host: Adresse d'écoute
+            port: Port d'écoute (0 pour un port libre)
+
+        Returns:
+            L'URL de base du serveur
+
+        Raises:
+            ValueError: Adresse générique sans public_url pour un compte qui en a besoin
+        """
+        self.check_public_url(host)
+        # Limite de connexions de chaque compte relayé, hors du parcours des lecteurs
+        await asyncio.gather(*(proxy.start() for proxy in self.proxies.values()))
+        for job in self.jobs.values():
+            job.ready = asyncio.Event()
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        # Adresse réellement attribuée (port 0 compris)
+        bound_host, port = self._runner.addresses[0][:2]
+        bound_host = _WILDCARD_HOSTS.get(bound_host, bound_host)
+        if ":" in bound_host:
+            bound_host = f"[{bound_host}]"
+        self.url = f"http://{bound_host}:{port}"
+        for job in self.jobs.values():
+            job.public_url = job.public_url or self.url
+        self._tasks = [asyncio.ensure_future(self._regenerate(job)) for job in self.jobs.values()]
+        return self.url
+
+    def check_public_url(self, host: str) -> None:
+        """
+        Vérifie que les lecteurs pourront joindre les URLs du serveur annoncées dans les documents
+
+        Args:
+            host: Adresse d'écoute
+
+        Raises:
+            ValueError: Adresse générique sans public_url pour un compte qui en a besoin
+        """
+        if host not in _WILDCARD_HOSTS:
+            return
+        missing = [job.name for job in self.jobs.values() if job.needs_public_url and not job.public_url]
+        if missing:
+            raise ValueError(f"[server] public_url is required when listening on '{host}' "
+                             f"(used by account '{missing[0]}' for EPG or proxied streams)")
+
+    async def stop(self) -> None:
+        """Arrête les générations et l'écoute"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.gather(*(proxy.close() for proxy in self.proxies.values()))
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def refresh(self, job: AccountJob) -> bool:
+        """
+        Régénère les documents d'un compte
+
+        Args:
+            job: Génération du compte
+
+        Returns:
+            True si la génération a réussi (sinon les documents précédents sont conservés)
+        """
+        started = time.perf_counter()
+        try:
+            with TRACER.span("serve_render", account=job.name, kinds=",".join(job.kinds)):
+                rendered = await job.render()
+                generated_at = time.time()
+                for name, (body, content_type) in rendered.items():
+                    # ETag et compression hors de la boucle : les lecteurs continuent d'être servis
+                    document = await asyncio.to_thread(render_document, body, content_type,
+                                                       self.gzip_level, generated_at)
+                    self._documents[(job.name, name)] = document
+        except Exception as e:
+            job.last_error = str(e) or type(e).__name__
+            RENDERS.inc(account=job.name, result="error")
+            return False
+        finally:
+            RENDER_DURATION.observe(time.perf_counter() - started, account=job.name)
+        job.last_error = ""
+        self._expires[job.name] = generated_at + self.ttl
+        RENDERS.inc(account=job.name, result="ok")
+        return True
+
+    async def _regenerate(self, job: AccountJob) -> None:
+        """Boucle de fond d'un compte : génère, attend l'expiration, recommence"""
+        while True:
+            ok = await self.refresh(job)
+            job.ready.set()
+            await asyncio.sleep(self.ttl if ok else self.retry_seconds)
+
+    async def _document(self, request: web.Request) -> web.Response:
+        """Sert un document d'un compte"""
+        name = request.match_info["document"]
+        job = self.jobs.get(request.match_info["account"])
+        kind = name.rsplit(".", 1)[0]
+        if job is None or name not in job.document_names():
+            REQUESTS.inc(document="unknown", status=404)
+            raise web.HTTPNotFound()
+
+        # Première génération en cours : la requête attend son résultat
+        await job.ready.wait()
+        document = self._documents.get((job.name, name))
+        if document is None:
+            REQUESTS.inc(document=kind, status=503)
+            raise web.HTTPServiceUnavailable(text=f"Playlist not available: {job.last_error}\n",
+                                             headers={"Retry-After": str(int(self.retry_seconds))})
+        max_age = self._expires.get(job.name, 0.0) - time.time()
+        # aiohttp n'envoie pas le corps en réponse à HEAD
+        response = build_response(document, request.headers, max_age)
+        REQUESTS.inc(document=kind, status=response.status)
+        return response
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        """Relaie un flux live par le proxy du compte"""
+        proxy = self.proxies.get(request.match_info["account"])
+        if proxy is None:
+            raise web.HTTPNotFound()
+        return await proxy.handle(request)
+
+    async def _index(self, request: web.Request) -> web.Response:
+        """Liste les documents servis et l'état de leur génération"""
+        index = {}
+        for job in self.jobs.values():
+            documents = {}
+            for name in job.document_names():
+                document = self._documents.get((job.name, name))
+                documents[name] = None if document is None else {
+                    "bytes": len(document.body),
+                    "generated_at": document.generated_at,
+                }
+            index[job.name] = {"documents": documents, "expires_at": self._expires.get(job.name),
+                               "error": job.last_error}
+            if job.name in self.proxies:
+                index[job.name]["proxy"] = self.proxies[job.name].stats()
+        return web.json_response(index)
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        """Expose les métriques au format texte Prometheus"""
+        return web.Response(text=to_prometheus(METRICS), content_type="text/plain")
+
+    @classmethod
+    def from_config(cls, config: Any, accounts: Optional[Dict[str, str]] = None,
+                    public_url: str = "") -> 'PlaylistServer':
+        """
+        Crée le serveur selon les sections `server`, `server_accounts` et `proxy`
+
+        Args:
+            config: Instance de ConfigManager
+            accounts: URL de chaque compte par nom (par défaut: section `server_accounts`)
+            public_url: URL de base annoncée aux lecteurs (par défaut: [server] public_url)
+
+        Returns:
+            Le serveur (à démarrer avec start)
+        """
+        if accounts is None:
+            # Noms de compte sensibles à la casse et URLs lues telles quelles (« % » compris)
+            accounts = config.get_raw_section('server_accounts')
+        kinds = tuple(kind.strip() for kind in config.get('server', 'kinds', 'live').split(",") if kind.strip())
+        public_url = public_url or config.get('server', 'public_url', '')
+        proxy = config.get('server', 'proxy', False)
+        jobs = [AccountJob(name, url, kinds, config.get('server', 'epg', False), public_url, proxy)
+                for name, url in accounts.items()]
+        proxies = {name: StreamProxy.from_config(url, config) for name, url in accounts.items()} if proxy else None
+        return cls(jobs, ttl=config.get('server', 'ttl_seconds', 3600.0),
+                   retry_seconds=config.get('server', 'retry_seconds', 60.0),
+                   gzip_level=config.get('server', 'gzip_level', 6), proxies=proxies)
+
+
+async def serve(server: PlaylistServer, host: str, port: int) -> None:
+    """Démarre le serveur et le fait tourner jusqu'à son annulation"""
+    url = await server.start(host, port)
+    print(f"Serving {len(server.jobs)} account(s) on {url}")
+    for job in server.jobs.values():
+        for name in job.document_names():
+            print(f"  {url}/{job.name}/{name}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve pre-rendered IPTV playlists over HTTP")
+    parser.add_argument("--host", default=CONFIG.get('server', 'host', '127.0.0.1'))
+    parser.add_argument("--port", type=int, default=CONFIG.get('server', 'port', 8088))
+    parser.add_argument("--ttl", type=float, help="Regeneration interval in seconds (default: [server] ttl_seconds)")
+    parser.add_argument("--account", action="append", default=[], metavar="NAME=URL",
+                        help="Account to serve (default: [server_accounts] section)")
+    args = parser.parse_args(argv)
+
+    accounts = None
+    if args.account:
+        accounts = dict(account.split("=", 1) for account in args.account)
+    server = PlaylistServer.from_config(CONFIG, accounts)
+    if args.ttl:
+        server.ttl = args.ttl
+    if not server.jobs:
+        parser.error("no account configured (use --account or the [server_accounts] section)")
+    # Rechargement à chaud de config.ini ([reload] enabled)
+    CONFIG.watch_if_enabled()
+    try:
+        server.check_public_url(args.host)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cpu_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Module proxy de flux pour l'application IPTV to M3U Converter
+Partage une seule connexion amont par flux entre tous les lecteurs locaux,
+sans dépasser le nombre de connexions autorisé par le compte
+"""
+
+import asyncio
+import re
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from iptv_client import IPTVClient
+from metrics import METRICS
+from rate_limiter import ConcurrencyLimiter
+
+VIEWERS = METRICS.counter('iptv_proxy_viewers_total', 'Stream proxy viewers by outcome')
+UPSTREAMS = METRICS.counter('iptv_proxy_upstreams_total', 'Upstream stream connections by result')
+PROXY_BYTES = METRICS.counter('iptv_proxy_bytes_total', 'Bytes received from upstream streams')
+
+# Politiques appliquées quand toutes les connexions du compte sont occupées
+OVERFLOW_POLICIES = ("queue", "reject")
+
+_STREAM_RE = re.compile(r'^\d+(\.[A-Za-z0-9]+)?$')
+
+
+class _Viewer:
+    """File des blocs en attente d'envoi à un lecteur"""
+
+    __slots__ = ('queue',)
+
+    def __init__(self, buffer_chunks: int):
+        self.queue: asyncio.Queue = asyncio.Queue(buffer_chunks)
+
+    def close(self) -> None:
+        """Termine l'envoi, en abandonnant les blocs en attente"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class _Broadcast:
+    """Flux amont diffusé à plusieurs lecteurs"""
+
+    def __init__(self, stream: str, url: str):
+        self.stream = stream
+        self.url = url
+        self.viewers: List[_Viewer] = []
+        self.ready = asyncio.Event()  # Levé quand la réponse amont (ou l'échec) est connue
+        self.status = 0
+        self.content_type = "video/mp2t"
+        self.error = ""
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, chunk: bytes) -> None:
+        """Envoie un bloc à tous les lecteurs ; un lecteur trop lent est déconnecté"""
+        for viewer in list(self.viewers):
+            if viewer.queue.full():
+                # Retenir le flux pour un lecteur bloqué pénaliserait tous les autres
+                self.viewers.remove(viewer)
+                viewer.close()
+                VIEWERS.inc(outcome="dropped")
+            else:
+                viewer.queue.put_nowait(chunk)
+
+    def fail(self, status: int, error: str) -> None:
+        """Signale aux lecteurs que le flux ne peut pas être servi"""
+        self.status, self.error = status, error
+        self.ready.set()
+
+    def close(self) -> None:
+        """Termine l'envoi à tous les lecteurs"""
+        if not self.ready.is_set():
+            self.fail(502, "Upstream stream closed")
+        for viewer in self.viewers:
+            viewer.close()
+        self.viewers.clear()
+
+
+class StreamProxy:
+    """
+    Proxy des flux live d'un compte
+
+    Les lecteurs d'un même flux partagent une seule connexion au panel, qui
+    est ouverte au premier lecteur et fermée au départ du dernier. Le nombre
+    de flux distincts ouverts en même temps est borné par `max_connections`
+    du compte : au-delà, les nouveaux flux attendent qu'une connexion se
+    libère (politique « queue », au plus `queue_timeout` secondes) ou sont
+    refusés immédiatement (« reject »). La limite annoncée par le panel est
+    lue une fois par start(), avant le premier lecteur.
+    """
+
+    def __init__(self, account_url: str, max_connections: int = 0, overflow: str = "queue",
+                 queue_timeout: float = 30.0, buffer_chunks: int = 256, read_timeout: float = 30.0):
+        """
+        Initialise le proxy
+
+        Args:
+            account_url: URL du compte (player_api.php ou get.php)
+            max_connections: Connexions simultanées autorisées (0 : valeur annoncée par le panel)
+            overflow: Politique quand toutes les connexions sont occupées ("queue" ou "reject")
+            queue_timeout: Attente maximale d'une connexion libre, en secondes (par défaut: 30)
+            buffer_chunks: Blocs en attente au-delà desquels un lecteur lent est déconnecté (par défaut: 256)
+            read_timeout: Délai sans données amont au-delà duquel le flux est fermé (par défaut: 30s)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}' (available: {', '.join(OVERFLOW_POLICIES)})")
+        self.client = IPTVClient(account_url)
+        self.client.parse_url()
+        self.max_connections = max_connections
+        self.overflow = overflow
+        self.queue_timeout = queue_timeout
+        self.buffer_chunks = max(1, buffer_chunks)
+        self.read_timeout = read_timeout
+        self._broadcasts: Dict[str, _Broadcast] = {}
+        self._slots: Optional[ConcurrencyLimiter] = None
+        self._slots_resolved = False
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        """
+        Fixe le nombre de connexions amont autorisées (sans effet s'il est déjà fixé)
+
+        Avec max_connections = 0, seul le bloc user_info de player_api.php est
+        demandé au panel, pas les catalogues.
+
+        Raises:
+            Exception: Panel injoignable ou réponse invalide (la limite reste à fixer)
+        """
+        if self._slots_resolved:
+            return
+        limit = self.max_connections
+        if limit <= 0:
+            user_info = await self.client.get_user_info()
+            try:
+                limit = int(user_info.get("max_connections"))
+            except (TypeError, ValueError):
+                # « Unlimited » ou valeur absente
+                limit = 0
+        if not self._slots_resolved:
+            self._slots = ConcurrencyLimiter(limit) if limit > 0 else None
+            self._slots_resolved = True
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Session partagée par les connexions amont, créée au premier flux"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self) -> None:
+        """Ferme tous les flux et la session amont"""
+        tasks = [broadcast.task for broadcast in self._broadcasts.values() if broadcast.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Flux ouverts, lecteurs connectés et flux en attente d'une connexion"""
+        slots = self._slots
+        return {
+            "streams": sum(1 for broadcast in self._broadcasts.values() if broadcast.status == 200),
+            "viewers": sum(len(broadcast.viewers) for broadcast in self._broadcasts.values()),
+            "waiting": slots.waiting if slots is not None else 0,
+            "max_connections": slots.limit if slots is not None else None,
+        }
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        """Sert un flux live (`{stream}` : identifiant et extension, ex: 1234.ts)"""
+        stream = request.match_info["stream"]
+        if not _STREAM_RE.match(stream):
+            raise web.HTTPNotFound()
+
+        broadcast = self._broadcasts.get(stream)
+        shared = broadcast is not None
+        if broadcast is None:
+            broadcast = self._broadcasts[stream] = _Broadcast(stream, self.client.stream_url('live', stream))
+            broadcast.task = asyncio.ensure_future(self._run_upstream(broadcast))
+        viewer = _Viewer(self.buffer_chunks)
+        broadcast.viewers.append(viewer)
+        try:
+            await broadcast.ready.wait()
+            if broadcast.status != 200:
+                VIEWERS.inc(outcome="rejected" if broadcast.status == 503 else "failed")
+                raise _http_error(broadcast)
+            VIEWERS.inc(outcome="shared" if shared else "opened")
+
+            response = web.StreamResponse(headers={"Content-Type": broadcast.content_type,
+                                                   "Cache-Control": "no-cache"})
+            await response.prepare(request)
+            while True:
+                chunk = await viewer.queue.get()
+                if chunk is None:
+                    break
+                await response.write(chunk)
+            return response
+        finally:
+            self._leave(broadcast, viewer)
+
+    def _leave(self, broadcast: _Broadcast, viewer: _Viewer) -> None:
+        """Retire un lecteur ; le départ du dernier ferme la connexion amont"""
+        if viewer in broadcast.viewers:
+            broadcast.viewers.remove(viewer)
+        if not broadcast.viewers and broadcast.task is not None and not broadcast.task.done():
+            # Un lecteur arrivant avant la fin de l'annulation ouvre un nouveau flux
+            if self._broadcasts.get(broadcast.stream) is broadcast:
+                del self._broadcasts[broadcast.stream]
+            broadcast.task.cancel()
+
+    async def _run_upstream(self, broadcast: _Broadcast) -> None:
+        """Attend une connexion libre, puis relaie le flux amont à ses lecteurs"""
+        try:
+            if not self._slots_resolved:
+                # Proxy utilisé sans start() : la limite est fixée au premier flux
+                await self.start()
+            slots = self._slots
+            if slots is not None:
+                if self.overflow == "reject" and slots.locked():
+                    broadcast.fail(503, f"All {slots.limit} connections of the account are in use")
+                    return
+                try:
+                    await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+                except asyncio.TimeoutError:
+                    broadcast.fail(503, f"No free connection after {self.queue_timeout:g}s")
+                    return
+            try:
+                headers = {"User-Agent": "Dalvik/2.1.0 (Linux; U; Android 14; 22101320G Build/UKQ1.231003.002)"}
+                timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=self.read_timeout)
+                async with self._get_session().get(broadcast.url, headers=headers, timeout=timeout) as resp:
+                    if resp.status != 200:
+                        UPSTREAMS.inc(result="error")
+                        broadcast.fail(502, f"Upstream returned HTTP {resp.status}")
+                        return
+                    UPSTREAMS.inc(result="ok")
+                    broadcast.status = 200
+                    broadcast.content_type = resp.headers.get("Content-Type", broadcast.content_type)
+                    broadcast.ready.set()
+                    async for chunk in resp.content.iter_any():
+                        PROXY_BYTES.inc(len(chunk))
+                        broadcast.publish(chunk)
+            finally:
+                if slots is not None:
+                    slots.release()
+        except asyncio.CancelledError:
+            # Dernier lecteur parti ou proxy fermé : nettoyage dans finally, puis l'annulation se propage
+            raise
+        except Exception as e:
+            if not broadcast.ready.is_set():
+                UPSTREAMS.inc(result="error")
+                broadcast.fail(502, str(e) or type(e).__name__)
+        finally:
+            if self._broadcasts.get(broadcast.stream) is broadcast:
+                del self._broadcasts[broadcast.stream]
+            broadcast.close()
+
+    @classmethod
+    def from_config(cls, account_url: str, config: Any) -> 'StreamProxy':
+        """
+        Crée le proxy d'un compte selon la section `proxy`
+
+        Args:
+            account_url: URL du compte
+            config: Instance de ConfigManager
+
+        Returns:
+            Le proxy
+        """
+        return cls(
+            account_url,
+            max_connections=config.get('proxy', 'max_connections', 0),
+            overflow=config.get('proxy', 'overflow', 'queue'),
+            queue_timeout=config.get('proxy', 'queue_timeout_seconds', 30.0),
+            buffer_chunks=config.get('proxy', 'buffer_chunks', 256),
+            read_timeout=config.get('proxy', 'read_timeout_seconds', 30.0),
+        )
+
+
+def _http_error(broadcast: _Broadcast) -> web.HTTPException:
+    """Erreur HTTP renvoyée aux lecteurs d'un flux qui n'a pas pu être ouvert"""
+    if broadcast.status == 503:
+        return web.HTTPServiceUnavailable(text=f"{broadcast.error}\n", headers={"Retry-After": "5"})
+    return web.HTTPBadGateway(text=f"{broadcast.error}\n")
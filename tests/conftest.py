@@ -0,0 +1,51 @@
+"""
+Configuration pytest partagée par les tests unitaires
+
+config.ini est lu et créé dans un répertoire temporaire plutôt qu'à la racine
+du dépôt, et chaque test part de registres IPTVClient vides (disjoncteurs,
+limiteurs, caches partagés), restaurés ensuite.
+"""
+
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+
+import pytest
+
+from config_manager import CONFIG
+
+# CONFIG est chargé à la demande : le rediriger avant le premier accès d'un test
+_config_dir = tempfile.mkdtemp(prefix="iptv-tests-")
+CONFIG.config_file = Path(_config_dir) / "config.ini"
+
+
+def pytest_unconfigure(config):
+    CONFIG.flush()
+    shutil.rmtree(_config_dir, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def isolated_client_state():
+    """Remplace l'état partagé entre instances d'IPTVClient le temps d'un test"""
+    from iptv_client import IPTVClient
+
+    fresh = {
+        "_global_cache": None,
+        "_series_cache": None,
+        "_catalog_cache": None,
+        "_refreshers": {},
+        "_channel_health": None,
+        "_breakers": {},
+        "_limiters": {},
+        "_concurrency_limiters": weakref.WeakKeyDictionary(),
+        "_loop": None,
+    }
+    saved = {name: getattr(IPTVClient, name) for name in fresh}
+    for name, value in fresh.items():
+        setattr(IPTVClient, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(IPTVClient, name, value)
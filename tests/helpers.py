@@ -0,0 +1,28 @@
+"""
+Utilitaires partagés par les tests unitaires
+"""
+
+
+class FakeConfig:
+    """
+    Configuration minimale exposant les méthodes get et get_section de ConfigManager
+
+    Les valeurs de `values` s'appliquent quelle que soit la section ; celles de
+    `sections` ne valent que pour leur section et sont prioritaires.
+    """
+
+    def __init__(self, values=None, sections=None):
+        self.values = values or {}
+        self.sections = sections or {}
+
+    def get(self, section, key, default=None):
+        section_values = self.sections.get(section, {})
+        if key in section_values:
+            return section_values[key]
+        return self.values.get(key, default)
+
+    def get_section(self, section):
+        return dict(self.sections.get(section, {}))
+
+    def get_raw_section(self, section):
+        return {key: str(value) for key, value in self.sections.get(section, {}).items()}
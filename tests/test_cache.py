@@ -160,6 +160,15 @@ class TestServerCache(unittest.TestCase):
         self.assertEqual(info['max_age_seconds'], 300)
         self.assertEqual(info['keys'], ['test_key'])
     
+    def test_cache_hit_ratio(self):
+        """Test du comptage des succès et échecs de lecture"""
+        self.cache.set('test_key', 'test_value')
+        self.cache.get('test_key')
+        self.cache.get('missing')
+        info = self.cache.get_info()
+        self.assertEqual((info['hits'], info['misses']), (1, 1))
+        self.assertEqual(info['hit_ratio'], 0.5)
+    
     def test_cache_len(self):
         """Test de la méthode __len__"""
         self.cache.set('key_1', 'value_1')
@@ -0,0 +1,85 @@
+"""
+Tests unitaires pour le module catalog.py
+"""
+
+import unittest
+from catalog import Catalog, StreamRecord, build_category_map
+
+
+class TestCatalog(unittest.TestCase):
+    """Tests pour la classe Catalog"""
+    
+    def setUp(self):
+        """Initialise les tests"""
+        self.items = [
+            {"stream_id": 1, "name": "Chaîne Une", "category_id": "10", "stream_icon": "a.png",
+             "added": "1600000000", "epg_channel_id": "une.fr", "custom_sid": ""},
+            {"stream_id": 2, "name": "Film", "category_id": 10, "stream_icon": None,
+             "container_extension": "mkv"},
+            {"stream_id": 3, "name": ""},
+            {"name": "Sans identifiant"},
+            "invalide",
+        ]
+    
+    def test_from_json_keeps_valid_streams(self):
+        """Test que seuls les flux avec un nom et un identifiant sont conservés"""
+        catalog = Catalog.from_json(self.items)
+        self.assertEqual(len(catalog), 2)
+        first, second = list(catalog)
+        self.assertEqual((first.stream_id, first.name, first.category_id, first.icon, first.extension),
+                         ("1", "Chaîne Une", "10", "a.png", ""))
+        self.assertEqual((second.stream_id, second.icon, second.extension), ("2", "", "mkv"))
+    
+    def test_from_json_custom_id_key(self):
+        """Test de l'identifiant des radios stocké sous la clé 'id'"""
+        catalog = Catalog.from_json([{"id": 7, "name": "Radio"}], id_key="id")
+        self.assertEqual(catalog[0].stream_id, "7")
+    
+    def test_from_json_invalid_payload(self):
+        """Test qu'une réponse qui n'est pas une liste donne un catalogue vide"""
+        self.assertEqual(len(Catalog.from_json({"error": "denied"})), 0)
+    
+    def test_categories_are_shared(self):
+        """Test que les catégories répétées sont stockées une seule fois"""
+        catalog = Catalog.from_json(self.items)
+        self.assertIs(catalog[0].category_id, catalog[1].category_id)
+    
+    def test_getitem(self):
+        """Test de l'accès par index"""
+        catalog = Catalog.from_json(self.items)
+        self.assertEqual(catalog[-1].name, "Film")
+        with self.assertRaises(IndexError):
+            catalog[2]
+    
+    def test_filter(self):
+        """Test de la méthode filter"""
+        catalog = Catalog.from_json(self.items)
+        filtered = catalog.filter(lambda record: record.extension == "mkv")
+        self.assertEqual([r.name for r in filtered], ["Film"])
+    
+    def test_records_are_slotted(self):
+        """Test que les enregistrements n'ont pas de __dict__"""
+        record = StreamRecord("1", "A", "2")
+        self.assertFalse(hasattr(record, "__dict__"))
+    
+    def test_nbytes_smaller_than_payload(self):
+        """Test que le catalogue est bien plus petit que les dictionnaires d'origine"""
+        items = [{"stream_id": i, "name": f"Movie {i}", "category_id": str(i % 5),
+                  "stream_icon": f"http://img/{i}.jpg", "added": "1600000000", "rating": "5",
+                  "tmdb": "1", "trailer": "", "custom_sid": ""} for i in range(1000)]
+        catalog = Catalog.from_json(items)
+        self.assertLess(catalog.nbytes(), 60 * len(items))
+
+
+class TestBuildCategoryMap(unittest.TestCase):
+    """Tests pour la fonction build_category_map"""
+    
+    def test_build_category_map(self):
+        """Test de la construction de la table des catégories"""
+        categories = [{"category_id": 1, "category_name": "News"}, {"category_id": "2"}, None]
+        self.assertEqual(build_category_map(categories), {"1": "News"})
+        self.assertEqual(build_category_map(None), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
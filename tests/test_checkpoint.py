@@ -0,0 +1,108 @@
+"""
+Tests unitaires pour le module checkpoint.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from checkpoint import ChannelTestJournal, default_journal_path, url_key
+
+
+class TestChannelTestJournal(unittest.TestCase):
+    """Tests pour la classe ChannelTestJournal"""
+    
+    def setUp(self):
+        """Initialise les tests"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / 'sub' / 'test.journal'
+    
+    def tearDown(self):
+        """Nettoie après les tests"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_record_and_resume(self):
+        """Test de l'enregistrement puis de la reprise des résultats"""
+        journal = ChannelTestJournal(str(self.path), flush_every=1)
+        self.assertEqual(journal.open(), {})
+        journal.record('http://a/1.ts', True)
+        journal.record('http://a/2.ts', False)
+        journal.close()
+        
+        resumed = ChannelTestJournal(str(self.path))
+        self.assertEqual(resumed.open(), {url_key('http://a/1.ts'): True, url_key('http://a/2.ts'): False})
+        self.assertTrue(resumed.get('http://a/1.ts'))
+        self.assertFalse(resumed.get('http://a/2.ts'))
+        self.assertIsNone(resumed.get('http://a/3.ts'))
+        resumed.close()
+    
+    def test_credentials_not_stored(self):
+        """Test que les URLs (et leurs identifiants) ne sont pas écrites en clair"""
+        journal = ChannelTestJournal(str(self.path))
+        journal.open()
+        journal.record('http://a/live/user/secret/1.ts', True)
+        journal.close()
+        content = self.path.read_text(encoding='utf-8')
+        self.assertNotIn('secret', content)
+        self.assertEqual(content, f"1 {url_key('http://a/live/user/secret/1.ts')}\n")
+        if os.name != 'nt':
+            self.assertEqual(self.path.stat().st_mode & 0o777, 0o600)
+    
+    def test_legacy_plain_urls(self):
+        """Test de la reprise d'un journal écrit avec les URLs en clair"""
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text('1 http://a/1.ts\n', encoding='utf-8')
+        journal = ChannelTestJournal(str(self.path))
+        journal.open()
+        self.assertTrue(journal.get('http://a/1.ts'))
+        journal.close()
+    
+    def test_truncated_line_ignored(self):
+        """Test qu'une ligne tronquée par un arrêt brutal est ignorée"""
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text(f"1 {url_key('http://a/1.ts')}\n0 {url_key('http://a/2.ts')[:10]}", encoding='utf-8')
+        journal = ChannelTestJournal(str(self.path))
+        self.assertEqual(journal.open(), {url_key('http://a/1.ts'): True})
+        journal.close()
+    
+    def test_append_after_truncated_line(self):
+        """Test qu'un ajout après une ligne tronquée repart sur une ligne neuve"""
+        self.path.parent.mkdir(parents=True)
+        first, partial = url_key('http://a/1.ts'), url_key('http://a/2.ts')[:10]
+        self.path.write_text(f"1 {first}\n0 {partial}", encoding='utf-8')
+        journal = ChannelTestJournal(str(self.path))
+        journal.open()
+        journal.record('http://a/3.ts', True)
+        journal.close()
+        self.assertEqual(self.path.read_text(encoding='utf-8'), f"1 {first}\n1 {url_key('http://a/3.ts')}\n")
+        
+        resumed = ChannelTestJournal(str(self.path))
+        self.assertEqual(resumed.open(), {first: True, url_key('http://a/3.ts'): True})
+        resumed.close()
+    
+    def test_open_without_resume_truncates(self):
+        """Test que open(resume=False) repart d'un journal vide"""
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text('1 http://a/1.ts\n', encoding='utf-8')
+        journal = ChannelTestJournal(str(self.path))
+        self.assertEqual(journal.open(resume=False), {})
+        journal.close()
+        self.assertEqual(self.path.read_text(encoding='utf-8'), '')
+    
+    def test_close_remove(self):
+        """Test de la suppression du journal en fin de test"""
+        journal = ChannelTestJournal(str(self.path))
+        journal.open()
+        journal.record('http://a/1.ts', True)
+        journal.close(remove=True)
+        self.assertFalse(self.path.exists())
+    
+    def test_default_journal_path(self):
+        """Test de la construction du chemin par défaut"""
+        path = default_journal_path('example.com', 'user', 'checkpoints')
+        self.assertEqual(Path(path), Path('checkpoints') / 'example.com_user.journal')
+
+
+if __name__ == '__main__':
+    unittest.main()
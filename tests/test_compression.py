@@ -0,0 +1,75 @@
+"""
+Tests unitaires pour le module compression.py
+"""
+
+import gzip
+import os
+import tempfile
+import unittest
+import zlib
+from compression import ACCEPT_ENCODING, StreamDecoder, TransferStats, compression_suffix, open_text
+
+
+class TestStreamDecoder(unittest.TestCase):
+    """Tests pour la classe StreamDecoder"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.payload = b'[{"name": "Channel"}]' * 1000
+
+    def _decode(self, encoding, data):
+        decoder = StreamDecoder(encoding)
+        out = b"".join(decoder.decompress(data[i:i + 100]) for i in range(0, len(data), 100))
+        return out + decoder.flush()
+
+    def test_gzip(self):
+        """Test de la décompression gzip par morceaux"""
+        self.assertEqual(self._decode("gzip", gzip.compress(self.payload)), self.payload)
+
+    def test_deflate(self):
+        """Test de la décompression deflate (format zlib)"""
+        self.assertEqual(self._decode("deflate", zlib.compress(self.payload)), self.payload)
+
+    def test_identity(self):
+        """Test d'un corps non compressé"""
+        self.assertEqual(self._decode(None, self.payload), self.payload)
+
+    def test_unsupported_encoding(self):
+        """Test d'un encodage inconnu"""
+        with self.assertRaises(ValueError):
+            StreamDecoder("compress")
+
+    def test_accept_encoding(self):
+        """Test des encodages annoncés"""
+        self.assertIn("gzip", ACCEPT_ENCODING)
+
+
+class TestOpenText(unittest.TestCase):
+    """Tests pour l'écriture de fichiers compressés"""
+
+    def test_compression_suffix(self):
+        """Test de la détection de l'extension de compression"""
+        self.assertEqual(compression_suffix("playlist.m3u.gz"), ".gz")
+        self.assertEqual(compression_suffix("playlist.M3U.ZST"), ".zst")
+        self.assertEqual(compression_suffix("playlist.m3u"), "")
+
+    def test_gzip_and_plain(self):
+        """Test de l'écriture gzip et non compressée"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ("out.m3u", "out.m3u.gz"):
+                path = os.path.join(temp_dir, name)
+                with open_text(path) as f:
+                    f.write("#EXTM3U\nChaîne")
+                opener = gzip.open if name.endswith(".gz") else open
+                with opener(path, "rt", encoding="utf-8") as f:
+                    self.assertEqual(f.read(), "#EXTM3U\nChaîne")
+
+    def test_transfer_stats(self):
+        """Test du taux de compression des statistiques"""
+        stats = TransferStats(bytes_received=100, bytes_decoded=400)
+        self.assertEqual(stats.to_dict()["compression_ratio"], 4.0)
+        self.assertEqual(TransferStats().to_dict()["compression_ratio"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
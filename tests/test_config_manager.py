@@ -5,7 +5,9 @@ Tests unitaires pour le module config_manager.py
 import unittest
 import os
 import tempfile
+import threading
 from pathlib import Path
+from unittest.mock import patch
 from config_manager import ConfigManager
 
 
@@ -155,6 +157,178 @@ class TestConfigManager(unittest.TestCase):
         security_config = self.config.get_security_config()
         self.assertIn('encrypt_passwords', security_config)
         self.assertIn('password_mask', security_config)
+    
+    def test_config_lazy_load(self):
+        """Test du chargement différé au premier accès"""
+        lazy_file = Path(self.temp_dir) / 'lazy_config.ini'
+        config = ConfigManager(str(lazy_file), lazy=True)
+        self.assertFalse(lazy_file.exists())
+        
+        self.assertEqual(config.get('cache', 'max_age_seconds', 0), 300)
+        self.assertTrue(lazy_file.exists())
+
+    
+    def test_config_get_typed_cache(self):
+        """Test que les valeurs lues sont converties une fois puis mises à jour par set"""
+        self.assertEqual(self.config.get('cache', 'max_items', 0), 100)
+        self.assertEqual(self.config.get('cache', 'max_items', 0.0), 100.0)
+        self.assertIsInstance(self.config.get('cache', 'max_items', 0.0), float)
+        self.assertEqual(self.config.get('cache', 'missing', 7), 7)
+        self.assertEqual(self.config.get('cache', 'missing', 8), 8)
+        
+        self.config.set('cache', 'max_items', 200)
+        self.config.set('cache', 'missing', 9)
+        self.assertEqual(self.config.get('cache', 'max_items', 0), 200)
+        self.assertEqual(self.config.get('cache', 'missing', 7), 9)
+    
+    def test_config_transaction(self):
+        """Test qu'une transaction n'écrit le fichier qu'une fois"""
+        with patch.object(self.config, 'save', wraps=self.config.save) as save:
+            with self.config.transaction():
+                for i in range(100):
+                    self.config.set(f'host.{i}', 'timeout_seconds', i)
+                self.config.delete('cache', 'max_items')
+            self.assertEqual(save.call_count, 1)
+        
+        reloaded = ConfigManager(str(self.config_file))
+        self.assertEqual(reloaded.get('host.99', 'timeout_seconds', 0), 99)
+        self.assertIsNone(reloaded.get('cache', 'max_items', None))
+    
+    def test_config_transaction_rollback(self):
+        """Test de l'annulation d'une transaction interrompue par une exception"""
+        with self.assertRaises(RuntimeError):
+            with self.config.transaction():
+                self.config.set('cache', 'max_age_seconds', 600)
+                self.config.delete_section('ui')
+                raise RuntimeError("abort")
+        
+        self.assertEqual(self.config.get('cache', 'max_age_seconds', 0), 300)
+        self.assertIn('ui', self.config.config)
+        self.assertEqual(ConfigManager(str(self.config_file)).get('cache', 'max_age_seconds', 0), 300)
+    
+    def test_config_debounced_flush(self):
+        """Test du regroupement des écritures rapprochées"""
+        config = ConfigManager(str(self.config_file), flush_delay=60)
+        config.set('cache', 'max_age_seconds', 600)
+        config.set('cache', 'max_items', 50)
+        self.assertEqual(config.get('cache', 'max_age_seconds', 0), 600)
+        self.assertEqual(ConfigManager(str(self.config_file)).get('cache', 'max_age_seconds', 0), 300)
+        
+        config.flush()
+        reloaded = ConfigManager(str(self.config_file))
+        self.assertEqual(reloaded.get('cache', 'max_age_seconds', 0), 600)
+        self.assertEqual(reloaded.get('cache', 'max_items', 0), 50)
+    
+    def test_config_atomic_save(self):
+        """Test que la sauvegarde ne laisse pas de fichier temporaire"""
+        self.config.set('cache', 'max_age_seconds', 600)
+        self.assertEqual(os.listdir(self.temp_dir), ['test_config.ini'])
+    
+    @unittest.skipIf(os.name == 'nt', "Permissions POSIX")
+    def test_config_save_keeps_mode(self):
+        """Test que la sauvegarde conserve les permissions du fichier"""
+        os.chmod(self.config_file, 0o640)
+        self.config.set('cache', 'max_age_seconds', 600)
+        self.assertEqual(self.config_file.stat().st_mode & 0o777, 0o640)
+        
+        # Nouveau fichier : permissions habituelles selon l'umask, pas le 0600 de mkstemp
+        other = Path(self.temp_dir) / 'new_config.ini'
+        ConfigManager(str(other))
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(other.stat().st_mode & 0o777, 0o666 & ~umask)
+
+    
+    def _edit_file(self, old, new):
+        """Modifie le fichier comme le ferait un éditeur externe"""
+        content = self.config_file.read_text().replace(old, new)
+        self.config_file.write_text(content)
+        # Garantir une date de modification différente sur les systèmes de fichiers peu précis
+        stat = self.config_file.stat()
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    def test_config_reload_if_changed(self):
+        """Test du rechargement après une modification externe du fichier"""
+        reloaded = []
+        self.config.add_listener(reloaded.append)
+        self.assertEqual(self.config.get('testing', 'max_concurrent_tests', 0), 10)
+        self.assertFalse(self.config.reload_if_changed())
+        
+        # Nos propres écritures ne déclenchent pas de rechargement
+        self.config.set('cache', 'max_items', 200)
+        self.assertFalse(self.config.reload_if_changed())
+        
+        self._edit_file('max_concurrent_tests = 10', 'max_concurrent_tests = 3')
+        self.assertTrue(self.config.reload_if_changed())
+        self.assertEqual(self.config.get('testing', 'max_concurrent_tests', 0), 3)
+        self.assertEqual(self.config.get('cache', 'max_items', 0), 200)
+        self.assertEqual(reloaded, [self.config])
+        self.assertFalse(self.config.reload_if_changed())
+    
+    def test_config_reload_keeps_pending_changes(self):
+        """Test que les modifications différées survivent à un rechargement"""
+        config = ConfigManager(str(self.config_file), flush_delay=60)
+        config.set('cache', 'max_items', 200)
+        config.delete('ui', 'theme')
+        config.set('server', 'public_url', 'http://tv.example.com')
+        
+        self._edit_file('max_concurrent_tests = 10', 'max_concurrent_tests = 3')
+        self.assertTrue(config.reload_if_changed())
+        self.assertEqual(config.get('testing', 'max_concurrent_tests', 0), 3)
+        self.assertEqual(config.get('cache', 'max_items', 0), 200)
+        self.assertIsNone(config.get('ui', 'theme', None))
+        self.assertEqual(config.get('server', 'public_url', ''), 'http://tv.example.com')
+        
+        # Le résultat fusionné est écrit : ni le fichier ni les modifications ne sont perdus
+        reloaded = ConfigManager(str(self.config_file))
+        self.assertEqual(reloaded.get('testing', 'max_concurrent_tests', 0), 3)
+        self.assertEqual(reloaded.get('cache', 'max_items', 0), 200)
+        self.assertIsNone(reloaded.get('ui', 'theme', None))
+        self.assertFalse(config.reload_if_changed())
+    
+    def test_config_reload_listener_failure_logged(self):
+        """Test qu'un abonné en échec est journalisé sans interrompre le rechargement"""
+        def broken(config):
+            raise RuntimeError("boom")
+        
+        self.config.add_listener(broken)
+        self._edit_file('max_concurrent_tests = 10', 'max_concurrent_tests = 3')
+        with self.assertLogs('config_manager', level='ERROR') as logs:
+            self.assertTrue(self.config.reload_if_changed())
+        self.assertIn("boom", logs.output[0])
+        self.assertEqual(self.config.get('testing', 'max_concurrent_tests', 0), 3)
+    
+    def test_config_reload_invalid_file(self):
+        """Test qu'un fichier invalide ne remplace pas la configuration en cours"""
+        self._edit_file('[testing]', 'testing without brackets')
+        with self.assertLogs('config_manager', level='WARNING'):
+            self.assertFalse(self.config.reload_if_changed())
+        self.assertEqual(self.config.get('testing', 'max_concurrent_tests', 0), 10)
+    
+    def test_config_watch(self):
+        """Test de la surveillance du fichier dans un thread"""
+        reloaded = threading.Event()
+        self.config.add_listener(lambda config: reloaded.set())
+        self.config.watch(interval=0.01)
+        try:
+            self._edit_file('timeout_seconds = 5', 'timeout_seconds = 2')
+            self.assertTrue(reloaded.wait(5))
+            self.assertEqual(self.config.get('testing', 'timeout_seconds', 0), 2)
+        finally:
+            self.config.stop_watching()
+    
+    def test_config_watch_if_enabled(self):
+        """Test que la surveillance n'est démarrée que si [reload] l'active"""
+        self.assertFalse(self.config.watch_if_enabled())
+        self.assertIsNone(self.config._watcher)
+        
+        self.config.set('reload', 'enabled', True)
+        self.config.set('reload', 'interval_seconds', 0.01)
+        try:
+            self.assertTrue(self.config.watch_if_enabled())
+            self.assertTrue(self.config._watcher.is_alive())
+        finally:
+            self.config.stop_watching()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+"""
+Tests unitaires pour le module cpu_pool.py
+"""
+
+import asyncio
+import os
+import unittest
+import cpu_pool
+import json_backend
+from catalog import Catalog
+from playlist import render_m3u
+
+
+class TestCpuPool(unittest.TestCase):
+    """Tests pour le pool de processus"""
+    
+    def tearDown(self):
+        """Revient à une exécution sur place"""
+        cpu_pool.configure(0)
+    
+    def test_configure_auto(self):
+        """Test de la configuration automatique du nombre de processus"""
+        self.assertEqual(cpu_pool.configure('auto'), os.cpu_count() or 1)
+        self.assertEqual(cpu_pool.configure('0'), 0)
+        self.assertIsNone(cpu_pool.get_executor())
+    
+    def test_run_inline_below_threshold(self):
+        """Test que les petits traitements restent sur place"""
+        cpu_pool.configure(1, min_bytes=1024)
+        result = asyncio.run(cpu_pool.run_cpu(os.getpid, size_hint=10))
+        self.assertEqual(result, os.getpid())
+    
+    def test_run_in_process_pool(self):
+        """Test du décodage et du rendu dans un processus séparé"""
+        cpu_pool.configure(1, min_bytes=0, initializer=json_backend.set_backend,
+                           initargs=(json_backend.get_backend(), json_backend.get_typed_decoding()))
+        
+        async def pipeline():
+            pid = await cpu_pool.run_cpu(os.getpid)
+            catalog = await cpu_pool.run_cpu(
+                json_backend.decode_catalog, b'[{"stream_id": 1, "name": "A", "category_id": "2"}]', "stream_id"
+            )
+            content = await cpu_pool.run_cpu(render_m3u, catalog, {"2": "News"}, "http://h/live/u/p", "ts")
+            return pid, catalog, content
+        
+        pid, catalog, content = asyncio.run(pipeline())
+        self.assertNotEqual(pid, os.getpid())
+        self.assertIsInstance(catalog, Catalog)
+        self.assertEqual(content, '#EXTM3U\n#EXTINF:-1 tvg-logo="" group-title="News",A\nhttp://h/live/u/p/1.ts')
+
+
+if __name__ == '__main__':
+    unittest.main()
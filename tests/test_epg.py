@@ -0,0 +1,84 @@
+"""
+Tests unitaires pour le module epg.py
+"""
+
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from catalog import Catalog
+from epg import apply_tvg_ids, filter_xmltv, normalize_channel_name
+from playlist import render_m3u
+
+XMLTV = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE tv SYSTEM "xmltv.dtd">
+<tv generator-info-name="panel">
+  <channel id="tf1.fr"><display-name>TF1</display-name></channel>
+  <channel id="france2.fr"><display-name>France 2</display-name><display-name>F2</display-name></channel>
+  <channel id="other.uk"><display-name>Other</display-name></channel>
+  <programme start="20250101060000 +0100" stop="20250101070000 +0100" channel="tf1.fr">
+    <title lang="fr">Le Journal &amp; la météo</title>
+  </programme>
+  <programme start="20250101060000 +0100" stop="20250101070000 +0100" channel="other.uk">
+    <title>Skipped</title>
+  </programme>
+  <programme start="20250101070000 +0100" stop="20250101080000 +0100" channel="france2.fr">
+    <title>Matin</title>
+  </programme>
+</tv>
+"""
+
+
+class TestEPG(unittest.TestCase):
+    """Tests pour le filtrage XMLTV"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "xmltv.xml")
+        self.dest = os.path.join(self.temp_dir.name, "epg.xml")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write(XMLTV)
+        self.catalog = Catalog.from_json([
+            {"stream_id": 1, "name": "TF1 HD", "category_id": "1", "epg_channel_id": "TF1.fr"},
+            {"stream_id": 2, "name": "FR: France 2 (FHD)", "category_id": "1"},
+            {"stream_id": 3, "name": "Unknown", "category_id": "1"},
+        ])
+
+    def tearDown(self):
+        """Nettoie après les tests"""
+        self.temp_dir.cleanup()
+
+    def test_normalize_channel_name(self):
+        """Test de la normalisation des noms de chaînes"""
+        self.assertEqual(normalize_channel_name("FR: France 2 (FHD)"), "france2")
+        self.assertEqual(normalize_channel_name("UK | BBC One HD"), "bbcone")
+        self.assertEqual(normalize_channel_name("France 2"), "france2")
+
+    def test_filter_keeps_playlist_channels(self):
+        """Test que seules les chaînes de la playlist et leurs programmes sont conservés"""
+        result = filter_xmltv(self.source, self.dest, self.catalog)
+        self.assertEqual(result.tvg_ids, {0: "tf1.fr", 1: "france2.fr"})
+        self.assertEqual((result.channels, result.channels_kept), (3, 2))
+        self.assertEqual((result.programmes, result.programmes_kept), (3, 2))
+
+        tree = ET.parse(self.dest)
+        root = tree.getroot()
+        self.assertEqual(root.get("generator-info-name"), "panel")
+        self.assertEqual([c.get("id") for c in root.iter("channel")], ["tf1.fr", "france2.fr"])
+        titles = [p.findtext("title") for p in root.iter("programme")]
+        self.assertEqual(titles, ["Le Journal & la météo", "Matin"])
+
+    def test_apply_tvg_ids(self):
+        """Test du remplissage des tvg-id dans la playlist"""
+        result = filter_xmltv(self.source, self.dest, self.catalog)
+        catalog = apply_tvg_ids(self.catalog, result.tvg_ids)
+        self.assertEqual([r.epg_id for r in catalog], ["tf1.fr", "france2.fr", ""])
+
+        lines = render_m3u(catalog, {"1": "FR"}, "http://h/live/u/p", "ts", epg_url="epg.xml").split("\n")
+        self.assertEqual(lines[0], '#EXTM3U url-tvg="epg.xml"')
+        self.assertEqual(lines[1], '#EXTINF:-1 tvg-id="tf1.fr" tvg-logo="" group-title="FR",TF1 HD')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests unitaires pour le module export.py
+"""
+
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from catalog import Catalog
+from export import SINKS, export_catalog, iter_entries
+from playlist import render_m3u
+
+
+class TestExport(unittest.TestCase):
+    """Tests pour l'export multi-format"""
+    
+    def setUp(self):
+        """Initialise les tests"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.catalog = Catalog.from_json([
+            {"stream_id": 1, "name": 'Info "24"', "category_id": "1", "stream_icon": "i.png",
+             "epg_channel_id": "info.fr", "tv_archive": 1, "tv_archive_duration": "7"},
+            {"stream_id": 2, "name": "Sport", "category_id": "2"},
+        ])
+        self.cat_map = {"1": "News"}
+        self.prefix = "http://h/live/u/p"
+    
+    def tearDown(self):
+        """Nettoie après les tests"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _export(self, fmt):
+        path = Path(self.temp_dir) / f"out{SINKS[fmt].extension}"
+        written = export_catalog(fmt, str(path), self.catalog, self.cat_map, self.prefix, "ts")
+        self.assertEqual(written, path.stat().st_size)
+        return path.read_text(encoding="utf-8")
+    
+    def test_iter_entries(self):
+        """Test de la construction des entrées"""
+        entries = list(iter_entries(self.catalog, self.cat_map, self.prefix, "ts"))
+        self.assertEqual(entries[0].url, "http://h/live/u/p/1.ts")
+        self.assertEqual(entries[0].tvg_id, "info.fr")
+        self.assertEqual(entries[0].catchup_days, 7)
+        self.assertEqual(entries[1].group, "Unknown")
+    
+    def test_m3u_matches_render(self):
+        """Test que l'export M3U est identique au rendu de generate_m3u"""
+        self.assertEqual(self._export("m3u"), render_m3u(self.catalog, self.cat_map, self.prefix, "ts"))
+    
+    def test_m3u_plus(self):
+        """Test de l'export M3U plus"""
+        lines = self._export("m3u_plus").splitlines()
+        self.assertEqual(lines[0], "#EXTM3U")
+        self.assertEqual(lines[1], '#EXTINF:-1 tvg-id="info.fr" tvg-name="Info \'24\'" tvg-logo="i.png" '
+                                   'group-title="News" catchup="xc" catchup-days="7",Info "24"')
+        self.assertEqual(lines[3], '#EXTINF:-1 tvg-id="" tvg-name="Sport" tvg-logo="" group-title="Unknown",Sport')
+    
+    def test_m3u_escapes_attributes(self):
+        """Test qu'un guillemet ou un saut de ligne du panel ne casse pas la playlist"""
+        self.catalog = Catalog.from_json([
+            {"stream_id": 3, "name": "Evil\nName", "category_id": "1", "stream_icon": 'a.png" x="1',
+             "epg_channel_id": 'id"\r\n#EXTINF'},
+        ])
+        self.cat_map = {"1": 'Grp"\nX'}
+        for fmt in ("m3u", "m3u_plus"):
+            lines = self._export(fmt).strip().splitlines()
+            self.assertEqual(len(lines), 3, fmt)
+            self.assertIn('tvg-logo="a.png\' x=\'1"', lines[1])
+            self.assertIn('group-title="Grp\' X"', lines[1])
+            self.assertTrue(lines[1].endswith(",Evil Name"))
+        self.assertIn('tvg-id="id\'  #EXTINF"', lines[1])
+        self.assertEqual(self._export("m3u"), render_m3u(self.catalog, self.cat_map, self.prefix, "ts"))
+    
+    def test_json(self):
+        """Test de l'export JSON"""
+        data = json.loads(self._export("json"))
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]["url"], "http://h/live/u/p/1.ts")
+    
+    def test_json_empty(self):
+        """Test de l'export JSON d'un catalogue vide"""
+        self.catalog = Catalog()
+        self.assertEqual(json.loads(self._export("json")), [])
+    
+    def test_csv(self):
+        """Test de l'export CSV"""
+        rows = list(csv.reader(self._export("csv").splitlines()))
+        self.assertEqual(rows[0], ["name", "group", "logo", "url", "tvg_id", "catchup_days"])
+        self.assertEqual(rows[1][0], 'Info "24"')
+        self.assertEqual(len(rows), 3)
+    
+    def test_unknown_format(self):
+        """Test d'un format inconnu"""
+        with self.assertRaises(ValueError):
+            export_catalog("xspf", "out.xspf", self.catalog, self.cat_map, self.prefix, "ts")
+    
+    def test_gzip_export(self):
+        """Test de l'export compressé selon l'extension du fichier"""
+        import gzip
+        path = Path(self.temp_dir) / "out.m3u.gz"
+        written = export_catalog("m3u", str(path), self.catalog, self.cat_map, self.prefix, "ts")
+        self.assertEqual(written, path.stat().st_size)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), render_m3u(self.catalog, self.cat_map, self.prefix, "ts"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour le module health.py
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from health import ChannelHealth
+from helpers import FakeConfig
+
+
+class TestChannelHealth(unittest.TestCase):
+    """Tests pour la classe ChannelHealth"""
+
+    def test_record_smooths_ttfb(self):
+        """Test du lissage du temps de première réponse"""
+        health = ChannelHealth(smoothing=0.5)
+        health.record("http://a/1.ts", True, 0.2)
+        health.record("http://a/1.ts", True, 0.4)
+        health.record("http://a/1.ts", False)
+        stats = health.get("http://a/1.ts")
+        self.assertEqual((stats.probes, stats.successes), (3, 2))
+        self.assertAlmostEqual(stats.ttfb, 0.3)
+        self.assertAlmostEqual(stats.success_rate, 0.6)
+        self.assertIsNone(health.get("http://a/2.ts"))
+
+    def test_rank(self):
+        """Test du classement : les plus fiables puis les plus rapides"""
+        health = ChannelHealth()
+        health.record("http://slow/1.ts", True, 0.8)
+        health.record("http://fast/1.ts", True, 0.1)
+        health.record("http://down/1.ts", False)
+        urls = ["http://down/1.ts", "http://new/1.ts", "http://slow/1.ts", "http://fast/1.ts"]
+        self.assertEqual(health.rank(urls), ["http://fast/1.ts", "http://slow/1.ts",
+                                             "http://new/1.ts", "http://down/1.ts"])
+
+    def test_bounded(self):
+        """Test de l'oubli des URLs les moins récemment testées"""
+        health = ChannelHealth(max_items=2)
+        health.record("http://a/1.ts", True, 0.1)
+        health.record("http://a/2.ts", True, 0.1)
+        health.record("http://a/1.ts", True, 0.1)
+        health.record("http://a/3.ts", True, 0.1)
+        self.assertEqual(len(health), 2)
+        self.assertIsNone(health.get("http://a/2.ts"))
+
+    def test_save_and_load(self):
+        """Test de la persistance du registre"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "health" / "streams.json")
+            health = ChannelHealth()
+            health.record("http://a/1.ts", True, 0.25)
+            health.record("http://a/2.ts", False)
+            self.assertTrue(health.dirty)
+            health.save(path)
+            self.assertFalse(health.dirty)
+
+            loaded = ChannelHealth.from_config(FakeConfig({"path": path, "smoothing": 0.5}))
+            self.assertEqual(loaded.smoothing, 0.5)
+            self.assertEqual(len(loaded), 2)
+            self.assertEqual(loaded.get("http://a/1.ts").ttfb, 0.25)
+            self.assertEqual(loaded.get("http://a/2.ts").successes, 0)
+
+    def test_load_missing_file(self):
+        """Test qu'un fichier absent est ignoré"""
+        self.assertEqual(ChannelHealth().load("/nonexistent/streams.json"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,59 @@ Tests unitaires pour le module iptv_client.py
 """
 
 import asyncio
+import json
 import unittest
+import aiohttp
+from contextlib import asynccontextmanager
 from unittest.mock import patch, MagicMock
+import loop_thread
+from catalog import Catalog
+from config_manager import CONFIG
+from health import ChannelHealth
 from iptv_client import IPTVClient
+from retry import CircuitOpenError
+
+
+class FakeResponse:
+    """Réponse HTTP minimale pour simuler aiohttp"""
+    
+    def __init__(self, status, body='', headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.released = False
+    
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message='error')
+    
+    async def text(self):
+        return self.body
+    
+    async def read(self):
+        return self.body.encode('utf-8')
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        self.released = True
+        return False
+
+
+class FakeSession:
+    """Session HTTP minimale renvoyant des réponses prédéfinies"""
+    
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+    
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        return self.responses.pop(0)
+    
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
 
 
 class TestIPTVClient(unittest.TestCase):
@@ -61,6 +111,41 @@ class TestIPTVClient(unittest.TestCase):
         base_url = client.construct_base_url()
         self.assertEqual(base_url, "https://example.com")
     
+    def test_stream_url(self):
+        """Test de la construction des URLs de flux"""
+        self.client.parse_url()
+        self.assertEqual(self.client.stream_prefix("movie"), "http://example.com:8080/movie/test/test")
+        self.assertEqual(self.client.stream_url("live", "12.ts"), "http://example.com:8080/live/test/test/12.ts")
+    
+    def test_import_has_no_side_effects(self):
+        """Test que l'import ne charge ni aiohttp, ni le pool de processus, ni l'export et l'EPG, et n'écrit pas config.ini
+        
+        Créer un client ne démarre pas non plus la surveillance de config.ini.
+        """
+        import os
+        import subprocess
+        import sys
+        import tempfile
+        from pathlib import Path
+        
+        root = str(Path(__file__).resolve().parent.parent)
+        code = ("import sys, os, threading, iptv_client; "
+                "print(*[m in sys.modules for m in ('aiohttp', 'multiprocessing', 'export', 'epg')], "
+                "os.path.exists('config.ini')); "
+                "iptv_client.IPTVClient('http://example.com/get.php?username=u&password=p'); "
+                "print(any(t.name == 'config-watcher' for t in threading.enumerate()))")
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+                                    env=dict(os.environ, PYTHONPATH=root))
+        self.assertEqual(result.stdout.split(), ["False"] * 6, result.stderr)
+    
+    def test_shared_caches_created_on_first_use(self):
+        """Test que les caches partagés sont créés une seule fois, au premier usage"""
+        cache = IPTVClient._get_global_cache()
+        self.assertIs(IPTVClient._get_global_cache(), cache)
+        self.assertEqual(cache.name, "server_info")
+        self.assertEqual(IPTVClient._get_series_cache().name, "series_info")
+    
     @patch('aiohttp.ClientSession')
     async def test_fetch_success(self, mock_session):
         """Test de la méthode fetch avec succès"""
@@ -87,32 +172,617 @@ class TestIPTVClient(unittest.TestCase):
         with self.assertRaises(Exception):
             await self.client.fetch(session, 'http://example.com')
     
+    def test_fetch_retries_transient_status(self):
+        """Test de la reprise de fetch sur un statut 503 transitoire"""
+        session = FakeSession([FakeResponse(503), FakeResponse(200, 'ok')])
+        IPTVClient._breakers.clear()
+        with patch("iptv_client.asyncio.sleep", return_value=None):
+            result = asyncio.run(self.client.fetch(session, 'http://retry.example.com/player_api.php'))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(len(session.calls), 2)
+    
+    def test_fetch_does_not_retry_non_idempotent(self):
+        """Test que les requêtes non idempotentes ne sont pas rejouées"""
+        session = FakeSession([FakeResponse(503), FakeResponse(200, 'ok')])
+        IPTVClient._breakers.clear()
+        with self.assertRaises(Exception):
+            asyncio.run(self.client.fetch(session, 'http://retry.example.com/player_api.php', "POST",
+                                          {"action": "set_favorite"}))
+        self.assertEqual(len(session.calls), 1)
+    
+    def test_fetch_records_metrics(self):
+        """Test des métriques de latence, de statut et d'octets reçus"""
+        from iptv_client import BYTES_RECEIVED, REQUEST_DURATION, REQUESTS
+        session = FakeSession([FakeResponse(503), FakeResponse(200, 'ok')])
+        IPTVClient._breakers.clear()
+        before = REQUEST_DURATION.count(host="metrics.example.com", action="default")
+        with patch("iptv_client.asyncio.sleep", return_value=None):
+            asyncio.run(self.client.fetch(session, 'http://metrics.example.com/player_api.php'))
+        self.assertEqual(REQUEST_DURATION.count(host="metrics.example.com", action="default"), before + 2)
+        self.assertGreaterEqual(REQUESTS.value(host="metrics.example.com", action="default", status=503), 1)
+        self.assertGreaterEqual(BYTES_RECEIVED.value(host="metrics.example.com"), 2)
+    
+    def test_fetch_circuit_breaker_fails_fast(self):
+        """Test que le disjoncteur ouvert évite d'appeler un hôte en panne"""
+        session = FakeSession([FakeResponse(200, 'ok')])
+        IPTVClient._breakers.clear()
+        breaker = IPTVClient._get_breaker('down.example.com')
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(self.client.fetch(session, 'http://down.example.com/player_api.php'))
+        self.assertEqual(session.calls, [])
+    
+    def _half_open_breaker(self, host):
+        """Retourne le disjoncteur d'un hôte, ouvert puis arrivé en fin de délai"""
+        IPTVClient._breakers.clear()
+        breaker = IPTVClient._get_breaker(host)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        breaker.opened_at -= breaker.reset_timeout
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+        return breaker
+    
+    def test_fetch_half_open_trial_rate_limited(self):
+        """Test qu'un 429 sur la requête d'essai ne bloque pas l'hôte"""
+        breaker = self._half_open_breaker('trial.example.com')
+        session = FakeSession([FakeResponse(429), FakeResponse(200, 'ok')])
+        with patch("iptv_client.asyncio.sleep", return_value=None):
+            result = asyncio.run(self.client.fetch(session, 'http://trial.example.com/player_api.php'))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(len(session.calls), 2)
+        self.assertEqual(breaker.state, breaker.CLOSED)
+    
+    def test_fetch_releases_response_before_backoff(self):
+        """Test que la réponse à reprendre est libérée avant l'attente"""
+        limited = FakeResponse(429, headers={"Retry-After": "3"})
+        session = FakeSession([limited, FakeResponse(200, 'ok')])
+        IPTVClient._breakers.clear()
+        delays = []
+        
+        async def fake_sleep(delay):
+            self.assertTrue(limited.released)
+            delays.append(delay)
+        
+        with patch("iptv_client.asyncio.sleep", side_effect=fake_sleep):
+            result = asyncio.run(self.client.fetch(session, 'http://retry.example.com/player_api.php'))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(len(delays), 1)
+        self.assertGreaterEqual(delays[0], 3)
+    
+    def test_fetch_rate_limited_last_attempt(self):
+        """Test qu'un 429 à la dernière tentative ne compte pas comme un succès"""
+        IPTVClient._breakers.clear()
+        breaker = IPTVClient._get_breaker('limited.example.com')
+        breaker.record_failure()
+        session = FakeSession([FakeResponse(429)])
+        with self.assertRaises(Exception):
+            asyncio.run(self.client.fetch(session, 'http://limited.example.com/player_api.php', "POST",
+                                          {"action": "set_favorite"}))
+        self.assertEqual(breaker.failures, 1)
+        
+        breaker = self._half_open_breaker('limited.example.com')
+        session = FakeSession([FakeResponse(429)])
+        with self.assertRaises(Exception):
+            asyncio.run(self.client.fetch(session, 'http://limited.example.com/player_api.php', "POST",
+                                          {"action": "set_favorite"}))
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+    
+    def test_fetch_half_open_trial_exception(self):
+        """Test qu'une erreur locale pendant la requête d'essai libère l'essai"""
+        class BrokenResponse(FakeResponse):
+            async def text(self):
+                raise ValueError("corrupt body")
+        
+        breaker = self._half_open_breaker('trial.example.com')
+        session = FakeSession([BrokenResponse(200), FakeResponse(200, 'ok')])
+        with self.assertRaises(ValueError):
+            asyncio.run(self.client.fetch(session, 'http://trial.example.com/player_api.php'))
+        self.assertEqual(breaker.state, breaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        breaker.release_trial()
+        result = asyncio.run(self.client.fetch(session, 'http://trial.example.com/player_api.php'))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(breaker.state, breaker.CLOSED)
+    
     def test_get_server_info_cache_hit(self):
         """Test de get_server_info avec cache hit"""
         # Le cache est testé dans test_cache.py
         pass
     
+    def test_server_info_refresh_ahead(self):
+        """Test que les informations serveur sont gardées au chaud sur la boucle en cours"""
+        config_get = CONFIG.get
+        
+        def fake_get(section, key, default=None):
+            if (section, key) == ('refresh', 'enabled'):
+                return True
+            return config_get(section, key, default)
+        
+        async def store(key):
+            self.client.parse_url()
+            self.client.cache_key = key
+            self.client._cache_server_info({"status": "Active"})
+        
+        refresher = IPTVClient._get_refresher(IPTVClient._get_global_cache())
+        try:
+            with patch("iptv_client.CONFIG.get", side_effect=fake_get):
+                # Une boucle éphémère programme le rafraîchissement, annulé à sa fermeture
+                asyncio.run(store("server_info_oneshot"))
+                self.assertIn("server_info_oneshot", refresher.watched)
+                self.assertFalse(refresher.running)
+                
+                loop_thread.get_loop_thread().run(store("server_info_watched"), timeout=5)
+                self.assertIn("server_info_watched", refresher.watched)
+                self.assertTrue(refresher.running)
+        finally:
+            loop_thread.shutdown()
+    
+    def test_catalog_and_series_refresh_ahead(self):
+        """Test que les catalogues et les fiches de séries en cache sont aussi gardés au chaud"""
+        config_get = CONFIG.get
+        downloads = []
+        
+        def fake_get(section, key, default=None):
+            if (section, key) == ('refresh', 'enabled'):
+                return True
+            return config_get(section, key, default)
+        
+        async def download(client, session, categories_action, streams_action, id_key="stream_id"):
+            downloads.append(streams_action)
+            return {"1": "News"}, Catalog([])
+        
+        async def fetch(client, session, url, method="GET", data=None, headers=None, raw=False):
+            return b'{"info": {"name": "Show"}, "episodes": {}}'
+        
+        async def run():
+            self.client.parse_url()
+            first = await self.client._fetch_catalog(None, "get_live_categories", "get_live_streams")
+            second = await self.client._fetch_catalog(None, "get_live_categories", "get_live_streams")
+            info = await self.client._get_series_info(None, "http://example.com:8080/player_api.php", {}, 7)
+            return first, second, info
+        
+        with patch("iptv_client.CONFIG.get", side_effect=fake_get), \
+                patch.object(IPTVClient, "_download_catalog", download), \
+                patch.object(IPTVClient, "fetch", fetch):
+            first, second, info = asyncio.run(run())
+            self.assertIs(first, second)
+            self.assertEqual(downloads, ["get_live_streams"])
+            self.assertEqual(info["info"]["name"], "Show")
+            
+            catalogs = IPTVClient._get_refresher(IPTVClient._get_catalog_cache())
+            key = "catalog_example.com_test_get_live_streams"
+            self.assertIn(key, catalogs.watched)
+            self.assertEqual(asyncio.run(catalogs.run_once(catalogs.watched[key])), 1)
+            self.assertEqual(downloads, ["get_live_streams", "get_live_streams"])
+            
+            series = IPTVClient._get_refresher(IPTVClient._get_series_cache())
+            key = "series_info_example.com_test_7"
+            self.assertIn(key, series.watched)
+            due = series.watched[key]
+            # Fiche lue juste avant l'échéance : l'entrée est chaude
+            IPTVClient._get_series_cache().access_times[key] = due
+            self.assertEqual(asyncio.run(series.run_once(due)), 1)
+    
+    def test_apply_config(self):
+        """Test que les valeurs rechargées sont transmises aux limiteurs en cours"""
+        values = {('rate_limit', 'requests_per_second'): 5.0, ('rate_limit', 'burst'): 2,
+                  ('testing', 'max_concurrent_tests'): 3}
+        config_get = CONFIG.get
+        
+        def fake_get(section, key, default=None):
+            return values.get((section, key), config_get(section, key, default))
+        
+        bucket = IPTVClient._get_limiter("reload.example.com")
+        limiter = IPTVClient._concurrency_limiter('testing', 'max_concurrent_tests', 10)
+        try:
+            with patch("iptv_client.CONFIG.get", side_effect=fake_get):
+                IPTVClient.apply_config()
+            self.assertEqual((bucket.rate, bucket.burst), (5.0, 2))
+            self.assertEqual(limiter.limit, 3)
+        finally:
+            del IPTVClient._limiters["reload.example.com"]
+    
+    def test_apply_config_on_event_loop(self):
+        """Test que le rechargement depuis un autre thread est appliqué sur la boucle des requêtes"""
+        import threading
+        config_get = CONFIG.get
+        threads = set()
+        
+        def fake_get(section, key, default=None):
+            if (section, key) == ('rate_limit', 'requests_per_second'):
+                threads.add(threading.current_thread().name)
+                return 7.0
+            return config_get(section, key, default)
+        
+        async def use_loop():
+            IPTVClient._loop = asyncio.get_running_loop()
+        
+        bucket = IPTVClient._get_limiter("reload.example.com")
+        thread = loop_thread.get_loop_thread()
+        try:
+            thread.run(use_loop())
+            with patch("iptv_client.CONFIG.get", side_effect=fake_get):
+                IPTVClient.apply_config()
+                # La mise à jour est planifiée avant cette coroutine
+                thread.run(asyncio.sleep(0))
+            self.assertEqual(bucket.rate, 7.0)
+            self.assertEqual(threads, {thread.name})
+        finally:
+            del IPTVClient._limiters["reload.example.com"]
+            loop_thread.shutdown()
+    
+    def _run_with_responses(self, coro_factory, responses):
+        """Exécute une génération avec des réponses player_api simulées"""
+        async def fake_fetch(session, url, method="GET", data=None, headers=None, **kwargs):
+            response = responses[data["action"]]
+            if isinstance(response, Exception):
+                raise response
+            return json.dumps(response)
+        
+        with patch.object(self.client, "fetch", side_effect=fake_fetch):
+            return asyncio.run(coro_factory())
+    
     def test_generate_m3u(self):
         """Test de la méthode generate_m3u"""
-        # Les tests asynchrones nécessitent un loop
-        pass
+        content = self._run_with_responses(self.client.generate_m3u, {
+            "get_live_categories": [{"category_id": "1", "category_name": "News"}],
+            "get_live_streams": [
+                {"stream_id": 5, "name": "Info", "category_id": "1", "stream_icon": "i.png"},
+                {"stream_id": 6, "name": "", "category_id": "1"},
+            ],
+        })
+        self.assertEqual(content.split("\n"), [
+            "#EXTM3U",
+            '#EXTINF:-1 tvg-logo="i.png" group-title="News",Info',
+            "http://example.com:8080/live/test/test/5.ts",
+        ])
+    
+    def test_generate_m3u_traces(self):
+        """Test des spans parse et render rattachés à la génération"""
+        from tracing import TRACER
+        spans = []
+        TRACER.set_exporter(MagicMock(export=spans.append))
+        try:
+            self._run_with_responses(self.client.generate_m3u, {
+                "get_live_categories": [],
+                "get_live_streams": [{"stream_id": 5, "name": "Info"}, {"stream_id": 6, "name": "News"}],
+            })
+        finally:
+            TRACER.set_exporter(None)
+        
+        by_name = {(span.name, span.attributes.get("action")): span for span in spans}
+        root = by_name[("generate", None)]
+        parse = by_name[("parse", "get_live_streams")]
+        render = by_name[("render", None)]
+        self.assertEqual(root.attributes, {"account": "test@example.com", "kind": "live"})
+        self.assertEqual(parse.attributes["items"], 2)
+        self.assertEqual(render.attributes["items"], 2)
+        self.assertEqual({parse.parent_id, render.parent_id}, {root.span_id})
     
     def test_generate_radio_m3u(self):
         """Test de la méthode generate_radio_m3u"""
-        pass
+        content = self._run_with_responses(self.client.generate_radio_m3u, {
+            "get_radio_categories": [],
+            "get_radio_streams": [{"id": 9, "name": "Jazz", "category_id": "3"}],
+        })
+        self.assertIn("http://example.com:8080/radio/test/test/9.ts", content)
+    
+    def test_generate_radio_m3u_fallback(self):
+        """Test du repli sur les chaînes live quand l'API radio est indisponible"""
+        content = self._run_with_responses(self.client.generate_radio_m3u, {
+            "get_radio_categories": Exception("HTTP request failed: 404"),
+            "get_live_categories": [],
+            "get_live_streams": [
+                {"stream_id": 1, "name": "Radio Nova", "category_id": "1"},
+                {"stream_id": 2, "name": "Sport TV", "category_id": "1"},
+            ],
+        })
+        self.assertIn("/live/test/test/1.ts", content)
+        self.assertNotIn("/live/test/test/2.ts", content)
     
     def test_generate_vod_m3u(self):
         """Test de la méthode generate_vod_m3u"""
-        pass
+        content = self._run_with_responses(self.client.generate_vod_m3u, {
+            "get_vod_categories": [{"category_id": "2", "category_name": "Films"}],
+            "get_vod_streams": [
+                {"stream_id": 7, "name": "Movie", "category_id": "2", "container_extension": "mkv"},
+                {"stream_id": 8, "name": "Other", "category_id": "9"},
+            ],
+        })
+        lines = content.split("\n")
+        self.assertEqual(lines[1], '#EXTINF:-1 tvg-logo="" group-title="Films",Movie')
+        self.assertEqual(lines[2], "http://example.com:8080/movie/test/test/7.mkv")
+        self.assertEqual(lines[3], '#EXTINF:-1 tvg-logo="" group-title="Unknown",Other')
+        self.assertEqual(lines[4], "http://example.com:8080/movie/test/test/8.mp4")
     
+    def test_generate_all_shares_live_catalog(self):
+        """Test que generate_all récupère les catalogues en parallèle sans télécharger deux fois le live"""
+        calls = []
+        in_flight = [0, 0]
+        responses = {
+            "get_radio_categories": Exception("HTTP request failed: 404"),
+            "get_live_categories": [{"category_id": "1", "category_name": "News"}],
+            "get_live_streams": [
+                {"stream_id": 1, "name": "Radio Nova", "category_id": "1"},
+                {"stream_id": 2, "name": "Sport TV", "category_id": "1"},
+            ],
+            "get_vod_categories": [],
+            "get_vod_streams": [{"stream_id": 7, "name": "Movie", "category_id": "2"}],
+        }
+
+        async def fake_fetch(session, url, method="GET", data=None, headers=None, **kwargs):
+            calls.append(data["action"])
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0)
+            in_flight[0] -= 1
+            response = responses[data["action"]]
+            if isinstance(response, Exception):
+                raise response
+            return json.dumps(response)
+
+        with patch.object(self.client, "fetch", side_effect=fake_fetch):
+            playlists = asyncio.run(self.client.generate_all())
+
+        self.assertEqual(set(playlists), {"live", "radio", "vod"})
+        self.assertEqual(calls.count("get_live_streams"), 1)
+        self.assertGreater(in_flight[1], 1)
+        self.assertIn("/live/test/test/2.ts", playlists["live"])
+        self.assertIn("/live/test/test/1.ts", playlists["radio"])
+        self.assertNotIn("/live/test/test/2.ts", playlists["radio"])
+        self.assertIn("/movie/test/test/7.mp4", playlists["vod"])
+
+    def test_generate_series_m3u(self):
+        """Test de la méthode generate_series_m3u avec des réponses simulées"""
+        responses = {
+            "get_series_categories": [{"category_id": "1", "category_name": "Drama"}],
+            "get_series": [
+                {"series_id": 10, "name": "Show", "category_id": "1", "cover": "c.png"},
+                {"series_id": 11, "name": "Broken", "category_id": "1"},
+            ],
+        }
+        episodes = {
+            "episodes": {
+                "1": [{"id": "100", "season": 1, "episode_num": 2, "container_extension": "mkv"}]
+            }
+        }
+        
+        async def fake_fetch(session, url, method="GET", data=None, headers=None, **kwargs):
+            action = data["action"]
+            if action == "get_series_info":
+                if data["series_id"] == "11":
+                    raise Exception("HTTP request failed: 500")
+                return json.dumps(episodes)
+            return json.dumps(responses[action])
+        
+        progress = []
+        client = IPTVClient(self.client.url, use_cache=False)
+        with patch.object(client, "fetch", side_effect=fake_fetch), \
+                patch("iptv_client.asyncio.sleep", return_value=None):
+            content = asyncio.run(client.generate_series_m3u(
+                on_progress=lambda done, total: progress.append((done, total))
+            ))
+        
+        lines = content.split("\n")
+        self.assertEqual(lines[0], "#EXTM3U")
+        self.assertEqual(lines[1], '#EXTINF:-1 tvg-logo="c.png" group-title="Drama",Show S01E02')
+        self.assertEqual(lines[2], "http://example.com:8080/series/test/test/100.mkv")
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(progress[-1], (2, 2))
+
+    def test_generate_series_m3u_circuit_open(self):
+        """Test qu'un disjoncteur ouvert interrompt la génération au lieu d'omettre les séries"""
+        from retry import CircuitOpenError
+        responses = {
+            "get_series_categories": [],
+            "get_series": [{"series_id": i, "name": f"Show {i}"} for i in range(1, 21)],
+        }
+        calls = []
+
+        async def fake_fetch(session, url, method="GET", data=None, headers=None, **kwargs):
+            action = data["action"]
+            if action == "get_series_info":
+                calls.append(data["series_id"])
+                await asyncio.sleep(0)
+                raise CircuitOpenError("HTTP request failed: circuit open for example.com:8080")
+            return json.dumps(responses[action])
+
+        client = IPTVClient(self.client.url, use_cache=False)
+        with patch.object(client, "fetch", side_effect=fake_fetch):
+            with self.assertRaises(CircuitOpenError):
+                asyncio.run(client.generate_series_m3u())
+        # Les séries encore en attente ne sont pas demandées
+        self.assertLess(len(calls), 20)
+
+    def test_export_fetches_each_catalog_once(self):
+        """Test que l'export multi-format ne récupère chaque catalogue qu'une fois"""
+        import tempfile
+        from pathlib import Path
+        
+        calls = []
+        responses = {
+            "get_live_categories": [{"category_id": "1", "category_name": "News"}],
+            "get_live_streams": [{"stream_id": 5, "name": "Info", "category_id": "1"}],
+        }
+        
+        async def fake_fetch(session, url, method="GET", data=None, headers=None, **kwargs):
+            calls.append(data["action"])
+            return json.dumps(responses[data["action"]])
+        
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(self.client, "fetch", side_effect=fake_fetch):
+            paths = asyncio.run(self.client.export(temp_dir, kinds=("live",),
+                                                   formats=("m3u", "m3u_plus", "json", "csv")))
+            self.assertEqual(calls, ["get_live_categories", "get_live_streams"])
+            self.assertEqual(set(paths["live"]), {"m3u", "m3u_plus", "json", "csv"})
+            for path in paths["live"].values():
+                self.assertTrue(Path(path).exists())
+            self.assertTrue(paths["live"]["m3u"].endswith("example.com_test_live.m3u"))
+    
+    def test_generate_epg(self):
+        """Test de la génération de la playlist avec le guide XMLTV filtré"""
+        import tempfile
+        from pathlib import Path
+
+        responses = {
+            "get_live_categories": [{"category_id": "1", "category_name": "News"}],
+            "get_live_streams": [{"stream_id": 5, "name": "Info HD", "category_id": "1"}],
+        }
+        xmltv = ('<tv><channel id="info.fr"><display-name>Info</display-name></channel>'
+                 '<channel id="x"><display-name>X</display-name></channel>'
+                 '<programme channel="info.fr" start="1"><title>A</title></programme>'
+                 '<programme channel="x" start="1"><title>B</title></programme></tv>')
+
+        async def fake_fetch(session, url, method="GET", data=None, headers=None, dest=None, **kwargs):
+            if dest:
+                self.assertIn("/xmltv.php?username=test&password=test", url)
+                Path(dest).write_text(xmltv, encoding="utf-8")
+                return dest
+            return json.dumps(responses[data["action"]])
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(self.client, "fetch", side_effect=fake_fetch):
+            epg_path = str(Path(temp_dir) / "guide.xml")
+            content, result = asyncio.run(self.client.generate_epg(epg_path))
+            self.assertEqual(sorted(p.name for p in Path(temp_dir).iterdir()), ["guide.xml"])
+            self.assertNotIn("<title>B</title>", Path(epg_path).read_text(encoding="utf-8"))
+
+        lines = content.split("\n")
+        self.assertEqual(lines[0], '#EXTM3U url-tvg="guide.xml"')
+        self.assertEqual(lines[1], '#EXTINF:-1 tvg-id="info.fr" tvg-logo="" group-title="News",Info HD')
+        self.assertEqual((result.channels_kept, result.programmes_kept), (1, 1))
+
+    def test_fetch_streams_to_file(self):
+        """Test du téléchargement d'une réponse directement sur disque"""
+        import tempfile
+        from pathlib import Path
+
+        class FakeContent:
+            async def iter_chunked(self, size):
+                for chunk in (b"<tv>", b"</tv>"):
+                    yield chunk
+
+        response = FakeResponse(200)
+        response.content = FakeContent()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dest = str(Path(temp_dir) / "xmltv.xml")
+            result = asyncio.run(self.client.fetch(FakeSession([response]), "http://example.com/xmltv.php",
+                                                   dest=dest))
+            self.assertEqual(result, dest)
+            self.assertEqual(Path(dest).read_bytes(), b"<tv></tv>")
+            self.assertFalse(Path(f"{dest}.part").exists())
+
     def test_save_m3u(self):
         """Test de la méthode save_m3u"""
         # Les tests de sauvegarde nécessitent un fichier temporaire
         pass
     
+    def test_save_m3u_gzip(self):
+        """Test de la sauvegarde d'une playlist compressée"""
+        import gzip
+        import tempfile
+        from pathlib import Path
+        
+        content = "#EXTM3U\n" + "\n".join(f"#EXTINF:-1,Chaîne {i}\nhttp://h/{i}.ts" for i in range(1000))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = self.client.save_m3u(content, str(Path(temp_dir) / "playlist.m3u"), compression="gz")
+            self.assertTrue(filename.endswith("playlist.m3u.gz"))
+            with gzip.open(filename, "rt", encoding="utf-8") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(self.client.get_transfer_stats()["bytes_written"], Path(filename).stat().st_size)
+    
+    def test_fetch_decompresses_gzip_stream(self):
+        """Test de la décompression au fil de l'eau et du comptage des octets reçus"""
+        import gzip
+        
+        payload = json.dumps([{"stream_id": i, "name": f"Channel {i}"} for i in range(500)]).encode("utf-8")
+        compressed = gzip.compress(payload)
+        
+        class FakeContent:
+            async def iter_chunked(self, size):
+                for start in range(0, len(compressed), 1000):
+                    yield compressed[start:start + 1000]
+        
+        response = FakeResponse(200, headers={"Content-Encoding": "gzip"})
+        response.content = FakeContent()
+        response.charset = None
+        session = FakeSession([response])
+        session.auto_decompress = False
+        client = IPTVClient(self.client.url, use_cache=False)
+        body = asyncio.run(client.fetch(session, "http://example.com/player_api.php", raw=True))
+        self.assertEqual(body, payload)
+        stats = client.get_transfer_stats()
+        self.assertEqual(stats["bytes_received"], len(compressed))
+        self.assertEqual(stats["bytes_decoded"], len(payload))
+        self.assertGreater(stats["compression_ratio"], 1)
+    
     def test_test_channels(self):
         """Test de la méthode test_channels"""
         pass
+    
+    def test_test_channels_resume_from_journal(self):
+        """Test de la reprise d'un test interrompu depuis le journal"""
+        import tempfile
+        from pathlib import Path
+        
+        m3u = "\n".join([
+            "#EXTM3U",
+            "#EXTINF:-1,A", "http://example.com:8080/live/test/test/1.ts",
+            "#EXTINF:-1,B", "http://example.com:8080/live/test/test/2.ts",
+            "#EXTINF:-1,C", "http://example.com:8080/live/test/test/3.ts",
+        ])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_path = Path(temp_dir) / "run.journal"
+            journal_path.write_text("1 http://example.com:8080/live/test/test/1.ts\n", encoding="utf-8")
+            
+            probed = []
+            
+            async def fake_probe(session, url, headers, ttfb_out=None):
+                probed.append(url)
+                return url.endswith("2.ts")
+            
+            with patch.object(self.client, "_test_single_channel", side_effect=fake_probe):
+                results = asyncio.run(self.client.test_channels(m3u, journal_path=str(journal_path)))
+            
+            self.assertEqual(sorted(probed), ["http://example.com:8080/live/test/test/2.ts",
+                                              "http://example.com:8080/live/test/test/3.ts"])
+            self.assertEqual(results["total"], 3)
+            self.assertEqual(results["working"], 2)
+            self.assertEqual(results["failed"], 1)
+            self.assertEqual(results["resumed"], 1)
+            # Test terminé : le journal est supprimé
+            self.assertFalse(journal_path.exists())
+    
+    def test_probe_records_ttfb(self):
+        """Test de la mesure du temps de première réponse de chaque flux testé"""
+        m3u = "\n".join([
+            "#EXTM3U",
+            "#EXTINF:-1,A", "http://example.com:8080/live/test/test/1.ts",
+            "#EXTINF:-1,B", "http://example.com:8080/live/test/test/2.ts",
+        ])
+        session = FakeSession([FakeResponse(200), FakeResponse(404)])
+        
+        @asynccontextmanager
+        async def fake_session():
+            yield session
+        
+        working, failed = "http://example.com:8080/live/test/test/1.ts", "http://example.com:8080/live/test/test/2.ts"
+        health = ChannelHealth()
+        # Mesure lente d'un run précédent : le registre la lisse, le résultat du run ne la reprend pas
+        health.record(working, True, 100.0)
+        with patch.object(IPTVClient, "_channel_health", health), \
+                patch.object(self.client, "_session", fake_session):
+            results = asyncio.run(self.client.test_channels(m3u))
+        
+        self.assertEqual(list(results["ttfb"]), [working])
+        self.assertGreaterEqual(results["ttfb"][working], 0)
+        self.assertLess(results["ttfb"][working], 5)
+        self.assertGreater(health.get(working).ttfb, 5)
+        self.assertEqual((health.get(working).probes, health.get(working).successes), (2, 2))
+        self.assertEqual((health.get(failed).successes, health.get(failed).ttfb), (0, None))
+        self.assertEqual(health.rank([failed, working]), [working, failed])
 
 
 class TestCache(unittest.TestCase):
@@ -0,0 +1,75 @@
+"""
+Tests unitaires pour le module json_backend.py
+"""
+
+import json
+import unittest
+import json_backend
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Tests pour les fonctions de décodage JSON"""
+    
+    def setUp(self):
+        """Initialise les tests"""
+        self.previous_backend = json_backend.get_backend()
+        self.previous_typed = json_backend._typed_decoding
+        self.payload = json.dumps([
+            {"stream_id": 1, "name": "Une", "category_id": "3", "stream_icon": "u.png",
+             "added": "1600000000", "category_ids": [3], "epg_channel_id": None},
+            {"stream_id": "2", "name": 42, "category_id": None, "stream_icon": None},
+            {"stream_id": 3, "name": ""},
+        ]).encode('utf-8')
+    
+    def tearDown(self):
+        """Restaure le backend d'origine"""
+        json_backend.set_backend(self.previous_backend, self.previous_typed)
+    
+    def test_all_backends_decode_bytes(self):
+        """Test que chaque backend disponible décode des octets"""
+        for backend in json_backend.AVAILABLE_BACKENDS:
+            with self.subTest(backend=backend):
+                json_backend.set_backend(backend)
+                self.assertEqual(json_backend.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+    
+    def test_all_backends_raise_json_decode_error(self):
+        """Test que les erreurs de décodage sont uniformes"""
+        for backend in json_backend.AVAILABLE_BACKENDS:
+            with self.subTest(backend=backend):
+                json_backend.set_backend(backend)
+                with self.assertRaises(json.JSONDecodeError):
+                    json_backend.loads(b'<html>Not Found</html>')
+    
+    def test_unknown_backend(self):
+        """Test de la sélection d'un backend inconnu"""
+        with self.assertRaises(ValueError):
+            json_backend.set_backend('simdjson')
+    
+    def test_auto_backend(self):
+        """Test que 'auto' choisit le backend le plus rapide disponible"""
+        self.assertEqual(json_backend.set_backend('auto'), json_backend.AVAILABLE_BACKENDS[-1])
+    
+    def test_decode_catalog_generic_and_typed_agree(self):
+        """Test que le décodage typé et le décodage générique donnent le même catalogue"""
+        results = []
+        for typed in (False, True):
+            json_backend.set_backend('json', typed_decoding=typed)
+            catalog = json_backend.decode_catalog(self.payload)
+            results.append([(r.stream_id, r.name, r.category_id, r.icon) for r in catalog])
+        self.assertEqual(results[0], [("1", "Une", "3", "u.png"), ("2", "42", "", "")])
+        self.assertEqual(results[0], results[1])
+    
+    def test_decode_catalog_error_object(self):
+        """Test qu'une réponse d'erreur donne un catalogue vide"""
+        json_backend.set_backend('auto', typed_decoding=True)
+        self.assertEqual(len(json_backend.decode_catalog(b'{"user_info": {"auth": 0}}')), 0)
+    
+    def test_count_items(self):
+        """Test de la méthode count_items"""
+        self.assertEqual(json_backend.count_items(self.payload), 3)
+        self.assertEqual(json_backend.count_items(b'{"a": 1}'), 0)
+        self.assertEqual(json_backend.count_items(b''), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
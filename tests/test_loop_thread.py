@@ -0,0 +1,128 @@
+"""
+Tests unitaires pour le module loop_thread.py
+"""
+
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+import loop_thread
+from loop_thread import LoopThread
+from iptv_client import IPTVClient
+
+
+class Resource:
+    """Ressource partagée factice à fermeture asynchrone"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class TestLoopThread(unittest.TestCase):
+    """Tests pour la classe LoopThread"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.thread = LoopThread("test-loop").start()
+
+    def tearDown(self):
+        """Arrête la boucle"""
+        self.thread.stop()
+
+    def test_submit(self):
+        """Test du résultat d'une coroutine soumise depuis un autre thread"""
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        self.assertEqual(self.thread.submit(add(1, 2)).result(5), 3)
+        self.assertEqual(self.thread.run(add(3, 4), timeout=5), 7)
+
+    def test_concurrent_operations(self):
+        """Test que plusieurs opérations s'exécutent en parallèle sur la boucle"""
+        async def wait():
+            await asyncio.sleep(0.2)
+            return asyncio.get_running_loop()
+
+        start = time.perf_counter()
+        futures = [self.thread.submit(wait()) for _ in range(5)]
+        loops = {future.result(5) for future in futures}
+        self.assertLess(time.perf_counter() - start, 0.8)
+        self.assertEqual(loops, {self.thread.loop})
+
+    def test_exception(self):
+        """Test de la propagation d'une exception à l'appelant"""
+        async def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.thread.run(fail(), timeout=5)
+
+    def test_shared_resource(self):
+        """Test qu'une ressource partagée est créée une fois puis fermée à l'arrêt"""
+        created = []
+
+        def factory():
+            created.append(Resource())
+            return created[-1]
+
+        async def get():
+            return self.thread.shared("resource", factory)
+
+        first = self.thread.run(get(), timeout=5)
+        self.assertIs(self.thread.run(get(), timeout=5), first)
+        self.assertEqual(len(created), 1)
+
+        self.thread.stop()
+        self.assertTrue(first.closed)
+        self.assertFalse(self.thread.running)
+
+    def test_stop_cancels_pending(self):
+        """Test que l'arrêt annule les opérations en cours"""
+        future = self.thread.submit(asyncio.sleep(60))
+        self.thread.stop()
+        self.assertTrue(future.cancelled())
+
+
+class TestGlobalLoopThread(unittest.TestCase):
+    """Tests pour la boucle globale de l'application"""
+
+    def tearDown(self):
+        """Arrête la boucle globale"""
+        loop_thread.shutdown()
+
+    def test_current(self):
+        """Test de la détection de la boucle persistante"""
+        async def inside():
+            return loop_thread.current()
+
+        shared_loop = loop_thread.get_loop_thread()
+        self.assertIs(loop_thread.get_loop_thread(), shared_loop)
+        self.assertIs(shared_loop.run(inside(), timeout=5), shared_loop)
+        self.assertIsNone(loop_thread.current())
+        self.assertIsNone(asyncio.run(inside()))
+
+    @patch('aiohttp.ClientSession')
+    def test_client_shares_session(self, mock_session):
+        """Test que les clients partagent une session sur la boucle persistante"""
+        async def get_session(url):
+            async with IPTVClient(url)._session() as session:
+                return session
+
+        shared_loop = loop_thread.get_loop_thread()
+        mock_session.return_value.closed = False
+        first = shared_loop.run(get_session("http://a/get.php?username=u&password=p"), timeout=5)
+        second = shared_loop.run(get_session("http://b/get.php?username=u&password=p"), timeout=5)
+        self.assertIs(first, second)
+        self.assertEqual(mock_session.call_count, 1)
+        first.close.assert_not_called()
+
+        loop_thread.shutdown()
+        first.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+"""
+Tests unitaires pour le module merge.py
+"""
+
+import asyncio
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import merge
+from catalog import Catalog
+from export import PlaylistEntry
+from health import ChannelHealth
+from iptv_client import IPTVClient, CatalogSource
+from merge import DedupIndex, failover_playlist, group_equivalents, merge_playlists, rank_accounts
+
+
+def make_source(host, channels):
+    """Construit un catalogue live à partir de (nom, tvg-id)"""
+    catalog = Catalog()
+    for stream_id, (name, tvg_id) in enumerate(channels, 1):
+        catalog.append(stream_id, name, "1", epg_id=tvg_id)
+    return CatalogSource({"1": "General"}, catalog, f"http://{host}/live/u/p", "ts", False)
+
+
+class TestDedupIndex(unittest.TestCase):
+    """Tests pour la classe DedupIndex"""
+
+    def test_dedup_by_name_and_tvg_id(self):
+        """Test du rapprochement par nom normalisé ou tvg-id"""
+        index = DedupIndex()
+        self.assertTrue(index.add(PlaylistEntry("FR: TF1 HD", "", "", "u1", "tf1.fr")))
+        self.assertFalse(index.add(PlaylistEntry("TF1 FHD", "", "", "u2")))
+        self.assertFalse(index.add(PlaylistEntry("TF 1", "", "", "u3", "TF1.fr")))
+        self.assertTrue(index.add(PlaylistEntry("France 2", "", "", "u4", "france2.fr")))
+        # Sans nom exploitable ni identifiant, l'entrée est toujours gardée
+        self.assertTrue(index.add(PlaylistEntry("HD", "", "", "u5")))
+        self.assertTrue(index.add(PlaylistEntry("HD", "", "", "u6")))
+
+    def test_group_equivalents(self):
+        """Test du regroupement des chaînes équivalentes"""
+        groups = group_equivalents([
+            PlaylistEntry("FR: TF1 HD", "", "", "u1", "tf1.fr"),
+            PlaylistEntry("France 2", "", "", "u2"),
+            PlaylistEntry("TF1 FHD", "", "", "u3"),
+            PlaylistEntry("TF 1", "", "", "u4", "TF1.fr"),
+            PlaylistEntry("HD", "", "", "u5"),
+        ])
+        self.assertEqual([[entry.url for entry in group] for group in groups],
+                         [["u1", "u3", "u4"], ["u2"], ["u5"]])
+
+
+class TestMergePlaylists(unittest.TestCase):
+    """Tests pour les fonctions merge_playlists et failover_playlist"""
+
+    SOURCES = {
+        "slow.example.com": (0.05, [("TF1 HD", "tf1.fr"), ("Arte", ""), ("M6", "m6.fr")]),
+        "fast.example.com": (0.0, [("FR: TF1", ""), ("France 2", "france2.fr"), ("France 2", "")]),
+        "down.example.com": (0.0, ConnectionError("unreachable")),
+    }
+
+    def setUp(self):
+        """Initialise les tests"""
+        merge._latencies.clear()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.health = ChannelHealth()
+        health_patch = patch.object(IPTVClient, "_channel_health", self.health)
+        health_patch.start()
+        self.addCleanup(health_patch.stop)
+
+    def tearDown(self):
+        """Nettoie après les tests"""
+        self.temp_dir.cleanup()
+
+    async def fake_get_source(self, client, kind="live"):
+        delay, channels = self.SOURCES[client.host]
+        await asyncio.sleep(delay)
+        if isinstance(channels, Exception):
+            raise channels
+        return make_source(client.host, channels)
+
+    def _merge(self, path, **kwargs):
+        urls = [f"http://{host}/player_api.php?username=u&password=p" for host in self.SOURCES]
+        with patch.object(IPTVClient, "get_source", autospec=True, side_effect=self.fake_get_source):
+            return asyncio.run(merge_playlists(urls, path, **kwargs))
+
+    def test_merge(self):
+        """Test de la fusion dans l'ordre du classement, quel que soit l'ordre d'arrivée"""
+        path = str(Path(self.temp_dir.name) / "merged.m3u")
+        # Sans historique, le classement garde l'ordre des URLs : le compte lent écrit en premier
+        result = self._merge(path)
+
+        self.assertEqual([account.account for account in result.accounts],
+                         ["u@slow.example.com:80", "u@fast.example.com:80", "u@down.example.com:80"])
+        slow, fast, down = result.accounts
+        self.assertEqual(down.error, "unreachable")
+        self.assertEqual((slow.streams, slow.kept, slow.duplicates), (3, 3, 0))
+        self.assertEqual((fast.streams, fast.kept, fast.duplicates), (3, 1, 2))
+        self.assertEqual((result.kept, result.duplicates), (4, 2))
+
+        lines = Path(path).read_text(encoding="utf-8").split("\n")
+        self.assertEqual(lines[0], "#EXTM3U")
+        self.assertEqual(lines[1:], [
+            '#EXTINF:-1 tvg-logo="" group-title="General",TF1 HD', "http://slow.example.com/live/u/p/1.ts",
+            '#EXTINF:-1 tvg-logo="" group-title="General",Arte', "http://slow.example.com/live/u/p/2.ts",
+            '#EXTINF:-1 tvg-logo="" group-title="General",M6', "http://slow.example.com/live/u/p/3.ts",
+            '#EXTINF:-1 tvg-logo="" group-title="General",France 2', "http://fast.example.com/live/u/p/2.ts",
+        ])
+        self.assertEqual(result.bytes_written, Path(path).stat().st_size)
+
+    def test_merge_follows_ranking(self):
+        """Test que le compte le plus rapide lors des fusions précédentes fournit les chaînes"""
+        self._merge(str(Path(self.temp_dir.name) / "first.m3u"))
+        path = str(Path(self.temp_dir.name) / "merged.m3u")
+        result = self._merge(path)
+
+        self.assertEqual([account.account for account in result.accounts],
+                         ["u@fast.example.com:80", "u@slow.example.com:80", "u@down.example.com:80"])
+        fast, slow, _ = result.accounts
+        self.assertEqual((fast.streams, fast.kept, fast.duplicates), (3, 2, 1))
+        self.assertEqual((slow.streams, slow.kept, slow.duplicates), (3, 2, 1))
+        lines = Path(path).read_text(encoding="utf-8").split("\n")
+        self.assertEqual(lines[2], "http://fast.example.com/live/u/p/1.ts")
+
+    def test_merge_bounded_concurrency(self):
+        """Test que le nombre de catalogues en cours est limité"""
+        active = peak = 0
+        original = self.fake_get_source
+
+        async def counting(client, kind="live"):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                return await original(client, kind)
+            finally:
+                active -= 1
+
+        self.fake_get_source = counting
+        result = self._merge(str(Path(self.temp_dir.name) / "merged.m3u"), max_concurrent=1)
+        self.assertEqual(peak, 1)
+        self.assertEqual(result.kept, 4)
+
+    def test_merge_compressed_json(self):
+        """Test de la fusion dans un autre format, compressée"""
+        path = str(Path(self.temp_dir.name) / "merged.json.gz")
+        result = self._merge(path, fmt="json")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read().count('"url"'), result.kept)
+
+    def _failover(self, path, **kwargs):
+        urls = [f"http://{host}/player_api.php?username=u&password=p" for host in self.SOURCES]
+        with patch.object(IPTVClient, "get_source", autospec=True, side_effect=self.fake_get_source):
+            return asyncio.run(failover_playlist(urls, path, **kwargs))
+
+    def test_failover_ordered(self):
+        """Test du classement des sources équivalentes par santé mesurée"""
+        # TF1 a répondu plus vite sur le second compte
+        self.health.record("http://slow.example.com/live/u/p/1.ts", True, 0.6)
+        self.health.record("http://fast.example.com/live/u/p/1.ts", True, 0.1)
+        path = str(Path(self.temp_dir.name) / "failover.m3u")
+        result = self._failover(path)
+
+        self.assertEqual((result.kept, result.duplicates), (4, 2))
+        urls = Path(path).read_text(encoding="utf-8").split("\n")[2::2]
+        self.assertEqual(urls, [
+            "http://fast.example.com/live/u/p/1.ts", "http://slow.example.com/live/u/p/1.ts",
+            "http://slow.example.com/live/u/p/2.ts", "http://slow.example.com/live/u/p/3.ts",
+            # À mesures égales, l'ordre du catalogue est conservé
+            "http://fast.example.com/live/u/p/2.ts", "http://fast.example.com/live/u/p/3.ts",
+        ])
+        slow, fast, down = result.accounts
+        self.assertEqual((fast.kept, fast.duplicates, slow.kept, slow.duplicates), (2, 1, 2, 1))
+
+    def test_failover_backup(self):
+        """Test du mode backup : meilleures sources d'abord, secours dans des groupes dédiés"""
+        self.health.record("http://fast.example.com/live/u/p/1.ts", False)
+        path = str(Path(self.temp_dir.name) / "failover.m3u")
+        self._failover(path, mode="backup")
+
+        lines = Path(path).read_text(encoding="utf-8").split("\n")
+        self.assertEqual(lines[1:3], ['#EXTINF:-1 tvg-logo="" group-title="General",TF1 HD',
+                                      "http://slow.example.com/live/u/p/1.ts"])
+        self.assertEqual(lines[-4:], [
+            '#EXTINF:-1 tvg-logo="" group-title="General (Backup)",FR: TF1', "http://fast.example.com/live/u/p/1.ts",
+            '#EXTINF:-1 tvg-logo="" group-title="General (Backup)",France 2', "http://fast.example.com/live/u/p/3.ts",
+        ])
+
+    def test_failover_probe(self):
+        """Test du test préalable des seules chaînes présentes plusieurs fois"""
+        probed = []
+
+        async def fake_test_channels(client, m3u_content):
+            probed.extend(line for line in m3u_content.split("\n") if line.startswith("http"))
+            return {}
+
+        with patch.object(IPTVClient, "test_channels", autospec=True, side_effect=fake_test_channels):
+            self._failover(str(Path(self.temp_dir.name) / "failover.m3u"), probe=True)
+        self.assertEqual(sorted(probed), ["http://fast.example.com/live/u/p/1.ts", "http://fast.example.com/live/u/p/2.ts",
+                                          "http://fast.example.com/live/u/p/3.ts", "http://slow.example.com/live/u/p/1.ts"])
+
+    def test_rank_accounts(self):
+        """Test du classement par latence mesurée lors des fusions précédentes"""
+        self._merge(str(Path(self.temp_dir.name) / "merged.m3u"))
+        clients = [IPTVClient(f"http://{host}/player_api.php?username=u&password=p")
+                   for host in ("slow.example.com", "new.example.com", "fast.example.com")]
+        for client in clients:
+            client.parse_url()
+        self.assertEqual([client.host for client in rank_accounts(clients)],
+                         ["fast.example.com", "slow.example.com", "new.example.com"])
+
+    def test_rank_accounts_breaker_with_port(self):
+        """Test que les échecs du disjoncteur d'un hôte avec port déclassent le compte"""
+        clients = [IPTVClient(f"http://{host}/player_api.php?username=u&password=p")
+                   for host in ("down.example.com:8080", "up.example.com:8080")]
+        for client in clients:
+            client.parse_url()
+        breaker = IPTVClient._get_breaker("down.example.com:8080")
+        try:
+            breaker.record_failure()
+            self.assertIs(clients[0].get_breaker(), breaker)
+            self.assertIsNone(clients[1].get_breaker())
+            self.assertEqual([client.host for client in rank_accounts(clients)],
+                             ["up.example.com", "down.example.com"])
+        finally:
+            del IPTVClient._breakers["down.example.com:8080"]
+
+    def test_unknown_format(self):
+        """Test du rejet d'un format inconnu"""
+        with self.assertRaises(ValueError):
+            asyncio.run(merge_playlists([], "out.txt", fmt="txt"))
+        with self.assertRaises(ValueError):
+            asyncio.run(failover_playlist([], "out.m3u", mode="random"))
+
+
+if __name__ == '__main__':
+    unittest.main()
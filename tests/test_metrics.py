@@ -0,0 +1,89 @@
+"""
+Tests unitaires pour le module metrics.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from metrics import MetricsRegistry, configure_export, to_json, to_prometheus, write_metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests pour le registre de métriques et ses exports"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.registry = MetricsRegistry()
+
+    def test_counter(self):
+        """Test d'un compteur avec labels"""
+        counter = self.registry.counter("requests_total", "Requests")
+        counter.inc(host="a")
+        counter.inc(2, host="a")
+        counter.inc(host="b")
+        self.assertEqual(counter.value(host="a"), 3)
+        self.assertEqual(counter.value(host="c"), 0)
+        self.assertIs(self.registry.counter("requests_total"), counter)
+
+    def test_histogram(self):
+        """Test d'un histogramme et de ses comptes cumulés"""
+        histogram = self.registry.histogram("duration_seconds", "Duration", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, action="get")
+        sample = histogram.samples()[0]
+        self.assertEqual(sample["buckets"], {"0.1": 2, "1.0": 3, "+Inf": 4})
+        self.assertEqual(sample["count"], 4)
+        self.assertAlmostEqual(sample["sum"], 3.65)
+
+    def test_histogram_timer(self):
+        """Test de la mesure d'un bloc, y compris en cas d'exception"""
+        histogram = self.registry.histogram("render_seconds")
+        with self.assertRaises(ValueError):
+            with histogram.time(format="m3u"):
+                raise ValueError()
+        self.assertEqual(histogram.count(format="m3u"), 1)
+
+    def test_prometheus_format(self):
+        """Test du format texte Prometheus"""
+        self.registry.counter("probes_total", "Probes").inc(outcome='work"ing')
+        self.registry.histogram("latency_seconds", buckets=(1.0,)).observe(0.5, host="h")
+        text = to_prometheus(self.registry)
+        self.assertIn("# HELP probes_total Probes\n# TYPE probes_total counter\n", text)
+        self.assertIn('probes_total{outcome="work\\"ing"} 1.0\n', text)
+        self.assertIn('latency_seconds_bucket{host="h",le="1.0"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{host="h",le="+Inf"} 1\n', text)
+        self.assertIn('latency_seconds_count{host="h"} 1\n', text)
+
+    def test_json_snapshot(self):
+        """Test de l'instantané JSON"""
+        self.registry.counter("hits_total").inc(cache="series")
+        snapshot = json.loads(to_json(self.registry))
+        self.assertEqual(snapshot["metrics"]["hits_total"]["samples"], [{"labels": {"cache": "series"}, "value": 1.0}])
+
+    def test_write_metrics(self):
+        """Test de l'écriture atomique dans un fichier"""
+        self.registry.counter("hits_total").inc()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = write_metrics(os.path.join(temp_dir, "out", "metrics.prom"), registry=self.registry)
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("hits_total 1.0", f.read())
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["metrics.prom"])
+            with self.assertRaises(ValueError):
+                write_metrics(path, "xml", registry=self.registry)
+
+    def test_configure_export(self):
+        """Test de l'activation de l'export selon la configuration"""
+        config = MagicMock()
+        config.get.side_effect = lambda section, key, default: {"exporter": "none"}.get(key, default)
+        self.assertIsNone(configure_export(config))
+
+        config.get.side_effect = lambda section, key, default: {"exporter": "json"}.get(key, default)
+        with patch("metrics.atexit.register") as register:
+            self.assertEqual(configure_export(config), "metrics.json")
+        register.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests d'intégration d'IPTVClient contre le panel simulé des benchmarks
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from iptv_client import IPTVClient  # noqa: E402
+from mock_panel import MockPanel  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+
+
+class TestMockPanel(unittest.TestCase):
+    """Tests de bout en bout sur un vrai serveur HTTP local"""
+
+    def _run(self, panel, scenario):
+        """Démarre le panel, exécute le scénario avec un client sans limite de débit, puis arrête le panel"""
+        async def run():
+            async with panel:
+                client = IPTVClient(panel.url, use_cache=False)
+                client.parse_url()
+                IPTVClient._limiters[client.host] = TokenBucket(0.0, 1)
+                try:
+                    return await scenario(client)
+                finally:
+                    IPTVClient._limiters.pop(client.host, None)
+        return asyncio.run(run())
+
+    def test_generate_all(self):
+        """Test de la génération des playlists live, radio et VOD"""
+        playlists = self._run(MockPanel(200), lambda client: client.generate_all())
+        self.assertEqual(playlists["live"].count("#EXTINF"), 200)
+        self.assertEqual(playlists["radio"].count("#EXTINF"), 10)
+        self.assertEqual(playlists["vod"].count("#EXTINF"), 200)
+        self.assertIn("/live/bench/bench/1.ts", playlists["live"])
+        self.assertIn("/movie/bench/bench/100001.", playlists["vod"])
+
+    def test_generate_series_m3u(self):
+        """Test de la génération de la playlist des séries"""
+        content = self._run(MockPanel(300), lambda client: client.generate_series_m3u())
+        self.assertIn("/series/bench/bench/", content)
+        self.assertGreater(content.count("#EXTINF"), 3)
+
+    def test_radio_fallback(self):
+        """Test du repli sur les chaînes live quand le panel n'expose pas les radios"""
+        content = self._run(MockPanel(100, radio_api=False), lambda client: client.generate_radio_m3u())
+        # Une chaîne sur vingt est nommée comme une radio
+        self.assertEqual(content.count("#EXTINF"), 5)
+        self.assertIn("/live/bench/bench/20.ts", content)
+
+    def test_test_channels(self):
+        """Test du test des chaînes contre des flux réels"""
+        async def scenario(client):
+            return await client.test_channels(await client.generate_m3u())
+
+        panel = MockPanel(50, stream_failure_rate=0.5)
+        results = self._run(panel, scenario)
+        self.assertEqual(results["total"], 50)
+        self.assertEqual(results["working"] + results["failed"], 50)
+        self.assertGreater(results["working"], 0)
+        self.assertGreater(results["failed"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
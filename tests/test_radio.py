@@ -0,0 +1,65 @@
+"""
+Tests unitaires pour le module radio.py
+"""
+
+import unittest
+from unittest.mock import MagicMock
+from catalog import Catalog
+from radio import RadioClassifier
+
+
+class TestRadioClassifier(unittest.TestCase):
+    """Tests pour la classe RadioClassifier"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.classifier = RadioClassifier()
+
+    def test_matches_keywords(self):
+        """Test des noms de radios reconnus"""
+        for name in ["Radio Nova", "NRJ 100.3 FM", "Skyrock 96FM", "RADIO-FRANCE", "Jazz Station", "[FM] Rock"]:
+            self.assertTrue(self.classifier.matches(name), name)
+
+    def test_ignores_substrings(self):
+        """Test que les mots-clés inclus dans d'autres mots ne sont pas reconnus"""
+        for name in ["Amazon Prime", "Panama TV", "Family Channel", "Film Classics", "Radiohead Live"]:
+            self.assertFalse(self.classifier.matches(name), name)
+
+    def test_custom_keywords(self):
+        """Test des mots-clés personnalisés"""
+        classifier = RadioClassifier(["rádio", " webradio "])
+        self.assertTrue(classifier.matches("Rádio Comercial"))
+        self.assertTrue(classifier.matches("WebRadio 80s"))
+        self.assertFalse(classifier.matches("Radio Nova"))
+
+    def test_no_keywords(self):
+        """Test qu'un classifieur sans mot-clé ne reconnaît rien"""
+        self.assertFalse(RadioClassifier([""]).matches("Radio Nova"))
+
+    def test_filter_catalog(self):
+        """Test de l'extraction des radios d'un catalogue"""
+        catalog = Catalog.from_json([
+            {"stream_id": 1, "name": "Radio Nova", "category_id": "1"},
+            {"stream_id": 2, "name": "Amazon TV", "category_id": "1"},
+            {"stream_id": 3, "name": "Jazz 24/7", "category_id": "2"},
+        ])
+        cat_map = {"1": "General", "2": "Radios FR"}
+        self.assertEqual([r.stream_id for r in self.classifier.filter(catalog, cat_map)], ["1"])
+
+        with_categories = RadioClassifier(match_categories=True)
+        self.assertEqual([r.stream_id for r in with_categories.filter(catalog, cat_map)], ["1", "3"])
+        self.assertTrue(with_categories.matches("Jazz 24/7", "Radios FR"))
+
+    def test_from_config(self):
+        """Test de la création depuis la configuration"""
+        config = MagicMock()
+        config.get.side_effect = lambda section, key, default: {
+            "keywords": "webradio,fm", "match_categories": True
+        }[key]
+        classifier = RadioClassifier.from_config(config)
+        self.assertEqual(classifier.keywords, ("webradio", "fm"))
+        self.assertTrue(classifier.match_categories)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Tests unitaires pour le module rate_limiter.py
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+from rate_limiter import TokenBucket, ConcurrencyLimiter
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests pour la classe TokenBucket"""
+    
+    def test_burst_is_immediate(self):
+        """Test que la rafale part sans attente"""
+        with patch('rate_limiter.time.monotonic', return_value=0.0):
+            bucket = TokenBucket(rate=2.0, burst=3)
+            waits = [bucket.reserve() for _ in range(3)]
+        self.assertEqual(waits, [0.0, 0.0, 0.0])
+    
+    def test_reservations_are_spaced(self):
+        """Test que les requêtes au-delà de la rafale sont espacées au débit configuré"""
+        with patch('rate_limiter.time.monotonic', return_value=0.0):
+            bucket = TokenBucket(rate=2.0, burst=1)
+            waits = [bucket.reserve() for _ in range(3)]
+        self.assertEqual(waits, [0.0, 0.5, 1.0])
+        stats = bucket.get_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['delayed'], 2)
+        self.assertEqual(stats['max_wait'], 1.0)
+        self.assertEqual(stats['total_wait'], 1.5)
+    
+    def test_refill_over_time(self):
+        """Test du remplissage du seau avec le temps"""
+        with patch('rate_limiter.time.monotonic', return_value=0.0):
+            bucket = TokenBucket(rate=1.0, burst=2)
+            bucket.reserve()
+            bucket.reserve()
+        with patch('rate_limiter.time.monotonic', return_value=1.0):
+            self.assertEqual(bucket.reserve(), 0.0)
+            self.assertEqual(bucket.reserve(), 1.0)
+    
+    def test_unlimited_rate(self):
+        """Test qu'un débit nul désactive la limitation"""
+        bucket = TokenBucket(rate=0, burst=1)
+        self.assertEqual([bucket.reserve() for _ in range(5)], [0.0] * 5)
+    
+    def test_configure(self):
+        """Test de la modification du débit à chaud"""
+        with patch('rate_limiter.time.monotonic', return_value=0.0):
+            bucket = TokenBucket(rate=1.0, burst=5)
+            bucket.configure(rate=4.0, burst=1)
+            self.assertEqual(bucket.reserve(), 0.0)
+            self.assertEqual(bucket.reserve(), 0.25)
+    
+    def test_acquire_sleeps(self):
+        """Test que acquire attend le délai réservé"""
+        with patch('rate_limiter.time.monotonic', return_value=0.0), \
+                patch('rate_limiter.asyncio.sleep') as mock_sleep:
+            bucket = TokenBucket(rate=10.0, burst=1)
+            asyncio.run(bucket.acquire())
+            asyncio.run(bucket.acquire())
+        mock_sleep.assert_awaited_once_with(0.1)
+
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    """Tests pour la classe ConcurrencyLimiter"""
+    
+    async def _run(self, limiter, tasks, on_start=None):
+        """Exécute des tâches sous le limiteur et retourne le pic de tâches simultanées"""
+        active = peak = 0
+        started = []
+        
+        async def task(i):
+            nonlocal active, peak
+            async with limiter:
+                active += 1
+                peak = max(peak, active)
+                started.append(i)
+                if on_start:
+                    on_start(len(started))
+                await asyncio.sleep(0.01)
+                active -= 1
+        
+        await asyncio.gather(*(task(i) for i in range(tasks)))
+        return peak, started
+    
+    def test_limit(self):
+        """Test que la limite est respectée dans l'ordre d'arrivée"""
+        peak, started = asyncio.run(self._run(ConcurrencyLimiter(3), 10))
+        self.assertEqual(peak, 3)
+        self.assertEqual(started, list(range(10)))
+    
+    def test_raise_limit(self):
+        """Test qu'augmenter la limite admet immédiatement les tâches en attente"""
+        limiter = ConcurrencyLimiter(1)
+        
+        def on_start(count):
+            if count == 1:
+                limiter.set_limit(4)
+        
+        peak, _ = asyncio.run(self._run(limiter, 8, on_start))
+        self.assertEqual(peak, 4)
+    
+    def test_lower_limit(self):
+        """Test que réduire la limite ralentit les tâches suivantes"""
+        limiter = ConcurrencyLimiter(4)
+        
+        def on_start(count):
+            if count == 4:
+                limiter.set_limit(1)
+        
+        peak, started = asyncio.run(self._run(limiter, 10, on_start))
+        self.assertEqual(peak, 4)
+        self.assertEqual(len(started), 10)
+        self.assertEqual(limiter.active, 0)
+    
+    def test_set_limit_from_thread(self):
+        """Test de la modification de la limite depuis un autre thread"""
+        limiter = ConcurrencyLimiter(1)
+        
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiter.done())
+            thread = threading.Thread(target=limiter.set_limit, args=(2,))
+            thread.start()
+            thread.join()
+            await asyncio.wait_for(waiter, 1)
+            return limiter.active
+        
+        self.assertEqual(asyncio.run(run()), 2)
+    
+    def test_cancelled_waiter(self):
+        """Test qu'une tâche annulée en attente ne consomme pas de place"""
+        limiter = ConcurrencyLimiter(1)
+        
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            limiter.release()
+            await asyncio.wait_for(limiter.acquire(), 1)
+            return limiter.active
+        
+        self.assertEqual(asyncio.run(run()), 1)
+    
+    def test_waiting_and_locked(self):
+        """Test de l'état exposé aux appelants qui refusent d'attendre"""
+        limiter = ConcurrencyLimiter(1)
+        
+        async def run():
+            self.assertFalse(limiter.locked())
+            await limiter.acquire()
+            self.assertTrue(limiter.locked())
+            waiter = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.waiting, 1)
+            limiter.release()
+            await waiter
+            self.assertEqual(limiter.waiting, 0)
+        
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
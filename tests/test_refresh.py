@@ -0,0 +1,137 @@
+"""
+Tests unitaires pour le module refresh.py
+"""
+
+import asyncio
+import time
+import unittest
+from cache import ServerCache
+from helpers import FakeConfig
+from refresh import RefreshScheduler, create_refresh_scheduler
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    """Tests pour la classe RefreshScheduler"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.cache = ServerCache(max_age_seconds=100, name="test")
+        self.scheduler = RefreshScheduler(self.cache, refresh_ahead=0.8, jitter=0.1, idle_seconds=50)
+        self.calls = 0
+
+    async def load(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+    def test_schedule_with_jitter(self):
+        """Test que l'échéance tombe dans la fenêtre de rafraîchissement anticipé"""
+        self.cache.set("key", "value")
+        self.scheduler.watch("key", self.load)
+        timestamp = self.cache.cache["key"].timestamp
+        due = self.scheduler.watched["key"]
+        self.assertGreaterEqual(due, timestamp + 70)
+        self.assertLessEqual(due, timestamp + 80)
+
+    def test_refresh_hot_entry(self):
+        """Test du rafraîchissement d'une entrée lue récemment"""
+        self.cache.set("key", "value")
+        self.scheduler.watch("key", self.load)
+        now = self.cache.cache["key"].timestamp + 80
+        self.cache.access_times["key"] = now - 10
+
+        self.assertEqual(asyncio.run(self.scheduler.run_once(now)), 1)
+        self.assertEqual(self.cache.get("key"), "value-1")
+        # Le rafraîchissement ne compte pas comme une lecture
+        self.assertIn("key", self.scheduler.watched)
+
+    def test_not_due(self):
+        """Test qu'une entrée n'est pas rafraîchie avant son échéance"""
+        self.cache.set("key", "value")
+        self.scheduler.watch("key", self.load)
+        self.assertEqual(asyncio.run(self.scheduler.run_once(time.time())), 0)
+        self.assertEqual(self.calls, 0)
+
+    def test_cold_entry_left_to_expire(self):
+        """Test qu'une entrée non lue depuis longtemps n'est plus surveillée"""
+        self.cache.set("key", "value")
+        self.scheduler.watch("key", self.load)
+        now = self.cache.cache["key"].timestamp + 80
+        self.cache.access_times["key"] = now - 60
+
+        self.assertEqual(asyncio.run(self.scheduler.run_once(now)), 0)
+        self.assertEqual(self.calls, 0)
+        self.assertNotIn("key", self.scheduler.watched)
+        self.assertEqual(self.cache.cache["key"].data, "value")
+
+    def test_refresh_touch(self):
+        """Test qu'un rafraîchissement ne rend pas une entrée chaude"""
+        self.cache.set("key", "value")
+        accessed = self.cache.access_times["key"] = time.time() - 30
+        self.cache.set("key", "new", touch=False)
+        self.assertEqual(self.cache.access_times["key"], accessed)
+
+    def test_failed_refresh_keeps_value(self):
+        """Test qu'un échec de rafraîchissement conserve l'ancienne valeur"""
+        async def fail():
+            raise ConnectionError("down")
+
+        self.cache.set("key", "value")
+        self.scheduler.watch("key", fail)
+        now = self.cache.cache["key"].timestamp + 80
+        self.cache.access_times["key"] = now
+
+        self.assertEqual(asyncio.run(self.scheduler.run_once(now)), 0)
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertAlmostEqual(self.scheduler.watched["key"], now + 10, places=3)
+
+    def test_max_concurrent(self):
+        """Test de la limite de rafraîchissements simultanés"""
+        scheduler = RefreshScheduler(self.cache, max_concurrent=2)
+        active = peak = 0
+
+        async def load():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return "value"
+
+        for i in range(6):
+            self.cache.set(f"key{i}", "value")
+            scheduler.watch(f"key{i}", load)
+        now = time.time() + 90
+        for i in range(6):
+            self.cache.access_times[f"key{i}"] = now
+
+        self.assertEqual(asyncio.run(scheduler.run_once(now)), 6)
+        self.assertEqual(peak, 2)
+
+    def test_background_task(self):
+        """Test du rafraîchissement par la tâche de fond"""
+        cache = ServerCache(max_age_seconds=0.2, name="test")
+        scheduler = RefreshScheduler(cache, refresh_ahead=0.5, jitter=0.0)
+
+        async def run():
+            cache.set("key", "value")
+            scheduler.watch("key", self.load)
+            scheduler.start()
+            for _ in range(10):
+                await asyncio.sleep(0.05)
+                self.assertIsNotNone(cache.get("key"))
+            scheduler.stop()
+
+        asyncio.run(run())
+        self.assertGreaterEqual(self.calls, 2)
+        self.assertFalse(scheduler.running)
+
+    def test_create_from_config(self):
+        """Test de la création depuis la configuration"""
+        scheduler = create_refresh_scheduler(self.cache, FakeConfig({"max_concurrent": 8, "jitter": 0.2}))
+        self.assertEqual(scheduler.max_concurrent, 8)
+        self.assertEqual(scheduler.jitter, 0.2)
+        self.assertEqual(scheduler.refresh_ahead, 0.8)
+
+
+if __name__ == '__main__':
+    unittest.main()
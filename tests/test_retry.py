@@ -0,0 +1,102 @@
+"""
+Tests unitaires pour le module retry.py
+"""
+
+import unittest
+from unittest.mock import patch
+from helpers import FakeConfig
+from retry import RetryPolicy, CircuitBreaker
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Tests pour la classe RetryPolicy"""
+    
+    def test_compute_delay_without_jitter(self):
+        """Test du backoff exponentiel sans jitter"""
+        policy = RetryPolicy(base_delay=0.5, max_delay=3.0, jitter=0.0)
+        self.assertEqual(policy.compute_delay(0), 0.5)
+        self.assertEqual(policy.compute_delay(1), 1.0)
+        self.assertEqual(policy.compute_delay(2), 2.0)
+        self.assertEqual(policy.compute_delay(5), 3.0)
+    
+    def test_compute_delay_full_jitter(self):
+        """Test que le délai reste borné avec le full jitter"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0, jitter=1.0)
+        for attempt in range(6):
+            delay = policy.compute_delay(attempt)
+            self.assertGreaterEqual(delay, 0.0)
+            self.assertLessEqual(delay, min(4.0, 2 ** attempt))
+    
+    def test_is_retryable_status(self):
+        """Test de la méthode is_retryable_status"""
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable_status(503))
+        self.assertTrue(policy.is_retryable_status(429))
+        self.assertFalse(policy.is_retryable_status(404))
+    
+    def test_from_config_action_override(self):
+        """Test de la surcharge par action dans la configuration"""
+        config = FakeConfig(sections={
+            'retry': {'max_attempts': 3, 'base_delay': 0.2, 'retry_statuses': '500,503'},
+            'retry.get_vod_streams': {'max_attempts': 6},
+        })
+        policy = RetryPolicy.from_config(config, 'get_vod_streams')
+        self.assertEqual(policy.max_attempts, 6)
+        self.assertEqual(policy.base_delay, 0.2)
+        self.assertEqual(policy.retry_statuses, (500, 503))
+        
+        default_policy = RetryPolicy.from_config(config, 'get_live_streams')
+        self.assertEqual(default_policy.max_attempts, 3)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests pour la classe CircuitBreaker"""
+    
+    def test_opens_after_threshold(self):
+        """Test de l'ouverture après plusieurs échecs consécutifs"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+    
+    def test_success_resets_failures(self):
+        """Test de la remise à zéro après un succès"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_half_open_single_trial(self):
+        """Test de l'état half_open qui n'autorise qu'une requête d'essai"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch('retry.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with patch('retry.time.monotonic', return_value=111.0):
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow_request())
+            self.assertFalse(breaker.allow_request())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with patch('retry.time.monotonic', return_value=122.0):
+            self.assertTrue(breaker.allow_request())
+            breaker.record_success()
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_release_trial(self):
+        """Test qu'une requête d'essai abandonnée permet un nouvel essai"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch('retry.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with patch('retry.time.monotonic', return_value=111.0):
+            self.assertTrue(breaker.allow_request())
+            self.assertFalse(breaker.allow_request())
+            breaker.release_trial()
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow_request())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+"""
+Tests unitaires pour le module server.py
+"""
+
+import asyncio
+import gzip
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from config_manager import ConfigManager  # noqa: E402
+from helpers import FakeConfig  # noqa: E402
+from iptv_client import IPTVClient  # noqa: E402
+from mock_panel import MockPanel  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+from stream_proxy import StreamProxy  # noqa: E402
+from server import AccountJob, PlaylistServer, etag_matches, parse_range, render_document  # noqa: E402
+
+
+class TestHTTPHelpers(unittest.TestCase):
+    """Tests des fonctions d'analyse des en-têtes"""
+
+    def test_parse_range(self):
+        """Test des formes de plage d'octets"""
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-2000", 1000), (990, 999))
+        self.assertEqual(parse_range("bytes=-5000", 1000), (0, 999))
+        # Plusieurs plages ou autre unité : en-tête ignoré, document complet
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))
+        self.assertIsNone(parse_range("items=0-1", 1000))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=1000-", 1000)
+        with self.assertRaises(ValueError):
+            parse_range("bytes=10-5", 1000)
+
+    def test_etag_matches(self):
+        """Test de la comparaison faible des ETags"""
+        etags = ('"abc"', '"abc-gzip"')
+        self.assertTrue(etag_matches('"abc"', etags))
+        self.assertTrue(etag_matches('"x", W/"abc-gzip"', etags))
+        self.assertTrue(etag_matches('*', etags))
+        self.assertFalse(etag_matches('"abd"', etags))
+
+    def test_render_document(self):
+        """Test que la compression et l'ETag ne dépendent que du contenu"""
+        first = render_document(b"#EXTM3U\n" * 100, "audio/x-mpegurl")
+        second = render_document(b"#EXTM3U\n" * 100, "audio/x-mpegurl")
+        self.assertEqual(first.etag, second.etag)
+        self.assertEqual(first.gzipped, second.gzipped)
+        self.assertEqual(gzip.decompress(first.gzipped), first.body)
+        self.assertNotEqual(first.gzip_etag, first.etag)
+
+    def test_invalid_account(self):
+        """Test du rejet des noms de compte et types inconnus"""
+        with self.assertRaises(ValueError):
+            AccountJob("my account", "http://example.com/get.php")
+        with self.assertRaises(ValueError):
+            AccountJob("main", "http://example.com/get.php", kinds=("series",))
+
+    def test_from_config(self):
+        """Test de la création depuis la configuration"""
+        server = PlaylistServer.from_config(
+            FakeConfig({"kinds": "live, vod", "ttl_seconds": 600.0},
+                       sections={"server_accounts": {"main": "http://example.com/get.php"}}))
+        self.assertEqual(server.ttl, 600.0)
+        self.assertEqual(server.jobs["main"].document_names(), ["live.m3u", "vod.m3u"])
+
+    def test_from_config_file_accounts(self):
+        """Test que les comptes du fichier gardent la casse de leur nom et le « % » de leur URL"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "config.ini"
+            path.write_text("[server_accounts]\n"
+                            "Living-Room = http://example.com/get.php?username=u&password=p%40ss\n")
+            server = PlaylistServer.from_config(ConfigManager(str(path)))
+        self.assertEqual(list(server.jobs), ["Living-Room"])
+        self.assertEqual(server.jobs["Living-Room"].url, "http://example.com/get.php?username=u&password=p%40ss")
+
+
+class TestPlaylistServer(unittest.TestCase):
+    """Tests de bout en bout du serveur devant le panel simulé"""
+
+    def _run(self, scenario, ttl=3600.0, kinds=("live",), epg=False, proxy=False, public_url="http://tv.local"):
+        """Démarre le panel et le serveur, exécute le scénario, puis arrête les deux"""
+        async def run():
+            async with MockPanel(200, stream_chunks=3, stream_failure_rate=0.0) as panel:
+                client = IPTVClient(panel.url, use_cache=False)
+                client.parse_url()
+                IPTVClient._limiters[client.host] = TokenBucket(0.0, 1)
+                proxies = {"main": StreamProxy(panel.url, max_connections=1)} if proxy else None
+                server = PlaylistServer([AccountJob("main", panel.url, kinds, epg, public_url, proxy)],
+                                        ttl=ttl, proxies=proxies)
+                url = await server.start("127.0.0.1", 0)
+                try:
+                    # aiohttp demande gzip par défaut : les tests le demandent explicitement
+                    async with aiohttp.ClientSession(auto_decompress=False,
+                                                     headers={"Accept-Encoding": "identity"}) as session:
+                        return await scenario(server, session, f"{url}/main")
+                finally:
+                    await server.stop()
+                    IPTVClient._limiters.pop(client.host, None)
+        return asyncio.run(run())
+
+    def test_serve_playlist(self):
+        """Test d'une playlist servie compressée, puis non modifiée"""
+        async def scenario(server, session, base):
+            async with session.get(f"{base}/live.m3u", headers={"Accept-Encoding": "gzip"}) as resp:
+                self.assertEqual(resp.status, 200)
+                self.assertEqual(resp.headers["Content-Encoding"], "gzip")
+                body = gzip.decompress(await resp.read()).decode("utf-8")
+                etag = resp.headers["ETag"]
+            self.assertEqual(body.count("#EXTINF"), 200)
+            async with session.get(f"{base}/live.m3u", headers={"If-None-Match": etag}) as resp:
+                self.assertEqual(resp.status, 304)
+                self.assertEqual(await resp.read(), b"")
+            async with session.head(f"{base}/live.m3u") as resp:
+                self.assertEqual(resp.status, 200)
+                self.assertEqual(int(resp.headers["Content-Length"]), len(body.encode("utf-8")))
+            async with session.get(f"{base}/vod.m3u") as resp:
+                self.assertEqual(resp.status, 404)
+        self._run(scenario)
+
+    def test_range(self):
+        """Test des requêtes partielles"""
+        async def scenario(server, session, base):
+            async with session.get(f"{base}/live.m3u") as resp:
+                body = await resp.read()
+                etag = resp.headers["ETag"]
+            async with session.get(f"{base}/live.m3u", headers={"Range": "bytes=10-19"}) as resp:
+                self.assertEqual(resp.status, 206)
+                self.assertEqual(resp.headers["Content-Range"], f"bytes 10-19/{len(body)}")
+                self.assertEqual(await resp.read(), body[10:20])
+            async with session.get(f"{base}/live.m3u", headers={"Range": "bytes=-7", "If-Range": etag}) as resp:
+                self.assertEqual(await resp.read(), body[-7:])
+            # Document modifié depuis : If-Range renvoie le document complet
+            async with session.get(f"{base}/live.m3u", headers={"Range": "bytes=0-9", "If-Range": '"old"'}) as resp:
+                self.assertEqual(resp.status, 200)
+            async with session.get(f"{base}/live.m3u", headers={"Range": f"bytes={len(body)}-"}) as resp:
+                self.assertEqual(resp.status, 416)
+        self._run(scenario)
+
+    def test_one_render_per_ttl(self):
+        """Test que les requêtes ne déclenchent pas de génération"""
+        renders = 0
+        original = AccountJob.render
+
+        async def counting(job):
+            nonlocal renders
+            renders += 1
+            return await original(job)
+
+        async def scenario(server, session, base):
+            async def fetch():
+                async with session.get(f"{base}/live.m3u") as resp:
+                    return resp.status
+            statuses = await asyncio.gather(*(fetch() for _ in range(50)))
+            self.assertEqual(set(statuses), {200})
+            return renders
+
+        with patch.object(AccountJob, "render", autospec=True, side_effect=counting):
+            self.assertEqual(self._run(scenario), 1)
+
+    def test_background_regeneration(self):
+        """Test de la régénération à l'expiration, sans interruption du service"""
+        async def scenario(server, session, base):
+            async with session.get(f"{base}/live.m3u") as resp:
+                first = resp.headers["Last-Modified"], float(server._expires["main"])
+            await asyncio.sleep(1.5)
+            self.assertGreater(server._expires["main"], first[1])
+            async with session.get(f"{base}/live.m3u") as resp:
+                self.assertEqual(resp.status, 200)
+        self._run(scenario, ttl=0.5)
+
+    def test_failed_render_keeps_previous(self):
+        """Test qu'un échec de génération conserve la version servie"""
+        async def scenario(server, session, base):
+            job = server.jobs["main"]
+            async with session.get(f"{base}/live.m3u") as resp:
+                etag = resp.headers["ETag"]
+            with patch.object(AccountJob, "render", side_effect=ConnectionError("panel down")):
+                self.assertFalse(await server.refresh(job))
+            self.assertEqual(job.last_error, "panel down")
+            async with session.get(f"{base}/live.m3u") as resp:
+                self.assertEqual(resp.headers["ETag"], etag)
+            async with session.get(server.url + "/") as resp:
+                index = await resp.json()
+            self.assertEqual(index["main"]["error"], "panel down")
+        self._run(scenario)
+
+    def test_epg(self):
+        """Test du guide EPG servi avec la playlist live"""
+        async def scenario(server, session, base):
+            async with session.get(f"{base}/epg.xml") as resp:
+                self.assertEqual(resp.status, 200)
+                self.assertIn(b"<tv", await resp.read())
+            async with session.get(f"{base}/live.m3u") as resp:
+                self.assertIn('url-tvg="http://tv.local/main/epg.xml"', (await resp.read()).decode("utf-8"))
+        self._run(scenario, epg=True)
+
+    def test_proxied_streams(self):
+        """Test des flux live servis par le proxy du serveur"""
+        async def scenario(server, session, base):
+            async with session.get(f"{base}/live.m3u") as resp:
+                playlist = (await resp.read()).decode("utf-8")
+            self.assertIn("\nhttp://tv.local/main/live/1.ts\n", playlist)
+            self.assertNotIn("/live/bench/bench/", playlist)
+            async with session.get(f"{server.url}/main/live/1.ts") as resp:
+                self.assertEqual(resp.status, 200)
+                self.assertEqual(len(await resp.read()), 3 * 1316)
+            async with session.get(server.url + "/") as resp:
+                self.assertEqual((await resp.json())["main"]["proxy"]["max_connections"], 1)
+        self._run(scenario, proxy=True)
+
+    def test_default_public_url(self):
+        """Test que les URLs annoncées sans public_url désignent l'adresse et le port réellement attribués"""
+        async def scenario(server, session, base):
+            self.assertNotIn(":0", server.url)
+            async with session.get(f"{base}/live.m3u") as resp:
+                playlist = (await resp.read()).decode("utf-8")
+            self.assertIn(f'url-tvg="{server.url}/main/epg.xml"', playlist)
+            self.assertIn(f"\n{server.url}/main/live/1.ts\n", playlist)
+        self._run(scenario, epg=True, proxy=True, public_url="")
+
+    def test_wildcard_requires_public_url(self):
+        """Test qu'une écoute sur toutes les interfaces exige public_url pour l'EPG et le proxy"""
+        url = "http://example.com/get.php"
+        server = PlaylistServer([AccountJob("main", url, epg=True)])
+        with self.assertRaises(ValueError):
+            server.check_public_url("0.0.0.0")
+        with self.assertRaises(ValueError):
+            asyncio.run(server.start("::", 0))
+        server.check_public_url("127.0.0.1")
+        PlaylistServer([AccountJob("main", url)]).check_public_url("0.0.0.0")
+        PlaylistServer([AccountJob("main", url, epg=True, public_url="http://tv.local")]).check_public_url("::")
+
+
+if __name__ == '__main__':
+    unittest.main()
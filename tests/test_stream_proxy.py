@@ -0,0 +1,160 @@
+"""
+Tests unitaires pour le module stream_proxy.py
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from iptv_client import IPTVClient  # noqa: E402
+from mock_panel import MockPanel  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+from stream_proxy import StreamProxy, _Broadcast, _Viewer  # noqa: E402
+
+CHUNK = 1316
+
+
+class TestStreamProxy(unittest.TestCase):
+    """Tests de bout en bout du proxy devant le panel simulé"""
+
+    def _run(self, scenario, panel=None, **options):
+        """Démarre le panel et le proxy, exécute le scénario, puis arrête les deux"""
+        panel = panel or MockPanel(10, stream_chunks=20, stream_failure_rate=0.0)
+
+        async def run():
+            async with panel:
+                client = IPTVClient(panel.url, use_cache=False)
+                client.parse_url()
+                IPTVClient._limiters[client.host] = TokenBucket(0.0, 1)
+                proxy = StreamProxy(panel.url, **options)
+                await proxy.start()
+                app = web.Application()
+                app.router.add_get("/live/{stream}", proxy.handle)
+                runner = web.AppRunner(app, access_log=None)
+                await runner.setup()
+                site = web.TCPSite(runner, "127.0.0.1", 0)
+                await site.start()
+                host, port = runner.addresses[0][:2]
+                try:
+                    async with aiohttp.ClientSession() as session:
+                        return await scenario(panel, proxy, session, f"http://{host}:{port}/live")
+                finally:
+                    await proxy.close()
+                    await runner.cleanup()
+                    IPTVClient._limiters.pop(client.host, None)
+        return asyncio.run(run())
+
+    @staticmethod
+    async def _watch(session, url):
+        async with session.get(url) as resp:
+            return resp.status, await resp.read()
+
+    def test_fan_out(self):
+        """Test du partage d'une connexion amont entre plusieurs lecteurs"""
+        async def scenario(panel, proxy, session, base):
+            results = await asyncio.gather(*(self._watch(session, f"{base}/1.ts") for _ in range(5)))
+            self.assertEqual({status for status, _ in results}, {200})
+            self.assertEqual({len(body) for _, body in results}, {20 * CHUNK})
+            self.assertEqual(panel.peak_streams, 1)
+            self.assertEqual(proxy.stats()["streams"], 0)
+        self._run(scenario, max_connections=1)
+
+    def test_queue_beyond_max_connections(self):
+        """Test qu'un flux de plus attend qu'une connexion du compte se libère"""
+        async def scenario(panel, proxy, session, base):
+            results = await asyncio.gather(*(self._watch(session, f"{base}/{i}.ts") for i in (1, 2, 3)))
+            self.assertEqual([status for status, _ in results], [200, 200, 200])
+            self.assertEqual(panel.peak_streams, 2)
+        # Le panel simulé annonce max_connections = 2
+        self._run(scenario)
+
+    def test_reject_beyond_max_connections(self):
+        """Test du refus immédiat d'un flux de plus avec la politique reject"""
+        async def scenario(panel, proxy, session, base):
+            first = asyncio.ensure_future(self._watch(session, f"{base}/1.ts"))
+            await asyncio.sleep(0.05)
+            status, _ = await self._watch(session, f"{base}/2.ts")
+            self.assertEqual(status, 503)
+            # Un lecteur du flux déjà ouvert est toujours admis
+            status, _ = await self._watch(session, f"{base}/1.ts")
+            self.assertEqual(status, 200)
+            self.assertEqual((await first)[0], 200)
+        self._run(scenario, max_connections=1, overflow="reject")
+
+    def test_queue_timeout(self):
+        """Test de l'abandon d'un flux qui attend trop longtemps"""
+        async def scenario(panel, proxy, session, base):
+            first = asyncio.ensure_future(self._watch(session, f"{base}/1.ts"))
+            await asyncio.sleep(0.05)
+            status, body = await self._watch(session, f"{base}/2.ts")
+            self.assertEqual(status, 503)
+            self.assertIn(b"No free connection", body)
+            await first
+        self._run(scenario, max_connections=1, queue_timeout=0.05)
+
+    def test_last_viewer_closes_upstream(self):
+        """Test de la fermeture de la connexion amont au départ du dernier lecteur"""
+        async def scenario(panel, proxy, session, base):
+            async with session.get(f"{base}/1.ts") as resp:
+                await resp.content.readexactly(CHUNK)
+                self.assertEqual(proxy.stats()["viewers"], 1)
+                task = proxy._broadcasts["1.ts"].task
+            for _ in range(50):
+                await asyncio.sleep(0.02)
+                if not panel.open_streams:
+                    break
+            self.assertEqual(panel.open_streams, 0)
+            self.assertEqual(proxy.stats(), {"streams": 0, "viewers": 0, "waiting": 0, "max_connections": 1})
+            self.assertTrue(task.cancelled())
+        self._run(scenario, MockPanel(10, stream_chunks=1000, stream_failure_rate=0.0), max_connections=1)
+
+    def test_last_viewer_unregisters_broadcast(self):
+        """Test qu'un flux en cours d'annulation n'est plus proposé aux nouveaux lecteurs"""
+        async def run():
+            proxy = StreamProxy("http://example.com/get.php?username=u&password=p")
+            broadcast = _Broadcast("1.ts", "http://example.com/live/u/p/1.ts")
+            broadcast.task = asyncio.ensure_future(asyncio.sleep(60))
+            proxy._broadcasts["1.ts"] = broadcast
+            viewer = _Viewer(4)
+            broadcast.viewers.append(viewer)
+            proxy._leave(broadcast, viewer)
+            self.assertNotIn("1.ts", proxy._broadcasts)
+            await asyncio.gather(broadcast.task, return_exceptions=True)
+            self.assertTrue(broadcast.task.cancelled())
+        asyncio.run(run())
+
+    def test_upstream_error(self):
+        """Test d'un flux refusé par le panel"""
+        async def scenario(panel, proxy, session, base):
+            status, body = await self._watch(session, f"{base}/1.ts")
+            self.assertEqual(status, 502)
+            self.assertIn(b"HTTP 404", body)
+            status, _ = await self._watch(session, f"{base}/../1.ts")
+            self.assertEqual(status, 404)
+        self._run(scenario, MockPanel(10, stream_chunks=5, stream_failure_rate=1.0), max_connections=1)
+
+    def test_max_connections_from_panel(self):
+        """Test que la limite du compte est lue une seule fois au démarrage, sans les catalogues"""
+        async def scenario(panel, proxy, session, base):
+            # start() n'a demandé que user_info : aucun catalogue téléchargé
+            self.assertEqual(panel.requests, 1)
+            self.assertEqual(proxy.stats()["max_connections"], 2)
+            status, _ = await self._watch(session, f"{base}/1.ts")
+            self.assertEqual(status, 200)
+            self.assertEqual(panel.requests, 1)
+        self._run(scenario)
+
+    def test_unknown_policy(self):
+        """Test du rejet d'une politique inconnue"""
+        with self.assertRaises(ValueError):
+            StreamProxy("http://example.com/get.php?username=u&password=p", overflow="drop")
+
+
+if __name__ == '__main__':
+    unittest.main()
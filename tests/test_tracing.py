@@ -0,0 +1,127 @@
+"""
+Tests unitaires pour le module tracing.py
+"""
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from helpers import FakeConfig
+from tracing import Tracer, JsonLinesExporter, configure_tracing, STATUS_OK, STATUS_ERROR
+
+
+class ListExporter:
+    """Exporteur conservant les spans en mémoire"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class TestTracer(unittest.TestCase):
+    """Tests pour la classe Tracer"""
+
+    def setUp(self):
+        """Initialise les tests"""
+        self.exporter = ListExporter()
+        self.tracer = Tracer(self.exporter)
+
+    def test_nested_spans(self):
+        """Test du rattachement d'un span enfant à son parent"""
+        with self.tracer.span("export", account="u@h") as parent:
+            with self.tracer.span("parse", items=3) as child:
+                child.set_attribute("bytes", 10)
+
+        self.assertEqual([span.name for span in self.exporter.spans], ["parse", "export"])
+        self.assertEqual(child.parent_id, parent.span_id)
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertEqual(child.attributes, {"items": 3, "bytes": 10})
+        self.assertEqual(parent.status, STATUS_OK)
+        self.assertGreaterEqual(parent.end_ns, child.end_ns)
+        self.assertIsNone(self.tracer.current_span())
+
+    def test_propagation_to_tasks(self):
+        """Test que les tâches asyncio héritent du span en cours"""
+        async def stage(name):
+            with self.tracer.span(name):
+                await asyncio.sleep(0)
+
+        async def run():
+            with self.tracer.span("generate") as root:
+                await asyncio.gather(stage("live"), stage("vod"))
+            return root
+
+        root = asyncio.run(run())
+        children = [span for span in self.exporter.spans if span.name != "generate"]
+        self.assertEqual(len(children), 2)
+        self.assertTrue(all(span.parent_id == root.span_id for span in children))
+
+    def test_error_status(self):
+        """Test qu'une exception marque le span en erreur"""
+        with self.assertRaises(ValueError):
+            with self.tracer.span("fetch"):
+                raise ValueError("boom")
+
+        span = self.exporter.spans[0]
+        self.assertEqual(span.status, STATUS_ERROR)
+        self.assertEqual(span.status_message, "ValueError: boom")
+
+    def test_disabled(self):
+        """Test qu'un traceur sans exporteur n'enregistre rien"""
+        tracer = Tracer()
+        with tracer.span("fetch") as span:
+            span.set_attributes(items=1)
+            self.assertIsNone(tracer.current_span())
+        self.assertFalse(tracer.enabled)
+
+
+class TestJsonLinesExporter(unittest.TestCase):
+    """Tests pour l'exporteur OTLP/JSON"""
+
+    def test_otlp_lines(self):
+        """Test du format OTLP/JSON des lignes écrites"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "traces.jsonl"
+            exporter = JsonLinesExporter(str(path), service_name="test")
+            tracer = Tracer(exporter)
+            with tracer.span("render", format="m3u", items=42, ratio=0.5, cached=False, skipped=None):
+                pass
+            exporter.close()
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 1)
+            resource_spans = json.loads(lines[0])["resourceSpans"][0]
+            self.assertEqual(resource_spans["resource"]["attributes"],
+                             [{"key": "service.name", "value": {"stringValue": "test"}}])
+            span = resource_spans["scopeSpans"][0]["spans"][0]
+            self.assertEqual(span["name"], "render")
+            self.assertEqual(len(span["traceId"]), 32)
+            self.assertEqual(len(span["spanId"]), 16)
+            self.assertNotIn("parentSpanId", span)
+            self.assertEqual(span["status"], {"code": STATUS_OK})
+            self.assertEqual(span["attributes"], [
+                {"key": "format", "value": {"stringValue": "m3u"}},
+                {"key": "items", "value": {"intValue": "42"}},
+                {"key": "ratio", "value": {"doubleValue": 0.5}},
+                {"key": "cached", "value": {"boolValue": False}},
+            ])
+            self.assertLessEqual(int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"]))
+
+    def test_configure_tracing(self):
+        """Test de l'activation du traçage depuis la configuration"""
+        tracer = Tracer()
+        self.assertIsNone(configure_tracing(FakeConfig({"enabled": False}), tracer))
+        self.assertFalse(tracer.enabled)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "out" / "traces.jsonl")
+            self.assertEqual(configure_tracing(FakeConfig({"enabled": True, "path": path}), tracer), path)
+            self.assertTrue(tracer.enabled)
+            tracer.exporter.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
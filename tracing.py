@@ -0,0 +1,247 @@
+"""
+Module de traçage pour l'application IPTV to M3U Converter
+Spans imbriqués propagés par contextvars, exportés en lignes JSON au format OTLP
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Codes de statut OTLP
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# SPAN_KIND_INTERNAL : toutes les étapes sont internes à l'application
+SPAN_KIND_INTERNAL = 1
+
+
+class Span:
+    """Étape chronométrée d'un traitement, rattachée à son span parent"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+                 'attributes', 'status', 'status_message')
+
+    def __init__(self, name: str, parent: Optional['Span'] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else ''
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.status_message = ''
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ajoute ou remplace un attribut du span"""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Ajoute ou remplace plusieurs attributs du span"""
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        """Marque le span en erreur"""
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> float:
+        """Durée du span en secondes (0 tant qu'il n'est pas terminé)"""
+        return (self.end_ns - self.start_ns) / 1e9 if self.end_ns else 0.0
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Convertit le span au format OTLP/JSON
+
+        Returns:
+            Le span tel qu'attendu dans `scopeSpans[].spans[]`
+        """
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': _otlp_attributes(self.attributes),
+            'status': {'code': self.status},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.status_message:
+            span['status']['message'] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Span renvoyé quand le traçage est désactivé : les attributs sont ignorés"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Span en cours : chaque tâche asyncio et chaque thread a le sien
+_current_span: ContextVar[Optional[Span]] = ContextVar('iptv_current_span', default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Convertit une valeur d'attribut au format AnyValue d'OTLP/JSON"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        # Les entiers 64 bits sont encodés en chaîne en OTLP/JSON
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convertit un dictionnaire d'attributs en liste de KeyValue OTLP"""
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class JsonLinesExporter:
+    """
+    Exporte les spans terminés dans un fichier, un document OTLP/JSON par ligne
+
+    Chaque ligne est une requête ExportTraceServiceRequest complète, lisible
+    par le récepteur `otlpjsonfile` du collecteur OpenTelemetry ou par jq.
+    """
+
+    def __init__(self, path: str, service_name: str = 'iptv-to-m3u'):
+        """
+        Initialise l'exporteur
+
+        Args:
+            path: Chemin du fichier (les spans sont ajoutés à la fin)
+            service_name: Valeur de l'attribut de ressource service.name
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._resource = {'attributes': _otlp_attributes({'service.name': service_name})}
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def export(self, span: Span) -> None:
+        """Écrit un span terminé"""
+        line = json.dumps({'resourceSpans': [{
+            'resource': self._resource,
+            'scopeSpans': [{'scope': {'name': 'iptv_client'}, 'spans': [span.to_otlp()]}],
+        }]}, separators=(',', ':'))
+        # Le worker Qt et la boucle asyncio peuvent terminer des spans en même temps
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+    def close(self) -> None:
+        """Ferme le fichier"""
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Crée les spans et les transmet à l'exporteur une fois terminés"""
+
+    def __init__(self, exporter: Optional[Any] = None):
+        """
+        Initialise le traceur
+
+        Args:
+            exporter: Objet doté d'une méthode export(span), ou None pour désactiver le traçage
+        """
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        """Indique si les spans sont enregistrés"""
+        return self.exporter is not None
+
+    def set_exporter(self, exporter: Optional[Any]) -> None:
+        """Remplace l'exporteur (None désactive le traçage)"""
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """
+        Ouvre un span enfant du span en cours pour la durée d'un bloc
+
+        Le span est propagé par contextvars : les tâches créées dans le bloc
+        (asyncio.gather, ensure_future) en héritent comme parent. Une exception
+        levée dans le bloc marque le span en erreur.
+
+        Args:
+            name: Nom de l'étape (ex: fetch, parse, render, write)
+            **attributes: Attributs du span (les valeurs None sont ignorées)
+
+        Yields:
+            Le span, pour ajouter des attributs connus en cours de route
+        """
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if span.status == STATUS_UNSET:
+                span.status = STATUS_OK
+            self.exporter.export(span)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """Retourne le span en cours, ou None"""
+        return _current_span.get()
+
+
+def configure_tracing(config: Any, tracer: Optional[Tracer] = None) -> Optional[str]:
+    """
+    Active le traçage selon la section `tracing`
+
+    Args:
+        config: Instance de ConfigManager
+        tracer: Traceur à configurer (par défaut: TRACER)
+
+    Returns:
+        Le chemin du fichier de traces, ou None si le traçage est désactivé
+    """
+    tracer = tracer or TRACER
+    if not config.get('tracing', 'enabled', False):
+        tracer.set_exporter(None)
+        return None
+    exporter = JsonLinesExporter(
+        config.get('tracing', 'path', 'traces.jsonl') or 'traces.jsonl',
+        config.get('tracing', 'service_name', 'iptv-to-m3u')
+    )
+    tracer.set_exporter(exporter)
+    atexit.register(exporter.close)
+    return str(exporter.path)
+
+
+# Traceur global de l'application
+TRACER = Tracer()